@@ -1,9 +1,36 @@
 #algorithms.py
 #Charles J. Lai
 #July 3, 2013
+import array
+import bisect
+import collections
+import contextlib
+import functools
+import heapq
+import inspect
+import io
+import mmap
+import multiprocessing
+import numbers
+import os
+import pickle
 import random
+import struct
+import sys
+import tempfile
+import threading
 import time
 
+#numpy is optional. When it is installed, numeric buffers (numpy arrays,
+#array.array objects and memoryviews of numbers) are handed to its
+#vectorized kernels instead of being indexed one value at a time.
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from pydata.DataStructures import SequenceView
+
 """
 ==========
 algorithms
@@ -18,24 +45,408 @@ The module includes a lot of excessive comments that will explain what each
 algorithm is doing which I think will be useful to new computer science 
 students.
 
+If numpy is installed, the sorts and the iterative searches also accept
+numeric buffers (numpy arrays, array.array objects and memoryviews of
+numbers) and hand them to numpy's vectorized kernels, working in place on
+the buffer wherever the pure Python version would.
+
+Every sort (other than the bogo sorts) takes key and reverse arguments that
+work like the ones of the built-in sorted. Each key is computed only once.
+
+To see why a sort was slow, run it inside "with instrumented() as calls:"
+(or set the PYDATA_INSTRUMENT environment variable and call
+recorded_stats()). Each call then records a SortStats with its number of
+comparisons, moves, temporary allocations and partitioning depth.
+Instrumentation costs next to nothing while it is off, and only applies to
+the thread that turned it on (the environment variable keeps the last 1000
+calls of every thread).
+
 Contents
 --------
 Searching Algorithms: 
 * Linear Search (iterative and recursive)
-* Binary Search (iterative and recursive)
+* Binary Search (iterative, recursive and batched)
+* Interpolation Search
+* Exponential and Galloping Search
 * Bogosearch 
 
 Sorting Algorithms: 
+* Adaptive Sort (picks one of the below)
+* Argsort and Apply Permutation
 * Insertion Sort
 * Selection Sort
-* Quick Sort
+* Quick Sort (introsort)
 * Merge Sort 
 * Shell Sort
-* Radix Sort
+* Radix Sort (of numbers, and of records by several keys)
+* String Sorts (MSD radix sort and multikey quick sort)
+* Parallel Sort
+* External Sort
+* Record File Sort (in place, memory-mapped)
+* Lazy K-Way Merge
 * Bogo Sort
 * Bogobogo Sort
+
+Selection Algorithms:
+* Quickselect/nth element (introselect)
+* Partial Sort
+* Multi-Select and Percentiles
+* Top K (bounded heap)
 """
 
+#Probes that fail to halve the range before interpolation_search switches
+#to binary search
+_INTERPOLATION_MISSES = 3
+
+#Ranges with fewer values than this are finished by insertion sort
+_INSERTION_CUTOFF = 16
+#Ranges with at least this many values use the ninther for a pivot
+_NINTHER_CUTOFF = 40
+#Wins in a row before a merge switches to galloping
+_MIN_GALLOP = 7
+
+#Inputs shorter than this are not worth shipping to other processes
+_PARALLEL_THRESHOLD = 100000
+#Sample values taken from each sorted chunk to pick the merge splitters
+_SPLITTER_SAMPLES = 64
+
+#Default memory budget (in bytes) for one in-memory run of external_sort
+_EXTERNAL_MEMORY = 64 * 1024 * 1024
+#Copies of a run held while it is sorted: the run, merge_sort's copy of
+#it and the decorated (key, position) pairs
+_EXTERNAL_COPIES = 3
+#Default number of runs external_sort merges at once
+_EXTERNAL_FAN_IN = 64
+#Values pickled together as one block of a run file
+_RUN_BLOCK = 1024
+
+#sort() uses insertion sort at or below this many values
+_TINY_SORT = 32
+#sort() treats a list with fewer than n / this descents as nearly sorted
+_NEARLY_SORTED = 64
+#Number of evenly spaced values sort() samples to count distinct values
+_PROFILE_SAMPLE = 1024
+#sort() prefers three-way quick sort below this share of distinct values
+_FEW_DISTINCT = 0.25
+
+#Python 2 has a separate arbitrary precision long type
+try:
+    _INTEGER_TYPES = (int, long)
+except NameError:
+    _INTEGER_TYPES = (int,)
+
+
+#== Instrumentation ======================================================
+#Instrumentation counts the work a sort does so that slow calls can be
+#explained. It is off unless the PYDATA_INSTRUMENT environment variable is
+#set (to anything but 0) or code runs inside "with instrumented():". When
+#it is off, the sorts run exactly the code they always do; when it is on,
+#the values are wrapped in counting objects for the length of the call and
+#the scratch lists are swapped for counting lists, so the algorithms
+#themselves never check whether they are being watched. Whether a call is
+#being watched is kept per thread, so that watching the sorts of one thread
+#never changes the sorts of another.
+
+#Most recent calls the PYDATA_INSTRUMENT environment variable keeps the
+#SortStats of; older ones are dropped so a long-running program does not
+#keep every call it ever made
+_RECORDED_CALLS = 1000
+
+#Bounded queue the SortStats of every call in every thread are appended to
+#when the PYDATA_INSTRUMENT environment variable is set, or None
+_recorder = (collections.deque(maxlen=_RECORDED_CALLS)
+             if os.environ.get('PYDATA_INSTRUMENT', '0') not in ('', '0') else None)
+
+
+class _InstrumentState(threading.local):
+    """
+    The instrumentation state of one thread. Each thread sees its own
+    attributes, so an instrumented() block in one thread neither records
+    nor slows down the sorts running in any other.
+
+    * recorder - the list of the innermost instrumented() block of the
+      thread, or None outside of one
+    * active - the SortStats of the call being instrumented in the thread
+      right now, or None
+    """
+    recorder = None
+    active = None
+
+
+_state = _InstrumentState()
+
+
+class SortStats(object):
+    """
+    Instances hold the counts recorded for one call of a sort.
+
+    ===========
+    Description
+    ===========
+    * name - the name of the sort that was called, e.g. 'quick_sort'
+    * length - the number of values given to it
+    * comparisons - every comparison of two values (or two keys). Key
+      comparisons count every operator python calls: comparing decorated
+      (key, position) pairs costs an == and then a <.
+    * moves - every value written into a list, so a swap is two moves
+    * allocations - the number of value slots in the temporary lists the
+      sort made (copies, merge buffers, radix buffers)
+    * max_depth - the deepest level of partitioning quick sort reached. A
+      good pivot keeps it near log2(length); a value close to the limit of
+      2*log2(length) means bad pivots pushed the sort into heap sort.
+
+    Together these tell the usual suspects apart: a bad pivot shows up as a
+    deep max_depth, a bad gap sequence as moves far above nlog(n), and a
+    bad input distribution as comparisons that change with the input while
+    the sort stays the same.
+    """
+    __slots__ = ('name', 'length', 'comparisons', 'moves', 'allocations', 'max_depth')
+
+    def __init__(self, name, length):
+        """
+        Constructor: Zeroed counts for a call of the sort called name on
+        length values.
+        """
+        self.name = name
+        self.length = length
+        self.comparisons = 0
+        self.moves = 0
+        self.allocations = 0
+        self.max_depth = 0
+
+    def __repr__(self):
+        return ('SortStats(%r, length=%d, comparisons=%d, moves=%d, allocations=%d, max_depth=%d)'
+                % (self.name, self.length, self.comparisons, self.moves, self.allocations, self.max_depth))
+
+
+@contextlib.contextmanager
+def instrumented():
+    """
+    Returns: A context manager that turns instrumentation on for the code
+    inside the with block. It gives back a list that gets one SortStats for
+    every sort called in the block:
+
+        with instrumented() as calls:
+            quick_sort(data)
+        print(calls[0].comparisons)
+
+    Only the sorts called directly are recorded; sort() records the sort it
+    picked. The numpy, parallel and external paths are not instrumented -
+    an instrumented call always runs (and counts) the pure Python algorithm.
+    Only the thread that entered the block is instrumented: sorts running
+    in other threads at the same time are neither recorded nor slowed down.
+    """
+    previous = _state.recorder
+    calls = _state.recorder = []
+    try:
+        yield calls
+    finally:
+        _state.recorder = previous
+
+
+def recorded_stats(clear=False):
+    """
+    Returns: A list of the SortStats recorded so far when instrumentation was
+    turned on with the PYDATA_INSTRUMENT environment variable - the last
+    _RECORDED_CALLS of them, from every thread (or inside an instrumented()
+    block, the ones recorded in that block). Empty when instrumentation is
+    off.
+
+    Parameters: if clear is True, the returned SortStats are also removed,
+    so that the next call only returns the ones recorded after this one.
+    """
+    recorder = _state.recorder if _state.recorder is not None else _recorder
+    if recorder is None:
+        return []
+    stats = list(recorder)
+    if clear and recorder is _recorder:
+        #popleft, unlike clear(), never drops a call that another thread
+        #recorded after the list above was taken
+        for _ in stats:
+            recorder.popleft()
+    elif clear:
+        del recorder[:]
+    return stats
+
+
+def _instrumentable(compares=True):
+    """
+    Returns: A decorator for the sorts. While instrumentation is off the
+    decorated sort runs unchanged; while it is on, the call is run through
+    _run_instrumented and recorded. compares is False for sorts that never
+    compare values (radix sort), whose values must not be wrapped.
+    """
+    def decorate(sort):
+        @functools.wraps(sort)
+        def wrapper(*args, **kwargs):
+            recorder = _state.recorder
+            if recorder is None:
+                recorder = _recorder
+            #A sort called by an instrumented sort adds to the outer counts
+            if recorder is None or _state.active is not None:
+                return sort(*args, **kwargs)
+            return _run_instrumented(sort, compares, args, kwargs, recorder)
+        return wrapper
+    return decorate
+
+
+def _run_instrumented(sort, compares, args, kwargs, recorder):
+    """
+    Returns: What sort(*args, **kwargs) returns, after running it on a
+    counting copy of its sequence and appending the counts to recorder.
+    In-place sorts have the sorted values copied back into the sequence.
+    """
+    arguments = _call_arguments(sort, args, kwargs)
+    sequence = arguments['sequence']
+    stats = SortStats(sort.__name__, len(sequence))
+    key = arguments.get('key')
+    if compares:
+        probe = _CountingList([_Counted(value, stats) for value in sequence], stats)
+        if key is not None:
+            arguments['key'] = lambda counted: _Counted(key(counted.value), stats)
+    else:
+        probe = _CountingList(sequence, stats)
+    arguments['sequence'] = probe
+    _state.active = stats
+    try:
+        result = sort(**arguments)
+    finally:
+        _state.active = None
+    recorder.append(stats)
+    vector = _numeric_array(sequence)
+    #In-place sorts return nothing or the sequence; copy the values back
+    if result is None or result is probe:
+        _write_back(sequence, 0, [_uncounted(value) for value in probe])
+        return None if result is None else sequence
+    result = [_uncounted(value) for value in result]
+    return result if vector is None else _like(sequence, numpy.asarray(result, dtype=vector.dtype))
+
+
+def _call_arguments(function, args, kwargs):
+    """
+    Returns: A dict mapping the parameter names of function to the arguments
+    a call function(*args, **kwargs) would bind to them.
+    """
+    try:
+        signature = inspect.signature
+    #Python 2
+    except AttributeError:
+        return inspect.getcallargs(function, *args, **kwargs)
+    return dict(signature(function).bind(*args, **kwargs).arguments)
+
+
+def _temporary(values):
+    """
+    Returns: values, a list a sort has just made for its own use. Sorts
+    pass every such list through here, so that while a call is being
+    instrumented in this thread it can be swapped for a counting list.
+    """
+    stats = _state.active
+    if stats is None:
+        return values
+    stats.allocations += len(values)
+    return _CountingList(values, stats)
+
+
+def _new_stack(entry):
+    """
+    Returns: A new introsort stack holding entry, which records the depth
+    of partitioning while a call is being instrumented in this thread.
+    """
+    stats = _state.active
+    if stats is None:
+        return [entry]
+    return _DepthStack(entry, stats)
+
+
+def _uncounted(value):
+    """
+    Returns: The value wrapped by a _Counted, or value itself.
+    """
+    return value.value if isinstance(value, _Counted) else value
+
+
+class _Counted(object):
+    """
+    Instances wrap a value and count every comparison made with it in the
+    comparisons of a SortStats.
+    """
+    __slots__ = ('value', 'stats')
+
+    def __init__(self, value, stats):
+        self.value = value
+        self.stats = stats
+
+    def __lt__(self, other):
+        self.stats.comparisons += 1
+        return self.value < _uncounted(other)
+
+    def __le__(self, other):
+        self.stats.comparisons += 1
+        return self.value <= _uncounted(other)
+
+    def __gt__(self, other):
+        self.stats.comparisons += 1
+        return self.value > _uncounted(other)
+
+    def __ge__(self, other):
+        self.stats.comparisons += 1
+        return self.value >= _uncounted(other)
+
+    def __eq__(self, other):
+        self.stats.comparisons += 1
+        return self.value == _uncounted(other)
+
+    def __ne__(self, other):
+        self.stats.comparisons += 1
+        return self.value != _uncounted(other)
+
+    def __hash__(self):
+        return hash(self.value)
+
+
+class _CountingList(list):
+    """
+    Instances are lists that count every value written into them in the
+    moves of a SortStats.
+    """
+    __slots__ = ('stats',)
+
+    def __init__(self, values, stats):
+        list.__init__(self, values)
+        self.stats = stats
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            value = list(value)
+            self.stats.moves += len(value)
+        else:
+            self.stats.moves += 1
+        list.__setitem__(self, index, value)
+
+    def reverse(self):
+        self.stats.moves += len(self)
+        list.reverse(self)
+
+
+class _DepthStack(list):
+    """
+    Instances are introsort stacks that record, in the max_depth of a
+    SortStats, how many levels of partitioning the deepest range pushed on
+    them is below the first one.
+    """
+    __slots__ = ('stats', 'budget')
+
+    def __init__(self, entry, stats):
+        list.__init__(self, [entry])
+        self.stats = stats
+        self.budget = entry[2]
+
+    def append(self, entry):
+        self.stats.max_depth = max(self.stats.max_depth, self.budget - entry[2])
+        list.append(self, entry)
+
+
 #== Searching Algorithms =================================================
 def linear_search_i(sequence, value):
     """
@@ -56,6 +467,10 @@ def linear_search_i(sequence, value):
     value has been found: hence O(n).
     """
 
+    #Numeric buffers are scanned by numpy a block at a time
+    vector = _numeric_array(sequence)
+    if vector is not None:
+        return _vector_linear_search(vector, value)
     #Initialize loop counter/return variable
     index = 0
     while index < len(sequence):
@@ -80,8 +495,14 @@ def linear_search_r(sequence, value):
     This is a recursive implementation of the linear search
     algorithm described above. For more information about the algorithm,
     please read the description on the implementation above.
+
+    The "rest of the list" is a SequenceView rather than a slice, so no
+    values are copied on the way down.
     """
 
+    #Work on a view so that sequence[1:] below does not copy the list
+    if not isinstance(sequence, SequenceView):
+        sequence = SequenceView(sequence)
     #Base case: If the length of the list is 0, raise a value error
     if len(sequence) == 0:
         raise ValueError
@@ -117,12 +538,16 @@ def binary_search_i(sequence, value):
     check every single value this time to find it!
     """
 
+    #Numeric buffers are searched by numpy
+    vector = _numeric_array(sequence)
+    if vector is not None:
+        return _vector_binary_search(vector, value)
     #Initialize start and end variables to use as flags for the while loop
     start = 0
     end = len(sequence)
     #While there are still values to be checked
     while start < end:
-        middle = (start+end)/2
+        middle = (start+end)//2
         #If the middle of the list is our value, return the middle index
         if sequence[middle] == value:
             return middle
@@ -149,14 +574,20 @@ def binary_search_r(sequence, value):
     This is a recursive implementation of the binary search algorithm
     described above. For more information about the algorithm, please read the
     description on the implementation above.
+
+    The halves are SequenceViews rather than slices, so each call costs
+    O(1) instead of copying half of the list.
     """
 
+    #Work on a view so that the halves below do not copy the list
+    if not isinstance(sequence, SequenceView):
+        sequence = SequenceView(sequence)
     #If the length of the sequence is 0, return False.
     if len(sequence) == 0:
         raise ValueError
     if len(sequence) == 1 and sequence[0] != value:
         raise ValueError
-    middle = len(sequence)/2
+    middle = len(sequence)//2
     #If the middle of the sequence is our value, return the middle position.
     if sequence[middle] == value:
         return middle
@@ -168,6 +599,229 @@ def binary_search_r(sequence, value):
         return binary_search_r(sequence[:middle], value)
 
 
+def binary_search_many(sequence, queries, mode='exact', key=None, missing=-1):
+    """
+    Returns: A list with one index position per query, in the order of
+    queries. Never raises on a miss.
+
+    Parameters: mode decides what "position" means for each query:
+    * 'exact' - index of the first value equal to the query, or missing if
+      there is none (missing defaults to -1).
+    * 'left'  - the insertion point before any equal values, i.e. the number
+      of values less than the query (like bisect.bisect_left).
+    * 'right' - the insertion point after any equal values, i.e. the number
+      of values less than or equal to the query (like bisect.bisect_right).
+    key is an optional function applied to the values of sequence (not to
+    the queries) - it is called exactly once per value for the whole batch.
+
+    Precondition: sequence is sorted (by key, if given) and queries is an
+    iterable of values comparable with the keys.
+
+    ============
+    Description:
+    ============
+    This is binary search done for a whole batch of queries at once. If the
+    queries arrive in sorted order, the answer for each query can only be at
+    or after the answer for the previous one. So instead of searching the
+    whole sequence every time, we sweep from left to right like a merge and
+    gallop (see _gallop) from the previous answer: a query that lands close
+    to the previous one costs only a couple of comparisons. Unsorted queries
+    each get an ordinary binary search.
+
+    If sequence is a numeric buffer and numpy is installed, the whole batch
+    is answered by numpy.searchsorted and a numpy array is returned.
+    """
+
+    if mode not in ('exact', 'left', 'right'):
+        raise ValueError("mode must be 'exact', 'left' or 'right'")
+    right = mode == 'right'
+    vector = _numeric_array(sequence) if key is None else None
+    if vector is not None:
+        return _vector_search_many(vector, queries, mode, missing)
+    keys = sequence if key is None else [key(value) for value in sequence]
+    queries = list(queries)
+    length = len(keys)
+    positions = []
+    if _in_order(queries):
+        #Merge-style sweep: each search starts where the last one ended
+        position = 0
+        for query in queries:
+            position = _gallop(keys, query, position, length, right, False)
+            positions.append(position)
+    else:
+        for query in queries:
+            positions.append(_bisect(keys, query, 0, length, right))
+    if mode == 'exact':
+        for index in range(len(positions)):
+            position = positions[index]
+            if position == length or keys[position] != queries[index]:
+                positions[index] = missing
+    return positions
+
+
+def interpolation_search(sequence, value):
+    """
+    Returns: Index position of the searched value in O(log(log(n))) time
+    on evenly spread data, and never worse than O(log(n)). If the value is
+    not in the list, raise a ValueError.
+
+    Precondition: sequence is a list of numbers already sorted from
+    sequence[0...len(sequence)-1] and value is a number
+
+    ============
+    Description:
+    ============
+    Binary search always probes the middle, but when we look up a word in
+    a dictionary we open it near the front for "apple" and near the back
+    for "zebra". Interpolation search does the same with numbers: it guesses
+    that the values rise in a straight line from sequence[low] to
+    sequence[high] and probes where value would be on that line. On evenly
+    spread data (timestamps, ids) each probe cuts n values down to about
+    sqrt(n), so it needs O(log(log(n))) probes - 5 instead of 20 for a
+    million values.
+
+    On lopsided data the guesses can be poor: a probe that keeps most of
+    the range makes almost no progress, and O(n) probes are possible. So we
+    count probes that fail to halve the range, and after
+    _INTERPOLATION_MISSES of them finish with a plain binary search.
+    """
+
+    #Numeric buffers are searched by numpy
+    vector = _numeric_array(sequence)
+    if vector is not None:
+        return _vector_binary_search(vector, value)
+    low = 0
+    high = len(sequence) - 1
+    misses = 0
+    while low <= high and misses < _INTERPOLATION_MISSES:
+        low_value = sequence[low]
+        high_value = sequence[high]
+        #The value is outside the range, so it cannot be in the list
+        if value < low_value or high_value < value:
+            raise ValueError
+        if high_value == low_value:
+            probe = low
+        else:
+            #Probe where value falls on the line from low_value to high_value
+            probe = low + int((high - low) * (float(value - low_value) / float(high_value - low_value)))
+            probe = min(max(probe, low), high)
+        if sequence[probe] == value:
+            return probe
+        size = high - low
+        if sequence[probe] < value:
+            low = probe + 1
+        else:
+            high = probe - 1
+        if (high - low) * 2 > size:
+            misses += 1
+    #Too many poor guesses - binary search what is left
+    position = _bisect(sequence, value, low, high + 1, False)
+    if position <= high and sequence[position] == value:
+        return position
+    raise ValueError
+
+
+def exponential_search(sequence, value):
+    """
+    Returns: Index position of the first copy of the searched value in
+    O(log(i)) time, where i is that position. If the value is not in the
+    sequence, raise a ValueError.
+
+    Precondition: sequence is sorted and indexable from 0, but its length
+    does not need to be known: indexing past its end only has to raise an
+    IndexError, as for a list, or a source that loads pages of a sorted
+    stream on demand.
+
+    ============
+    Description:
+    ============
+    Binary search needs both ends of the range up front. Exponential search
+    (Bentley and Yao) finds the end on the fly: it probes positions 1, 2, 4,
+    8, ... until it reaches a value that is not smaller than the one we
+    want (or runs off the end), which takes O(log(i)) probes. The value must
+    then be between the last two probes, and a binary search of that gap
+    takes O(log(i)) more. Values near the front are found quickly however
+    long the sequence is.
+    """
+
+    #Step 1: Double the bound until it reaches value or the end
+    low = 0
+    bound = 1
+    while True:
+        try:
+            if not sequence[bound - 1] < value:
+                break
+        except IndexError:
+            break
+        low = bound
+        bound *= 2
+    #Step 2: Binary search between the last two probes. Probes past the end
+    #count as larger than value.
+    high = bound - 1
+    while low < high:
+        middle = (low + high) // 2
+        try:
+            smaller = sequence[middle] < value
+        except IndexError:
+            smaller = False
+        if smaller:
+            low = middle + 1
+        else:
+            high = middle
+    try:
+        if sequence[low] == value:
+            return low
+    except IndexError:
+        pass
+    raise ValueError
+
+
+def galloping_search(sequence, value, hint=0, mode='exact'):
+    """
+    Returns: In 'exact' mode (the default), the index position of the first
+    copy of value, raising a ValueError if it is not in the list. In 'left'
+    mode, the number of values less than value, and in 'right' mode the
+    number of values less than or equal to value (where value would be
+    inserted, like bisect.bisect_left and bisect.bisect_right). Takes
+    O(log(d)) time, where d is the distance from hint to the answer.
+
+    Parameters: hint is the index to start from, e.g. where the previous
+    search landed.
+
+    Precondition: sequence is a list already sorted from
+    sequence[0...len(sequence)-1]
+
+    ============
+    Description:
+    ============
+    When searches come in order - scanning a time range, or walking two
+    sorted lists side by side - the next answer is usually close to the
+    last one, and a binary search of the whole list wastes most of its
+    probes. Galloping starts at the hint and probes 1, 2, 4, 8... positions
+    away from it, toward the answer, then binary searches the last gap.
+    This is the exponential search merge_sort gallops with.
+    """
+
+    if mode not in ('exact', 'left', 'right'):
+        raise ValueError("mode must be 'exact', 'left' or 'right'")
+    right = mode == 'right'
+    length = len(sequence)
+    if length == 0:
+        position = 0
+    else:
+        hint = min(max(hint, 0), length - 1)
+        #Gallop forward if sequence[hint] goes before value, else backward
+        if (not value < sequence[hint]) if right else (sequence[hint] < value):
+            position = _gallop(sequence, value, hint + 1, length, right, False)
+        else:
+            position = _gallop(sequence, value, 0, hint, right, True)
+    if mode != 'exact':
+        return position
+    if position < length and sequence[position] == value:
+        return position
+    raise ValueError
+
+
 def bogo_search(sequence, value, counter=20):
     """
     Returns: Index position of the searched value. If the value is not in 
@@ -194,10 +848,14 @@ def bogo_search(sequence, value, counter=20):
 
 
 #== Soritng Algorithms ===================================================
-def bubble_sort(sequence):
+@_instrumentable()
+def bubble_sort(sequence, key=None, reverse=False):
     """
     Procedure: Sorts the list in O(n^2) worst case time. 
 
+    Parameters: key and reverse work like they do for the built-in sorted.
+    key is called exactly once per value.
+
     Precondition: sequence is a mutable sequence i.e. a list
 
     ============
@@ -213,6 +871,9 @@ def bubble_sort(sequence):
     thus O(n^2) time.
     """
 
+    if key is not None or reverse:
+        _sort_keyed(sequence, 0, len(sequence) - 1, key, reverse, bubble_sort)
+        return
     #Initialize the first n sized loop counter, index of end of unsorted values.
     end = len(sequence) - 1
     while end > 0:
@@ -222,11 +883,18 @@ def bubble_sort(sequence):
         end += -1
 
 
-def insertion_sort(sequence):
+@_instrumentable()
+def insertion_sort(sequence, key=None, reverse=False, start=0, end=None):
     """ 
-    Procedure: sorts the sequence in O(n^2) worst case time. 
+    Procedure: sorts the sequence in O(n^2) worst case time, and O(n) time
+    if it is already sorted. Stable.
 
-    Precondition: sequence is a mutable sequence i.e. a list
+    Parameters: key and reverse work like they do for the built-in sorted.
+    key is called exactly once per value. start and end limit the sort to
+    sequence[start...end] (the whole sequence by default).
+
+    Precondition: sequence is a mutable sequence i.e. a list, and
+    0 <= start and end < len(sequence)
 
     ============
     Description: 
@@ -238,21 +906,33 @@ def insertion_sort(sequence):
     that the loop invariant maintains a sorted list after each sorting
     iteration. And, where bubble sort "bubbles" up the list, the insertion
     pushes each value of the list down into its sorted position.
+
+    This version is adaptive. A value that is not smaller than the one
+    before it is already in place and costs one comparison, so a sorted
+    list takes O(n) time and a nearly sorted one O(n + inversions). A value
+    that does have to move finds its place with a binary search of the
+    sorted part (O(log(n)) comparisons) and the values it jumps over are
+    moved up in one slice assignment instead of one swap at a time.
     """
 
-    #Initialize the first n sized loop counter, index of start of unsorted values
-    index = 0
-    while index < len(sequence):
-        #Push down the value from end to start index into sorted position. Helper procedure runs in O(n) time.
-        _push_down(sequence, index)
-        #Increase start index by one and reiterate
-        index += 1
+    if end is None:
+        end = len(sequence) - 1
+    if end - start < 1:
+        return
+    if key is not None or reverse:
+        _sort_keyed(sequence, start, end, key, reverse, lambda values: _insertion_sort_range(values, 0, len(values) - 1))
+        return
+    _insertion_sort_range(sequence, start, end)
 
 
-def selection_sort(sequence):
+@_instrumentable()
+def selection_sort(sequence, key=None, reverse=False):
     """ 
     Procedure: sorts the sequence in O(n^2) worst case time. 
 
+    Parameters: key and reverse work like they do for the built-in sorted.
+    key is called exactly once per value.
+
     Precondition: sequence is a mutable sequence i.e a list
 
     ============
@@ -267,11 +947,14 @@ def selection_sort(sequence):
     pushes each value of the list down into its sorted position.
     """
 
+    if key is not None or reverse:
+        _sort_keyed(sequence, 0, len(sequence) - 1, key, reverse, selection_sort)
+        return
     #Initialize the first n sized loop counter, index of start of unsorted values
     start = 0
     while start < len(sequence):
         #Find the minimum value of the list from the start value's index value
-        min = _find_min(sequence[start:]) + start
+        min = _find_min(SequenceView(sequence, start)) + start
         #If the start value is greater than the minimum of the unsorted portion, swap the two
         if sequence[start] > sequence[min]:
             _swap(sequence, start, min)
@@ -279,13 +962,15 @@ def selection_sort(sequence):
         start += 1
 
 
-def quick_sort(sequence, start=0, end=None):
+@_instrumentable()
+def quick_sort(sequence, start=0, end=None, key=None, reverse=False):
     """
-    Procedure: Sorts the list in O(nlog(n)) average case time in place.
+    Procedure: Sorts the list in O(nlog(n)) worst case time in place.
  
     Parameters: Takes a start and end argument. Default arguments is the
     beginning index of the list for start and the end index of the list for
-    the end.
+    the end. key and reverse work like they do for the built-in sorted; key
+    is called exactly once per value.
 
     Precondition: start and end are valid indices of the list and start < end.
     sequence is a mutable sequence, i.e., a list.
@@ -293,19 +978,31 @@ def quick_sort(sequence, start=0, end=None):
     ============
     Description:
     ============
-    QuickSort is a recursive, divide-and-conquer sorting
-    algorithm in O(nlog(n)) time. This algorithm works by heuristically
-    locating a "pivot" position (we'll assume the list is equi-disordered so
-    we'll simply take the beginning of the list as the pivot).
-
-    On our first recursive call, we partition the list around the pivot such that
-    values greater than or equal to the pivot are moved after it and values
-    less than the pivot are moved before it. The list will then look like:
-    [...smaller values..., pivot,...larger values...]. Then we call quick sort
-    on both the lower half of the list and upper half of the list. We can see
-    that this process of recursive partitioning results in log(n) dividing
-    function calls with n comparisons. The function is thus O(nlog(n)) average
-    time complexity for sorting a list.
+    QuickSort is a divide-and-conquer sorting algorithm in O(nlog(n)) time.
+    This algorithm works by heuristically locating a "pivot" value and
+    partitioning the list around it such that the list will look like:
+    [...smaller values..., pivot(s),...larger values...]. Then we sort the
+    lower part of the list and the upper part of the list the same way. We
+    can see that this process of repeated partitioning results in log(n)
+    levels of partitions with n comparisons each - O(nlog(n)) on average.
+
+    The textbook version (always pivot on the first value, recurse on both
+    sides) goes quadratic on sorted lists and on lists with lots of
+    duplicates. This implementation is an "introsort" which fixes both:
+
+    * The pivot is the median of three values (or the median of three
+      medians - a "ninther" - for big ranges), so sorted input is fine.
+    * The partition is three-way (the Dutch national flag problem): values
+      equal to the pivot are gathered in the middle and never looked at
+      again, so a list of ten distinct values sorts in O(n) passes.
+    * An explicit stack replaces the recursion. We always push the bigger
+      side and keep working on the smaller one, so the stack never holds
+      more than log(n) ranges and we never hit the recursion limit.
+    * Ranges smaller than _INSERTION_CUTOFF are finished by insertion sort,
+      which is faster than partitioning for a handful of values.
+    * If the partitions are still lopsided after 2*log(n) levels, the range
+      is handed to heap sort, so the worst case is O(nlog(n)) no matter
+      what input we are given.
     """
 
     #I can't put a default length function targeting the "sequence" parameter in 
@@ -316,115 +1013,128 @@ def quick_sort(sequence, start=0, end=None):
     #and do nothing
     if end - start < 1:
         return
-    #Partition the list by a pivot. Values less than the pivot go before the pivot 
-    #and vice versa for values greater than the pivot. This runs in O(n)
-    pivot = _partition(sequence, start, end)
-    #Recursively call quick sort of the left side of list before the pivot and the 
-    #right side of the list after the pivot - we essentially recursively partition 
-    #until the list is sorted! O(log(n)) time.
-    quick_sort(sequence, start, pivot - 1)
-    quick_sort(sequence, pivot + 1, end)
+    #Numeric buffers are sorted in place by numpy's own introsort
+    vector = _numeric_array(sequence)
+    if vector is not None and key is None:
+        _vector_sort(vector[start:end + 1], 'quicksort', reverse)
+        return
+    if key is not None or reverse:
+        _sort_keyed(sequence, start, end, key, reverse, lambda values: _introsort(values, 0, len(values) - 1))
+        return
+    _introsort(sequence, start, end)
 
 
-def merge_sort(sequence):
+@_instrumentable()
+def merge_sort(sequence, key=None, reverse=False):
     """
     Returns: A newly sorted list from an unsorted list in O(nlog(n)) time. 
-    Not sorted in place.
+    Not sorted in place. Stable: equal values keep their original order.
 
-    Precondition: sequence is a mutable sequence (i.e. a list)
+    Parameters: key and reverse work like they do for the built-in sorted.
+    key is called exactly once per value.
+
+    Precondition: sequence is a sequence (i.e. a list)
 
     ============
     Description: 
     ============
     Merge sort is a divide-and-conquer sorting algorithm that runs 
-    in O(nlog(n)) time.
+    in O(nlog(n)) time. The textbook version splits the list in half,
+    sorts both halves recursively and merges them back together.
+
+    This version is a "natural" merge sort in the style of timsort. Instead
+    of blindly splitting the list in half, we first walk the list looking
+    for "runs" of values that are already in order (a descending run is just
+    reversed). Short runs are grown to a minimum length with insertion sort.
+    Then neighbouring runs are merged pass after pass until one run is left.
+    A list that is already nearly sorted has only a few long runs, so it
+    sorts in close to O(n) time.
+
+    All of the work happens on index ranges of one copy of the input, with a
+    single auxiliary buffer (at most half the list) that is reused by every
+    merge - no slicing into new lists at every level. When one run keeps
+    "winning" the merge, we switch to galloping: an exponential search that
+    finds how many values in a row come from that run and moves them in one
+    block.
     """
-    if len(sequence) > 1:
-        middle = len(sequence)/2
-        left = merge_sort(sequence[:middle])
-        right = merge_sort(sequence[middle:])
-        return _merge(left, right)
-    return sequence
-
 
-def heap_sort(sequence):
+    #Numeric buffers are sorted by numpy's stable sort into a new buffer
+    vector = _numeric_array(sequence)
+    if vector is not None and key is None:
+        result = numpy.sort(vector, kind='stable')
+        return _like(sequence, result[::-1] if reverse else result)
+    if key is not None or reverse:
+        result = _sorted_by_key(_temporary(list(sequence)), key, reverse, lambda values: _merge_sort_range(values, 0, len(values) - 1))
+        return result if vector is None else _like(sequence, numpy.asarray(result, dtype=vector.dtype))
+    result = _temporary(list(sequence))
+    if len(result) > 1:
+        _merge_sort_range(result, 0, len(result) - 1)
+    return result
+
+
+@_instrumentable()
+def heap_sort(sequence, arity=2, key=None, reverse=False):
     """ 
-    Returns: A newly sorted list using the O(nlog(n)) heap sort algorithm.
+    Returns: The same list, sorted in place using the O(nlog(n)) heap sort
+    algorithm. No extra list is made.
 
-    Precondition: sequence is a mutable sequence (i.e. a list)
+    Parameters: arity is the number of children of each heap node. The
+    default is a binary heap; a 4-ary or 8-ary heap is shallower and keeps
+    the children of a node next to each other in memory, which is friendlier
+    to the cache on large lists. key and reverse work like they do for the
+    built-in sorted; key is called exactly once per value.
+
+    Precondition: sequence is a mutable sequence (i.e. a list) and arity is
+    an integer >= 2
  
     ============
     Description:
     ============ 
-    Heapsort is a divide-and-conquer sorting algorithm that runs
-    in O(nlog(n)) time. This algorithm works by creating a balanced min-heap
-    data structure out of a list/sequence. [explain what a balanced min-heap is
-    here]. 
-
-    After the heap is created, the heap data structure is repeatedly
-    popped to get the minimum value (n times) and placed into a new, sorted
-    list. After each pop, the heap is resorted in order to maintain the
-    balanced, min-heap invariant (log n steps). We can see that after this, we
-    recieve a sorted list from O(nlog(n)) time complexity.
-    """
-
-    #Step 1: Make a heap out of the list with our heapify helper function
-    heap = _heapify(sequence)
-    #Step 2: Use the heap and: repeatedly extract the root value (min), maintain heap order, and
-    #append into a new list. This new list will be the heap sorted sequence that is returned.
-    sorted_list = []
-    while len(heap) > 0:
-        #Extract the min element (root) from the heap
-        sorted_list.append(heap[0])
-        heap.remove(heap[0])
-        #Case 0: If the heap has only one element left, add it to the sorted 
-        #list, and break out by returning the sorted list
-        if len(heap) == 1:
-            sorted_list.append(heap[0])
-            return sorted_list
-        #After extraction, pop the last value of the heap and add it to the top
-        heap.insert(0, heap.pop())
-        #Maintain the heap invariant
-        root = 0
-        heap_invariant = False
-        while not heap_invariant:
-            left_child = 2 * root + 1
-            right_child = 2 * root + 2
-            smallest_child = None
-            #Case 1: There isn't a left child (and hence no children) - Heap 
-            #invariant is maintained and break out
-            if left_child > len(heap) - 1:
-                heap_invariant = True
-                break
-            #Case 2: There is only a left child - Test the heap invariant on 
-            #that child only and then break out
-            if right_child > len(heap) - 1:
-                smallest_child = left_child
-                if heap[root] <= heap[smallest_child]:
-                    heap_invariant = True
-                elif heap[root] > heap[smallest_child]:
-                    _swap(heap, root, smallest_child)
-                    heap_invariant = True
-                break
-            #Case 3: There are two children - Test the heap invariant normally: 
-            #Find the smallest child and compare with root
-            if heap[left_child] <= heap[right_child]:
-                smallest_child = left_child
-            if heap[right_child] < heap[left_child]:
-                smallest_child = right_child
-            #Swap down the root if its greater than the smallest child, else 
-            #the invariant is already met
-            if heap[root] <= heap[smallest_child]:
-                heap_invariant = True
-            if heap[root] > heap[smallest_child]:
-                _swap(heap, root, smallest_child)
-                root = smallest_child
-
-
-def shell_sort(sequence):
+    Heapsort is a comparison sorting algorithm that runs in O(nlog(n)) time,
+    even in the worst case, using no extra memory. This algorithm works by
+    arranging the list into a max-heap: a tree stored in the list itself
+    where the children of the node at index i sit at indices arity*i+1 up to
+    arity*i+arity, and every node is at least as large as its children. The
+    largest value is therefore always at the root, sequence[0].
+
+    Step 1 builds the heap bottom up (Floyd's method): every parent, from the
+    last one back to the root, is "sifted down" below its larger children.
+    Most nodes are near the bottom and barely move, so this takes O(n) time
+    rather than the O(nlog(n)) of inserting values one at a time.
+
+    Step 2 repeatedly swaps the root (the max) with the last value of the
+    heap, shrinks the heap by one and sifts the new root down (log(n)
+    steps). The sorted values pile up at the end of the list from largest to
+    smallest, so after n steps the whole list is sorted.
+    """
+
+    if arity < 2:
+        raise ValueError("heap arity must be at least 2")
+    #Numeric buffers are heap sorted in place by numpy (which uses its own
+    #binary heap whatever the arity)
+    vector = _numeric_array(sequence)
+    if vector is not None and key is None:
+        _vector_sort(vector, 'heapsort', reverse)
+        return sequence
+    if key is not None or reverse:
+        _sort_keyed(sequence, 0, len(sequence) - 1, key, reverse,
+                    lambda values: _heap_sort_range(values, 0, len(values) - 1, arity))
+        return sequence
+    if len(sequence) > 1:
+        _heap_sort_range(sequence, 0, len(sequence) - 1, arity)
+    return sequence
+
+
+@_instrumentable()
+def shell_sort(sequence, key=None, reverse=False, gaps='ciura'):
     """
     Procedure: Sorts an sequence/list in-place
 
+    Parameters: key and reverse work like they do for the built-in sorted.
+    key is called exactly once per value. gaps picks the gap sequence: one
+    of 'ciura' (the default), 'tokuda', 'sedgewick' or 'pratt', or a list
+    of gaps of your own in decreasing order ending with 1.
+
     Preconditions: sequence is a mutable sequence i.e. a list
 
     ===========
@@ -436,15 +1146,44 @@ def shell_sort(sequence):
     sort is incremented. This allows us to prep large sequences by "half-sorting"
     them. The final gap is of size 1 where a normal insertion sort occurs
     with - hopefully - less steps than a typical insertion sort.
+
+    How fast shell sort is depends almost entirely on the gaps. Every
+    sequence below is generated up to the length of the list, so the first
+    pass always uses a gap that is a sizeable fraction of the list - a fixed
+    list of gaps that stops at 701 would make the first pass a slow
+    insertion sort on a list of millions.
+
+    * ciura - Marcin Ciura's experimentally found gaps 1, 4, 10, 23, 57,
+      132, 301, 701, extended by multiplying by 2.25. The best in practice.
+    * tokuda - Naoyuki Tokuda's ceil((9^k - 4^k) / (5*4^(k-1))), which grows
+      by about 2.25 too: 1, 4, 9, 20, 46, 103, ...
+    * sedgewick - Robert Sedgewick's 4^k + 3*2^(k-1) + 1: 1, 8, 23, 77, 281,
+      ... which makes the worst case O(n^(4/3)).
+    * pratt - Vaughan Pratt's 3-smooth numbers 2^p*3^q: 1, 2, 3, 4, 6, 8, 9,
+      ... Many more passes, but a worst case of O(nlog(n)^2).
+
+    Numeric buffers are sorted by numpy when it is installed. Each pass then
+    sorts all of the gap-interleaved subsequences at once: the buffer is
+    viewed as a table with gap columns, so each subsequence is a column,
+    and numpy sorts every column in place.
     """
 
-    #List of gaps for the algorithm - Marcin Ciura Default Gaps
-    gaps = [701, 301, 132, 57, 23, 10, 4, 1]
+    vector = _numeric_array(sequence)
+    if key is not None or reverse and vector is None:
+        _sort_keyed(sequence, 0, len(sequence) - 1, key, reverse, lambda values: shell_sort(values, gaps=gaps))
+        return
+    n = len(sequence)
+    #Work out the gaps for a list of this length, largest first
+    gaps = _shell_gaps(gaps, n)
+    #Numeric buffers sort each pass with numpy
+    if vector is not None:
+        _vector_shell_sort(vector, gaps, reverse)
+        return
     #Iterate through the algorithm for each gap
     for gap in gaps:
         i = gap
         #Do an insertion sort for each gap size
-        while i < len(sequence):
+        while i < n:
             temp = sequence[i]
             j = i
             while j >= gap and sequence[j - gap] > temp:
@@ -454,266 +1193,1996 @@ def shell_sort(sequence):
             i += 1
 
 
-def radix_sort(sequence, first, last, max_digits):
+@_instrumentable(compares=False)
+def radix_sort(sequence, first=0, last=None, max_digits=None, radix=256, key=None, reverse=False):
     """
-    Returns: a sorted array of positive decimal integers sequence[first..last]
-    into ascending order. Max digits = # of digits in the longest integer.
-
-    Preconditions: sequence contains only positive decimal integers.
+    Returns: a new list of the values sequence[first..last] sorted into
+    ascending order. Stable: equal keys keep their original order.
+
+    Parameters: first and last default to the whole sequence. radix is the
+    number of buckets per pass and must be a power of two (256 and 65536 are
+    good choices - fewer, bigger passes versus smaller bucket tables). key
+    is an optional function computing the (numeric) sort key of each value;
+    it is called exactly once per value. reverse sorts into descending
+    order, still stably. max_digits is no longer needed -
+    the number of passes is worked out from the data - and is only accepted
+    so older calls keep working.
+
+    Preconditions: the keys (the values themselves when key is None) are
+    integers or floats. Negative numbers are fine. If any key is a float,
+    all keys are compared as floats: -0.0 goes before 0.0, and NaN after
+    everything else (where numpy puts it too).
 
     ===========
     Description
     ===========
     The sorting algorithms that we have seen so far are use comparisons.
-    The radix sort, however, uses a series of buckets to sort each positive
+    The radix sort, however, uses a series of buckets to sort each
     integer by digits at a time. We take the rightmost digit of each number
     and use it as an index into a series of buckets, i.e. if the rightmost 
     digit is a 3, we place that integer into 3 label bucket. Extra digits
     of zero are padded for smaller integers. Applying these steps to a 
-    series iteratively, we can sort the entire sequence of positive 
+    series iteratively, we can sort the entire sequence of
     integers in O(d*n) time => O(n) time. This is the fastest sorting 
     algorithm; however, it is not the most appropriate algorithm in many 
     cases.
+
+    Computers count in binary, so instead of decimal digits we use base
+    radix digits, which we can pull out with a shift and a mask instead of
+    converting numbers to strings. Each pass is a "counting sort": count how
+    many keys fall in each bucket, turn the counts into starting positions
+    with a running (prefix) sum, then drop every value straight into its
+    final slot for that pass. No bucket lists are ever built or joined.
+
+    Negative numbers and floats do not sort correctly by their raw bits, so
+    the keys are first mapped to non-negative integers in the same order:
+    integers are shifted up by the smallest key, and floats have their IEEE
+    754 bits "flipped" (all bits of negative floats, only the sign bit of
+    positive ones) so that comparing the bits as unsigned integers gives the
+    same answer as comparing the floats.
     """
-    #Separate the digits into buckets max_digits number of times
-    for d in range(0,max_digits):
-        #Clear the buckets
-        buckets = [[], [], [], [], [], [], [], [], [], []]
-        #Separate the integers into the buckets based on each digit
-        for index in range(first, last+1):
-            digit = _get_digit(sequence[index], d)
-            buckets[digit] = buckets[digit] + [sequence[index]]
-        sequence = []
-        #Add the bucket values into the sequence and repeat
-        for b in range(0, 10):
-            sequence = sequence + buckets[b]
-    return sequence
+
+    if radix < 2 or radix & (radix - 1):
+        raise ValueError("radix must be a power of two")
+    if last is None:
+        last = len(sequence) - 1
+    #Numeric buffers are sorted by numpy's stable sort (a radix sort for
+    #small integer types) into a new buffer of the same kind
+    vector = _numeric_array(sequence)
+    if vector is not None and key is None:
+        result = numpy.sort(vector[first:last + 1], kind='stable')
+        return _like(sequence, result[::-1] if reverse else result)
+    values = _temporary(list(sequence[first:last + 1]))
+    if len(values) < 2:
+        return values
+    #Reversing before and after a stable ascending sort gives a stable
+    #descending sort
+    if reverse:
+        values.reverse()
+    #Compute every key exactly once and map it to a non-negative integer
+    keys = values if key is None else _temporary([key(value) for value in values])
+    unsigned_keys, offset = _radix_keys(keys)
+    unsigned_keys = _temporary(unsigned_keys)
+    #Plain integers can be rebuilt from their keys, so only sort the keys
+    if key is None and offset is not None and all(type(value) in _INTEGER_TYPES for value in values):
+        unsigned_keys, _ = _counting_passes(unsigned_keys, None, radix)
+        values = [unsigned_key + offset for unsigned_key in unsigned_keys]
+    else:
+        _, values = _counting_passes(unsigned_keys, values, radix)
+    if reverse:
+        values.reverse()
+    return values
 
 
-def bogo_sort(sequence):
+def radix_sort_records(records, keys, reverse=False, permutation=False, radix=256):
     """
-    Returns: A sorted list using the bogosort sorting algorithm.
+    Returns: A new list of the records sorted by several keys, the first
+    key deciding and each later key breaking ties of the ones before it.
+    Stable. If permutation is True, returns the list of record positions in
+    sorted order instead, i.e. records[p] for p in it is the sorted list.
 
-    Precondition: sequence is a mutable sequence (i.e. a list)
+    Parameters: keys is a list of the sort keys, most significant first.
+    Each is an index or a field name (record[k], so tuples, lists and dicts
+    all work) or a function computing the key from a record. reverse is a
+    bool for every key, or a list with one bool per key. radix is the
+    number of buckets per pass, as for radix_sort.
 
-    ===========
-    Decription:
-    =========== 
-    Bogosort is a joke in the computer science community. It has a
-    best case time complexity of O(1) and a worst case of O(Inf). The
-    algorithm works by shuffling the sequence completely. If the sequence is sorted,
-    return it. Otherwise, shuffle it again.
+    Precondition: records is a sequence of records, or a numpy structured
+    array whose keys are field names. In the structured array case the
+    result is a structured array (or a numpy array of positions).
 
-    There's even another variant called bogobogosort which is designed to not
-    finish until the heat death of the universe.
+    ============
+    Description:
+    ============
+    Sorting by (tenant, day, score) with a comparison sort compares whole
+    tuples O(nlog(n)) times. A least significant digit radix sort handles
+    one key at a time instead, starting from the last: a stable sort by
+    score, then a stable sort by day, then by tenant. Each stable pass keeps
+    the order of the passes before it among equal keys, so at the end the
+    records are ordered by tenant, then day, then score - in O(n) time per
+    key.
+
+    Only the order (a list of positions) is moved around by the passes,
+    never the records themselves. Integer and float columns get the same
+    counting passes as radix_sort. Any other column (strings, dates...) is
+    first replaced by the rank of each value among the column's distinct
+    values, which costs one sort of the distinct values only. A descending
+    key is counted on (largest - key), which keeps the pass stable.
+    Structured numpy arrays are sorted column by column with numpy's own
+    stable argsort, which is a radix sort for small integer types.
     """
 
-    #While the sequence is not in order, shuffle it
-    while not _in_order(sequence):
-        random.shuffle(sequence)
-    return sequence
+    keys = list(keys)
+    if isinstance(reverse, bool):
+        reverse = [reverse] * len(keys)
+    elif len(reverse) != len(keys):
+        raise ValueError("reverse needs one entry per key")
+    if radix < 2 or radix & (radix - 1):
+        raise ValueError("radix must be a power of two")
+    if numpy is not None and isinstance(records, numpy.ndarray) and records.dtype.names:
+        order = _vector_sort_records(records, keys, reverse)
+        return order if permutation else records[order]
+    order = list(range(len(records)))
+    #Least significant key first
+    for k, descending in reversed(list(zip(keys, reverse))):
+        if len(order) < 2:
+            break
+        extract = k if callable(k) else (lambda record, k=k: record[k])
+        column = [extract(records[index]) for index in order]
+        unsigned_keys = _record_keys(column)
+        if descending:
+            top = max(unsigned_keys)
+            unsigned_keys = [top - unsigned_key for unsigned_key in unsigned_keys]
+        if max(unsigned_keys) > 0:
+            _, order = _counting_passes(unsigned_keys, order, radix)
+    return order if permutation else [records[index] for index in order]
+
+
+def msd_radix_sort(sequence, lcp=False):
+    """
+    Returns: A new list of the strings in sequence in sorted order. Stable.
+    If lcp is True, returns a (strings, lcps) tuple instead, where lcps[i]
+    is the length of the longest common prefix of strings[i-1] and
+    strings[i] (and lcps[0] is 0).
 
+    Precondition: sequence holds only str, or only bytes, values
 
-def bogobogo_sort(sequence):
+    ============
+    Description:
+    ============
+    A comparison sort compares two strings from their first character on,
+    so strings sharing a long prefix (URLs, file paths) cost the whole
+    prefix on each of the O(nlog(n)) comparisons. A most significant digit
+    (MSD) radix sort looks at each character only once or so: it deals the
+    strings into buckets by their first character, then deals each bucket
+    by the second character, and so on. The buckets come out in character
+    order, with the strings that have run out of characters first.
+
+    Two tricks keep the dealing cheap. Before dealing a bucket we measure
+    the prefix all of its strings still share (with a few C-speed
+    startswith checks of doubling length) and skip straight past it, so a
+    bucket of URLs that all start "https://www.example.com/" is dealt once
+    on the character after it, not once per character. And buckets smaller
+    than _INSERTION_CUTOFF are finished by insertion sort.
+
+    The LCP array comes almost for free: two neighbouring strings from
+    different buckets share exactly the prefix that was skipped to deal
+    them, and only the neighbours within small buckets are measured.
     """
-    Returns: a sorted list using the bogobogosort sorting algorithm.
 
-    Precondition: sequence is a mutable sequence (i.e. a list)
+    values = list(sequence)
+    lcps = [0] * len(values) if lcp else None
+    #Each stack entry is a range [start, end) of values that share their
+    #first depth characters
+    stack = [(0, len(values), 0)]
+    while stack:
+        start, end, depth = stack.pop()
+        if end - start < _INSERTION_CUTOFF:
+            _sort_small_strings(values, start, end, depth, lcps)
+            continue
+        depth = _common_prefix(values, start, end, depth)
+        #Deal the strings into buckets by their character at depth
+        ended = []
+        buckets = {}
+        for index in range(start, end):
+            value = values[index]
+            if len(value) == depth:
+                ended.append(value)
+            else:
+                buckets.setdefault(value[depth:depth + 1], []).append(value)
+        #Strings that ended are all equal, and go before the others
+        values[start:start + len(ended)] = ended
+        if lcps is not None:
+            lcps[start + 1:start + len(ended)] = [depth] * max(len(ended) - 1, 0)
+        position = start + len(ended)
+        for character in sorted(buckets):
+            bucket = buckets[character]
+            values[position:position + len(bucket)] = bucket
+            if lcps is not None and position > start:
+                lcps[position] = depth
+            if len(bucket) > 1:
+                stack.append((position, position + len(bucket), depth + 1))
+            position += len(bucket)
+    return (values, lcps) if lcp else values
+
+
+def string_quick_sort(sequence, lcp=False):
+    """
+    Returns: The same list, sorted in place. If lcp is True, returns a
+    (sequence, lcps) tuple instead, with the LCP array described in
+    msd_radix_sort.
 
-    ===========
-    Decription: 
-    ===========
-    Bogobogo sort is bogosort taken to the next level. The time complexity 
-    of the algorithm is O(Infinity). For a very large sized list, the 
-    algorithm will NOT finish until the heat death of the universe which 
-    makes this algorithm impossible to complete. 
-    
-    A joke taken too far.
+    Precondition: sequence is a mutable sequence (i.e. a list) holding only
+    str, or only bytes, values
+
+    ============
+    Description:
+    ============
+    This is Bentley and Sedgewick's multikey quicksort (three-way radix
+    quicksort). It is a quick sort that partitions on one character at a
+    time instead of on whole strings: pick a pivot character at position
+    depth, and split the range into strings whose character there is less
+    than, equal to and greater than it. The less and greater parts are
+    partitioned again on the same character; the equal part moves on to
+    the next character. No string is ever compared from the start again.
+
+    Unlike msd_radix_sort it needs no buckets, so it sorts in place with
+    little extra memory, and it does well with large alphabets (unicode)
+    where most buckets would be empty. The shared prefix of a range is
+    skipped the same way, and small ranges are finished by insertion sort.
     """
-    while not _in_order(sequence):
-        counter = 1
-        while counter < len(sequence) - 1:
-            #Shuffle the sequence from the beginning to the counter
-            temp_array = random.shuffle(sequence[:counter])
-            #If it's in order, increment the counter and shuffle again
-            if _in_order(temp_array):
-                counter += 1
-            #Else, start over
+
+    lcps = [0] * len(sequence) if lcp else None
+    stack = [(0, len(sequence), 0)]
+    while stack:
+        start, end, depth = stack.pop()
+        if end - start < _INSERTION_CUTOFF:
+            _sort_small_strings(sequence, start, end, depth, lcps)
+            continue
+        depth = _common_prefix(sequence, start, end, depth)
+        #Median of three characters as the pivot. Strings that have ended
+        #have character -1, below every real character.
+        pivot = _median_of_three(_character_code(sequence[start], depth),
+                                 _character_code(sequence[(start + end) // 2], depth),
+                                 _character_code(sequence[end - 1], depth))
+        #Three-way partition: [start, lower) less, [lower, upper] equal and
+        #(upper, end) greater than the pivot character
+        lower = index = start
+        upper = end - 1
+        while index <= upper:
+            code = _character_code(sequence[index], depth)
+            if code < pivot:
+                _swap(sequence, lower, index)
+                lower += 1
+                index += 1
+            elif code > pivot:
+                _swap(sequence, index, upper)
+                upper -= 1
             else:
-                counter = 1
-        return temp_array
+                index += 1
+        #Neighbours from different parts share exactly depth characters
+        if lcps is not None:
+            if lower > start:
+                lcps[lower] = depth
+            if upper + 1 < end:
+                lcps[upper + 1] = depth
+        stack.append((start, lower, depth))
+        stack.append((upper + 1, end, depth))
+        #The equal part moves on to the next character, unless its strings
+        #have all ended - then they are equal and done
+        if pivot < 0:
+            if lcps is not None:
+                lcps[lower + 1:upper + 1] = [depth] * (upper - lower)
+        else:
+            stack.append((lower, upper + 1, depth + 1))
+    return (sequence, lcps) if lcp else sequence
 
 
-#== Helper Functions =====================================================
-def _swap(sequence, a, b):
+def parallel_sort(sequence, workers=None, threshold=_PARALLEL_THRESHOLD, key=None, reverse=False):
     """
-    Procedure: Swaps the values of a and b in a mutable list called sequence.
+    Returns: The same sequence, sorted in place using several processes.
+    Stable for lists.
 
-    Note: I'm not sure if this is worth making a helper but I might as well
-    for readability I guess.
+    Parameters: workers is the number of worker processes (default: one per
+    CPU). Sequences shorter than threshold are sorted in this process, since
+    starting workers and moving data to them costs more than it saves.
+    key and reverse work like they do for the built-in sorted. The keys are
+    computed here, once per value, so key does not need to be picklable.
+
+    Precondition: sequence is a mutable sequence (i.e. a list or a numeric
+    buffer) of values that can be pickled.
+
+    ============
+    Description:
+    ============
+    Every other sort in this module runs on one CPU core. A parallel sort
+    splits the work in two phases:
+
+    1. Split the input into one chunk per worker and sort every chunk at the
+       same time in a different process with the sorts above.
+    2. Merge the sorted chunks. Merging on one core would undo most of the
+       gain, so the merge is split too: we pick "splitter" values from a
+       sample of the sorted chunks, and cut every chunk at each splitter
+       with a binary search. Everything between two splitters, across all
+       chunks, is one independent merge job whose output position is known
+       in advance, so the jobs can run in parallel as well.
+
+    Python processes do not share memory, so values normally have to be
+    pickled to and from the workers. For numeric buffers (with numpy and
+    Python 3.8+) the data is instead copied once into shared memory, and
+    the workers sort and merge it there directly.
     """
 
-    #Swap the sequence values in one line!
-    sequence[a], sequence[b] = sequence[b], sequence[a]
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    vector = _numeric_array(sequence)
+    if key is not None or (reverse and vector is None):
+        _sort_keyed(sequence, 0, len(sequence) - 1, key, reverse,
+                    lambda values: parallel_sort(values, workers, threshold))
+        return sequence
+    try:
+        from concurrent.futures import ProcessPoolExecutor
+    except ImportError:
+        #Python 2 has no process pools in the standard library
+        workers = 1
+    #Small inputs or a single worker: just sort here
+    if workers < 2 or len(sequence) < max(threshold, 2 * workers):
+        if vector is not None:
+            _vector_sort(vector, 'stable', reverse)
+        elif len(sequence) > 1:
+            values = sequence if isinstance(sequence, list) else list(sequence)
+            _merge_sort_range(values, 0, len(values) - 1)
+            if values is not sequence:
+                _write_back(sequence, 0, values)
+        return sequence
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        if vector is not None and _shared_memory() is not None:
+            _parallel_sort_shared(vector, workers, executor)
+        else:
+            _write_back(sequence, 0, _parallel_sort_pickled(sequence, workers, executor))
+    if vector is not None and reverse:
+        vector[:] = vector[::-1].copy()
+    return sequence
 
 
-def _bubble_up(sequence, a):
+def external_sort(iterable, key=None, reverse=False, memory_limit=_EXTERNAL_MEMORY,
+                  fan_in=_EXTERNAL_FAN_IN, temp_dir=None, run_format='pickle'):
     """
-    Procedure moves the value at position index into its sorted position 
-    in sequence[1...a]. This is a helper function for algorithms such as 
-    bubble_sort.
+    Returns: A generator that yields the values of iterable in sorted order,
+    without ever holding all of them in memory. Stable.
+
+    Parameters: key and reverse work like they do for the built-in sorted.
+    memory_limit is roughly the most bytes to hold in memory at a time. It
+    is approximate: values are measured with sys.getsizeof, and a run is
+    read until its values fill a third of memory_limit, since merge_sort
+    holds a copy of the run and its decorated keys while sorting it. fan_in
+    is the most runs merged at once. temp_dir is where the temporary run
+    files go (default: the system temporary directory).
+    run_format is 'pickle' - a compact binary format for any picklable
+    values - or 'lines' - one UTF-8 line per value, for strings that do not
+    contain a newline.
+
+    Precondition: iterable is any iterable, e.g. an open file (whose lines
+    are the values) or a generator. fan_in >= 2 and memory_limit >= 1;
+    bad arguments raise a ValueError at once, before any value is read.
 
-    Preconditon: sequence[1...a] is a sorted mutable sequence (i.e. a list)
+    ============
+    Description:
+    ============
+    All of the other sorts need the whole list in memory. An external sort
+    is for data that does not fit: a 100 GB log file on a 16 GB machine.
+
+    1. Read values from the input until a third of the memory budget is
+       full (sorting them needs the other two thirds), sort them in memory
+       with merge_sort and write them out to a temporary file. Each file is
+       a sorted "run". Repeat until the input is used up.
+    2. Merge the runs, reading one value at a time from each of them and
+       keeping the smallest current value of every run in a heap (see
+       _heap_merge). If there are more than fan_in runs, groups of fan_in
+       runs are first merged into longer runs on disk, so we never have
+       too many files open at once.
+
+    The final merge happens lazily as the generator is consumed, so the
+    sorted output can be streamed straight into another file. The temporary
+    files are removed when the generator finishes or is closed. If all of
+    the input fits in one run, nothing is written to disk at all.
     """
 
-    #Initialize the n sized loop counter
-    index = 0
-    while index < len(sequence[:a]):
-        #Swap positions if the value above index is less
-        if sequence[index + 1] < sequence[index]:
-            _swap(sequence, index + 1, index)
-        index += 1
+    if run_format not in _RUN_FORMATS:
+        raise ValueError("run_format must be 'pickle' or 'lines'")
+    if fan_in < 2:
+        raise ValueError("fan_in must be at least 2")
+    if memory_limit < 1:
+        raise ValueError("memory_limit must be at least 1 byte")
+    #Checked here, so that bad arguments raise now and not on the first next()
+    return _external_sort(iterable, key, reverse, max(memory_limit // _EXTERNAL_COPIES, 1), fan_in, temp_dir,
+                          run_format)
 
 
-def _push_down(sequence, a):
+def sort_record_file(path, record_size, key_offset=0, key_format='<Q', algorithm='quick', reverse=False):
     """
-    Procedure moves the value at position a into its sorted position in
-    sequence[0...a-1]. This is a helper function for algorithms such as insertion
+    Procedure: Sorts the fixed-width binary records of the file at path in
+    place, by a numeric key field, without reading the file into memory.
+
+    Parameters: record_size is the size of every record in bytes. The key
+    is the struct format key_format (default '<Q', a little-endian unsigned
+    64 bit integer) starting key_offset bytes into each record. algorithm
+    is 'quick' (the default), 'heap' or 'radix'. reverse sorts into
+    descending order.
+
+    Precondition: the file size is a multiple of record_size, and the key
+    field fits inside a record.
+
+    ============
+    Description:
+    ============
+    Reading a file of records into a list of tuples costs many times the
+    file size in memory: every record becomes several python objects. Here
+    the file is memory-mapped instead: the operating system makes the file
+    look like one big array of bytes, reads pages of it in when they are
+    touched and writes them back when they change. The sort then runs on
+    the mapped records directly, so the only memory it uses is the page
+    cache, which the system can always reclaim - a file twice the size of
+    memory still sorts.
+
+    'quick' and 'heap' sort in place with the introsort and heap sort of
+    this module (numpy's when it is installed, run on a numpy.memmap of the
+    records), using O(log(n)) extra memory. Heap sort is the safer choice
+    for files much bigger than memory: quick sort reads the file in long
+    sequential sweeps, which the page cache likes, but heap sort has a
+    guaranteed O(nlog(n)) worst case. 'radix' sorts the keys alone in
+    memory (radix_sort, or numpy's stable argsort) to get the order of the
+    records, and then moves every record to its place in the file by
+    following the cycles of that order. It is stable and O(n), but holds
+    the keys and the order in memory. With numpy they are arrays, at about
+    32 bytes per record at the peak of the sort; without it they are lists
+    of python ints, which cost up to about 160 bytes per record.
+    """
+
+    if algorithm not in ('quick', 'heap', 'radix'):
+        raise ValueError("algorithm must be 'quick', 'heap' or 'radix'")
+    key_size = struct.calcsize(key_format)
+    if key_offset < 0 or key_offset + key_size > record_size:
+        raise ValueError("the key field must fit inside a record")
+    size = os.path.getsize(path)
+    if size % record_size:
+        raise ValueError("file size %d is not a multiple of the record size %d" % (size, record_size))
+    count = size // record_size
+    if count < 2:
+        return
+    if numpy is not None:
+        dtype = numpy.dtype({'names': ['key'], 'formats': [key_format], 'offsets': [key_offset],
+                             'itemsize': record_size})
+        records = numpy.memmap(path, dtype=dtype, mode='r+')
+        #Assigning structured records copies their fields only, so records
+        #are moved through a view of them as plain bytes
+        raw = records.view(numpy.dtype((numpy.void, record_size)))
+        try:
+            if algorithm == 'radix':
+                _apply_cycles(raw, _vector_sort_records(records, ['key'], [reverse]))
+            else:
+                #Only the key is a field, so only the key is compared; the
+                #rest of each record is padding that the sort moves with it
+                records.sort(kind='quicksort' if algorithm == 'quick' else 'heapsort')
+                if reverse:
+                    _reverse_records(raw)
+            records.flush()
+        finally:
+            del raw, records
+        return
+    with open(path, 'r+b') as handle:
+        mapped = mmap.mmap(handle.fileno(), 0)
+        try:
+            records = _RecordFile(mapped, record_size, key_offset, key_format)
+            if algorithm == 'radix':
+                keys = [records.key(index) for index in range(count)]
+                _apply_cycles(records, radix_sort(list(range(count)), key=keys.__getitem__, reverse=reverse))
+            else:
+                if algorithm == 'quick':
+                    _introsort(records, 0, count - 1)
+                else:
+                    _heap_sort_range(records, 0, count - 1)
+                if reverse:
+                    _reverse_records(records)
+            mapped.flush()
+        finally:
+            mapped.close()
+
+
+def merge_iter(*iterables, **options):
+    """
+    Returns: A generator that merges any number of sorted iterables into
+    one sorted stream, pulling one value at a time. Stable: equal values
+    come out in the order of the iterables they came from.
+
+    Parameters: the keyword arguments key and reverse work like they do for
+    the built-in sorted, and say how the iterables are sorted.
+
+    Precondition: every iterable is already sorted (by key, if given, and in
+    descending order if reverse is True).
+
+    ============
+    Description:
+    ============
+    This is the merge step of merge sort, generalized from two lists to k
+    iterables of any kind - lists, open files, generators over network
+    pages, or the output of other merges. A heap holds the current value of
+    each iterable; the smallest one is yielded and replaced by the next
+    value from the same iterable in O(log(k)) time. Only k values are held
+    in memory at once, however long the iterables are, and nothing is read
+    ahead of what has been asked for: stop iterating whenever you have
+    enough and the rest of the input is never touched.
+    """
+
+    key = options.pop('key', None)
+    reverse = options.pop('reverse', False)
+    if options:
+        raise TypeError("merge_iter() got unexpected keyword arguments %s" % ', '.join(sorted(options)))
+    return _heap_merge(iterables, key, reverse)
+
+
+def sort(sequence, key=None, reverse=False, low_memory=False, report=None):
+    """
+    Returns: The same sequence, sorted in place with whichever of the sorts
+    in this module suits it best (see sort_plan).
+
+    Parameters: key and reverse work like they do for the built-in sorted;
+    key is called exactly once per value. low_memory asks for a sort that
+    needs no extra memory. If report is a dict, it is filled in with the
+    plan that was used, so callers can see (and log) which path was taken.
+
+    Precondition: sequence is a mutable sequence (i.e. a list). The sort is
+    stable when a key is given; without one, use merge_sort if equal values
+    must keep their order.
+
+    ============
+    Description:
+    ============
+    There is no single best sorting algorithm - each of the sorts above wins
+    on some kind of input. This function looks at the input first and then
+    picks a sort for it, like a doctor making a diagnosis. See sort_plan
+    for what is looked at and how the choice is made.
+    """
+
+    vector = _numeric_array(sequence)
+    if vector is not None and key is None:
+        plan = {'algorithm': 'numpy', 'reason': 'numeric buffer', 'length': len(vector)}
+        _vector_sort(vector, 'stable', reverse)
+    elif key is not None:
+        #Compute the keys once, profile them, and sort positions by them
+        values = list(sequence)
+        keys = [key(value) for value in values]
+        plan = sort_plan(keys, low_memory)
+        order = list(range(len(values)))
+        _sort_with(plan['algorithm'], order, keys.__getitem__, reverse)
+        _write_back(sequence, 0, [values[index] for index in order])
+    else:
+        plan = sort_plan(sequence, low_memory)
+        values = sequence if isinstance(sequence, list) else list(sequence)
+        _sort_with(plan['algorithm'], values, None, reverse)
+        if values is not sequence:
+            _write_back(sequence, 0, values)
+    if report is not None:
+        report.update(plan)
+    return sequence
+
+
+def sort_plan(sequence, low_memory=False):
+    """
+    Returns: A dict describing sequence and the sort that sort() would use
+    on it. The 'algorithm' entry is one of 'numpy', 'insertion', 'heap',
+    'merge', 'quick' or 'radix', and 'reason' says why in words. The other
+    entries are the measurements the choice was based on.
+
+    ============
+    Description:
+    ============
+    Profiling must be cheap compared to sorting, so every measurement is
+    O(n) or less:
+    * the length, and the type of the values (from a sample),
+    * the number of "descents" and "ascents" (places where a value is
+      smaller or bigger than the one before it), counted like _in_order
+      does and given up on as soon as there are too many of both to call
+      the list nearly sorted or nearly reversed,
+    * the share of distinct values in an evenly spaced sample,
+    * for integers, the number of bits needed for max - min.
+    The rules, in order:
+    1. numeric buffers go to numpy,
+    2. tiny lists go to insertion sort, which has no overhead,
+    3. low_memory goes to heap sort, which needs no extra memory,
+    4. nearly sorted (or reversed) lists go to merge sort, which finds the
+       sorted runs and merges them in close to O(n) time,
+    5. lists with many duplicates go to quick sort, whose three-way
+       partition removes each distinct value after one pass,
+    6. integers in a small range go to radix sort, in O(n) time,
+    7. anything else goes to quick sort (introsort).
+    """
+
+    length = len(sequence)
+    plan = {'length': length}
+    if _numeric_array(sequence) is not None:
+        plan.update(algorithm='numpy', reason='numeric buffer')
+        return plan
+    if length <= _TINY_SORT:
+        plan.update(algorithm='insertion', reason='tiny input')
+        return plan
+    if low_memory:
+        plan.update(algorithm='heap', reason='low memory requested')
+        return plan
+    #Count descents and ascents, stopping once the list is clearly neither
+    #nearly sorted nor nearly reversed (merge sort handles both)
+    limit = length // _NEARLY_SORTED
+    descents = ascents = 0
+    for index in range(1, length):
+        if sequence[index] < sequence[index - 1]:
+            descents += 1
+        elif sequence[index - 1] < sequence[index]:
+            ascents += 1
+        if descents > limit and ascents > limit:
+            break
+    plan['descents'] = descents
+    if min(descents, ascents) <= limit:
+        plan.update(algorithm='merge', reason='nearly sorted (%d descents, %d ascents)' % (descents, ascents))
+        return plan
+    #Share of distinct values in an evenly spaced sample
+    sample = [sequence[index] for index in range(0, length, max(length // _PROFILE_SAMPLE, 1))]
+    plan['type'] = _sample_type(sample)
+    try:
+        plan['distinct'] = float(len(set(sample))) / len(sample)
+    except TypeError:
+        plan['distinct'] = None
+    if plan['distinct'] is not None and plan['distinct'] < _FEW_DISTINCT:
+        plan.update(algorithm='quick', reason='many duplicates (three-way partition)')
+        return plan
+    #Integers in a small range: radix sort needs one or two passes
+    if plan['type'] == 'int' and all(type(value) in _INTEGER_TYPES for value in sequence):
+        plan['range_bits'] = (max(sequence) - min(sequence)).bit_length()
+        if plan['range_bits'] <= 16 or (plan['range_bits'] <= 32 and length >= 1 << 20):
+            plan.update(algorithm='radix', reason='integers in a %d bit range' % plan['range_bits'])
+            return plan
+    plan.update(algorithm='quick', reason='general input (introsort)')
+    return plan
+
+
+def argsort(sequence, key=None, reverse=False, algorithm=None):
+    """
+    Returns: The permutation that sorts sequence: a compact array of the
+    positions of its values in sorted order, so that sequence[p] for p in
+    it is the sorted list. Stable. The array is an array.array('l'), or a
+    numpy array of positions if sequence is a numeric buffer.
+
+    Parameters: key and reverse work like they do for the built-in sorted;
+    key is called exactly once per value. algorithm names the sort to use -
+    'insertion', 'selection', 'bubble', 'shell', 'quick', 'merge', 'heap' or
+    'radix' - or is None to let sort_plan pick one from the keys.
+
+    Precondition: sequence is a sequence (i.e. a list); it is not changed.
+
+    ============
+    Description:
+    ============
+    Sorting moves the values themselves around. When several parallel
+    columns must all be put in the order of one of them, or the values are
+    big records, it is cheaper to sort positions instead: the positions
+    0...n-1 are sorted by the key of the value at each position, and the
+    resulting permutation can be applied to any number of sequences with
+    apply_permutation. The positions are stored in an array of machine
+    integers, a few bytes each, rather than a list of python ints.
+    """
+
+    vector = _numeric_array(sequence)
+    if vector is not None and key is None:
+        if reverse:
+            #Sorting backwards and reading the result backwards gives a
+            #stable descending order
+            return len(vector) - 1 - numpy.argsort(vector[::-1], kind='stable')[::-1]
+        return numpy.argsort(vector, kind='stable')
+    keys = list(sequence) if key is None else [key(value) for value in sequence]
+    if algorithm is None:
+        algorithm = sort_plan(keys)['algorithm']
+    order = list(range(len(keys)))
+    #Sorting positions by key makes every engine stable (see _sorted_by_key)
+    _sort_with(algorithm, order, keys.__getitem__, reverse)
+    return array.array('l', order)
+
+
+def apply_permutation(permutation, *sequences):
+    """
+    Procedure: Reorders every one of sequences in place so that its value
+    at index i is the one that was at permutation[i] - the order argsort
+    returns. Returns nothing.
+
+    Precondition: permutation is a permutation of range(n), e.g. the result
+    of argsort, and every sequence is a mutable sequence of length n.
+    Raises a ValueError otherwise.
+
+    ============
+    Description:
+    ============
+    Building the reordered sequence as a new list and copying it back would
+    briefly double the memory of every sequence. Instead each sequence is
+    reordered by following the cycles of the permutation (see
+    _apply_cycles): every value is moved exactly once, and the only extra
+    memory is one byte per position to mark the ones already done. Numeric
+    buffers are reordered by numpy in one vectorized step instead.
+    """
+
+    length = len(permutation)
+    #A repeated or out of range position would send the cycles round forever
+    seen = bytearray(length)
+    for position in permutation:
+        if not 0 <= position < length or seen[position]:
+            raise ValueError("not a permutation of range(%d)" % length)
+        seen[position] = 1
+    for sequence in sequences:
+        if len(sequence) != length:
+            raise ValueError("every sequence must have the same length as the permutation")
+    for sequence in sequences:
+        vector = _numeric_array(sequence)
+        if vector is not None:
+            vector[:] = vector[numpy.asarray(permutation, dtype=numpy.intp)]
+        else:
+            _apply_cycles(sequence, permutation)
+
+
+def bogo_sort(sequence):
+    """
+    Returns: A sorted list using the bogosort sorting algorithm.
+
+    Precondition: sequence is a mutable sequence (i.e. a list)
+
+    ===========
+    Decription:
+    =========== 
+    Bogosort is a joke in the computer science community. It has a
+    best case time complexity of O(1) and a worst case of O(Inf). The
+    algorithm works by shuffling the sequence completely. If the sequence is sorted,
+    return it. Otherwise, shuffle it again.
+
+    There's even another variant called bogobogosort which is designed to not
+    finish until the heat death of the universe.
+    """
+
+    #While the sequence is not in order, shuffle it
+    while not _in_order(sequence):
+        random.shuffle(sequence)
+    return sequence
+
+
+def bogobogo_sort(sequence):
+    """
+    Returns: a sorted list using the bogobogosort sorting algorithm.
+
+    Precondition: sequence is a mutable sequence (i.e. a list)
+
+    ===========
+    Decription: 
+    ===========
+    Bogobogo sort is bogosort taken to the next level. The time complexity 
+    of the algorithm is O(Infinity). For a very large sized list, the 
+    algorithm will NOT finish until the heat death of the universe which 
+    makes this algorithm impossible to complete. 
+    
+    A joke taken too far.
+    """
+    while not _in_order(sequence):
+        counter = 1
+        while counter < len(sequence) - 1:
+            #Shuffle the sequence from the beginning to the counter
+            temp_array = random.shuffle(sequence[:counter])
+            #If it's in order, increment the counter and shuffle again
+            if _in_order(temp_array):
+                counter += 1
+            #Else, start over
+            else:
+                counter = 1
+        return temp_array
+
+
+#== Selection Algorithms =================================================
+def nth_element(sequence, n, key=None, reverse=False):
+    """
+    Returns: The value that would be at index n if sequence were sorted, in
+    O(n) average time. The sequence is rearranged in place so that this
+    value is at index n, every value before it is smaller or equal and
+    every value after it is larger or equal.
+
+    Parameters: key and reverse work like they do for the built-in sorted;
+    key is called exactly once per value. n may be negative, like an index.
+
+    Precondition: sequence is a mutable sequence (i.e. a list)
+
+    ============
+    Description:
+    ============
+    Sorting a whole list just to read its median throws away most of the
+    work. Quickselect (C.A.R. Hoare) partitions the list around a pivot
+    exactly like quick sort, but then only carries on in the side that
+    holds index n - the other side is already on the right side of the
+    answer. The ranges shrink geometrically, n + n/2 + n/4 + ... = O(n).
+
+    Like quick_sort, this is an "introselect": it uses the same median of
+    three (or ninther) pivots and three-way partition, and if the ranges
+    still have not shrunk after 2*log(n) partitions, the range left is heap
+    sorted, so the worst case is O(nlog(n)) rather than O(n^2).
+    """
+
+    length = len(sequence)
+    if n < 0:
+        n += length
+    if not 0 <= n < length:
+        raise IndexError("nth_element index out of range")
+    _select_into(sequence, [n], key, reverse, 0)
+    return sequence[n]
+
+
+def quickselect(sequence, k, key=None, reverse=False):
+    """
+    Returns: The value that would be at index k if sequence were sorted, in
+    O(n) average time, leaving sequence unchanged. See nth_element.
+
+    Precondition: sequence is a sequence (i.e. a list)
+    """
+
+    vector = _numeric_array(sequence)
+    return nth_element(list(sequence) if vector is None else vector.copy(), k, key, reverse)
+
+
+def partial_sort(sequence, k, key=None, reverse=False):
+    """
+    Returns: The same sequence, rearranged in place so that its first k
+    values are the k smallest values in sorted order. The order of the rest
+    is undefined. Runs in O(n + klog(k)) average time.
+
+    Parameters: key and reverse work like they do for the built-in sorted;
+    key is called exactly once per value. With a key, equal keys keep their
+    original order within the first k values.
+
+    Precondition: sequence is a mutable sequence (i.e. a list)
+
+    ============
+    Description:
+    ============
+    First select the k-th smallest value as in nth_element, which leaves
+    the k smallest values in front of it in some order, then sort only
+    those k values.
+    """
+
+    length = len(sequence)
+    k = max(0, min(k, length))
+    if k > 0:
+        _select_into(sequence, [k - 1] if k < length else [], key, reverse, k)
+    return sequence
+
+
+def select_many(sequence, ranks, key=None, reverse=False):
+    """
+    Returns: A list of the values that would be at each index in ranks if
+    sequence were sorted, in the order ranks are given. The sequence is
+    rearranged in place so that every one of those indices holds that value,
+    as nth_element does for a single index.
+
+    Parameters: key and reverse work like they do for the built-in sorted;
+    key is called exactly once per value. ranks may be negative, like
+    indices.
+
+    Precondition: sequence is a mutable sequence (i.e. a list)
+
+    ============
+    Description:
+    ============
+    Calling nth_element once per rank would walk the list once per rank.
+    Instead, after each partition, the sorted list of ranks is split in two
+    (with a binary search) and each side of the partition carries on with
+    only the ranks that fall in it. Ranks that land among the values equal
+    to the pivot are done. Selecting m ranks at once takes O(nlog(m)) time.
+    """
+
+    length = len(sequence)
+    positions = []
+    for rank in ranks:
+        if rank < 0:
+            rank += length
+        if not 0 <= rank < length:
+            raise IndexError("select_many rank out of range")
+        positions.append(rank)
+    _select_into(sequence, sorted(set(positions)), key, reverse, 0)
+    return [sequence[rank] for rank in positions]
+
+
+def percentiles(iterable, percents, key=None):
+    """
+    Returns: A list of the values at each percentile in percents (numbers
+    from 0 to 100) of the values in iterable, in the order given. Uses the
+    nearest-rank method, so every answer is one of the values itself.
+
+    Parameters: key works like it does for the built-in sorted and is
+    called exactly once per value.
+
+    Precondition: iterable is not empty. Numeric buffers are copied into a
+    new buffer; other iterables into a list.
+
+    ============
+    Description:
+    ============
+    The p-th percentile by nearest rank is the value at index
+    ceil(p/100 * n) - 1 of the sorted values (the minimum for p = 0). All
+    of the percentiles are found together by select_many, in linear time
+    for a handful of percentiles rather than the O(nlog(n)) of a sort.
+    """
+
+    vector = _numeric_array(iterable)
+    values = list(iterable) if vector is None else vector.copy()
+    length = len(values)
+    if length == 0:
+        raise ValueError("percentiles of an empty sequence")
+    ranks = []
+    for percent in percents:
+        if not 0 <= percent <= 100:
+            raise ValueError("percentiles must be between 0 and 100")
+        #Ceiling division: -(-a // b)
+        ranks.append(max(0, int(-(-percent * length // 100)) - 1))
+    return select_many(values, ranks, key)
+
+
+def top_k(iterable, k, key=None, largest=True):
+    """
+    Returns: A list of the k largest values of iterable (or the k smallest
+    if largest is False), best first, in O(nlog(k)) time and O(k) memory.
+    Values with equal keys keep their original order.
+
+    Parameters: key works like it does for the built-in sorted and is
+    called exactly once per value.
+
+    Precondition: iterable is any iterable - it is read once, so it can be
+    a generator or a stream too big to hold in memory.
+
+    ============
+    Description:
+    ============
+    Keep a heap of the best k values seen so far with the worst of them at
+    the root: a min-heap for the k largest, a max-heap for the k smallest.
+    Each new value only has to beat the root to get in, in which case it
+    replaces the root and is sifted down in O(log(k)). Heap entries carry
+    the position of their value, so ties go to the value seen first and
+    the values themselves are never compared.
+    """
+
+    if k <= 0:
+        return []
+    heap = []
+    for index, value in enumerate(iterable):
+        sort_key = value if key is None else key(value)
+        entry = (sort_key if largest else _Reversed(sort_key), -index, value)
+        if len(heap) < k:
+            heapq.heappush(heap, entry)
+        elif heap[0] < entry:
+            heapq.heapreplace(heap, entry)
+    #Entries go from the root (worst) to best; sort so the best come first
+    heap.sort(reverse=True)
+    return [entry[2] for entry in heap]
+
+
+#== Helper Functions =====================================================
+def _swap(sequence, a, b):
+    """
+    Procedure: Swaps the values of a and b in a mutable list called sequence.
+
+    Note: I'm not sure if this is worth making a helper but I might as well
+    for readability I guess.
+    """
+
+    #Swap the sequence values in one line!
+    sequence[a], sequence[b] = sequence[b], sequence[a]
+
+
+def _bubble_up(sequence, a):
+    """
+    Procedure moves the value at position index into its sorted position 
+    in sequence[1...a]. This is a helper function for algorithms such as 
+    bubble_sort.
+
+    Preconditon: sequence[1...a] is a sorted mutable sequence (i.e. a list)
+    """
+
+    #Initialize the n sized loop counter
+    index = 0
+    while index < a:
+        #Swap positions if the value above index is less
+        if sequence[index + 1] < sequence[index]:
+            _swap(sequence, index + 1, index)
+        index += 1
+
+
+def _push_down(sequence, a):
+    """
+    Procedure moves the value at position a into its sorted position in
+    sequence[0...a-1]. This is a helper function for algorithms such as insertion
     sort.
 
-    Precondition: sequence[0...a-1] is a sorted mutable sequence (i.e. a list)
+    Precondition: sequence[0...a-1] is a sorted mutable sequence (i.e. a list)
+    """
+
+    #Initialize the n sized loop counter
+    index = a
+    #Swap positions while the value below index is greater. Once it is not,
+    #the value is in place - everything further down is smaller still.
+    while index > 0 and sequence[index] < sequence[index - 1]:
+        _swap(sequence, index - 1, index)
+        index += -1
+
+
+def _find_min(sequence):
+    """
+    Returns: Index position of the minimum value of a list.
+    this is a helper function for algorithms such as selection sort.
+    Runs in O(n) time.
+    """
+
+    #Initialize loop counter and return index
+    index = 0
+    counter = 0
+    while counter < len(sequence):
+        #If the "scouting" counter is less than the return index, set index equal to the counter
+        if sequence[counter] < sequence[index]:
+            index = counter
+        counter += 1
+    #Return the min index position
+    return index
+
+
+def _partition(sequence, start, end):
+    """
+    Returns: Index position of the pivot after the partitioning
+
+    Preconditions: sequence is a mutable sequence (i.e. a list) and pivot and end
+    are valid index positions of the sequence.
+
+    ============
+    Description:
+    ============ 
+    Partitions the sequence[start...end] around the pivot - sequence[start] -
+    where the pivot is the first position in the unpartitioned list.
+    """
+
+    #Initialize the pivot value and loop counters that will iterate towards completion of the algorithm
+    #i is the end of the first partition range and j is before the start of the second partition range
+    #such that [start.....i-1 | pivot or i | j ...... end] will be the result of the procedure.
+    i = start
+    j = end
+    pivot = sequence[i]  #at this point sequence[i] is the same as sequence[start]
+    while i < j:
+        #If the value after i is greater than the pivot, swap j and the value and decrease the j counter
+        #by 1 (i.e. put that value after the pivot as far as possible)
+        if sequence[i + 1] >= pivot:
+            _swap(sequence, i + 1, j)
+            j = j - 1
+        #Else, swap the value and the i position value (i.e. put the value before the pivot)
+        else:
+            _swap(sequence, i + 1, i)
+            i = i + 1
+    return i
+
+
+def _sorted_by_key(values, key, reverse, engine):
+    """
+    Returns: A new list of the values in the list values, sorted by key (or
+    by value if key is None) into ascending order, or descending order if
+    reverse is True. Stable, whatever engine is used.
+
+    Parameters: engine is a procedure that sorts a list in place, i.e. one of
+    the sorts in this module without key or reverse.
+
+    ============
+    Description:
+    ============ 
+    Calling key inside a sort would call it O(nlog(n)) times - twice per
+    comparison. Instead we "decorate-sort-undecorate": compute every key
+    once, sort (key, position) pairs with the engine, and then read the
+    values back in the order of the sorted positions. Because no two
+    positions are equal, the values themselves are never compared and equal
+    keys come out in their original order, so even quick sort and heap sort
+    become stable. For reverse, the positions are negated so that reversing
+    the sorted pairs at the end still leaves equal keys in their original
+    order.
+
+    Without a key there is nothing to decorate: reversing the list before
+    and after an ascending sort gives a stable descending sort.
+    """
+
+    if len(values) < 2:
+        return list(values)
+    if key is None:
+        result = _temporary(values[::-1])
+        engine(result)
+        result.reverse()
+        return result
+    step = -1 if reverse else 1
+    decorated = _temporary([(key(value), index * step) for index, value in enumerate(values)])
+    engine(decorated)
+    if reverse:
+        decorated.reverse()
+    return [values[index * step] for _, index in decorated]
+
+
+def _sort_keyed(sequence, start, end, key, reverse, engine):
+    """
+    Procedure: Sorts sequence[start...end] in place by key and reverse, as
+    described in _sorted_by_key, using engine to do the sorting.
+    """
+
+    result = _sorted_by_key(_temporary(list(sequence[start:end + 1])), key, reverse, engine)
+    _write_back(sequence, start, result)
+
+
+def _write_back(sequence, start, values):
+    """
+    Procedure: Writes the list values over sequence[start...], in place.
+
+    ============
+    Description:
+    ============
+    Numeric buffers only take slices of their own kind, so a list cannot
+    simply be assigned to a slice of them. Their numpy view takes a list;
+    without numpy, an array.array (or a memoryview) gets an array.array of
+    the same typecode instead.
+    """
+
+    vector = _numeric_array(sequence)
+    if vector is not None:
+        sequence = vector
+    elif isinstance(sequence, array.array):
+        values = array.array(sequence.typecode, values)
+    elif isinstance(sequence, memoryview):
+        values = array.array(sequence.format, values)
+    sequence[start:start + len(values)] = values
+
+
+def _sort_with(algorithm, values, key, reverse):
+    """
+    Procedure: Sorts the list values in place by key and reverse with the
+    sort() engine (or argsort algorithm) called algorithm.
+    """
+
+    if algorithm == 'insertion':
+        insertion_sort(values, key, reverse)
+    elif algorithm == 'heap':
+        heap_sort(values, key=key, reverse=reverse)
+    elif algorithm == 'merge':
+        values[:] = merge_sort(values, key, reverse)
+    elif algorithm == 'radix':
+        values[:] = radix_sort(values, key=key, reverse=reverse, radix=256 if len(values) < 1 << 16 else 65536)
+    elif algorithm == 'shell':
+        shell_sort(values, key, reverse)
+    elif algorithm == 'selection':
+        selection_sort(values, key, reverse)
+    elif algorithm == 'bubble':
+        bubble_sort(values, key, reverse)
+    else:
+        quick_sort(values, key=key, reverse=reverse)
+
+
+def _sample_type(sample):
+    """
+    Returns: 'int', 'float', 'str' or 'object' - the narrowest of these
+    that describes every value in sample.
+    """
+
+    if all(type(value) in _INTEGER_TYPES for value in sample):
+        return 'int'
+    if all(isinstance(value, numbers.Real) for value in sample):
+        return 'float'
+    if all(isinstance(value, str) for value in sample):
+        return 'str'
+    return 'object'
+
+
+def _shell_gaps(gaps, n):
+    """
+    Returns: The list of shell sort gaps for a list of n values, largest
+    first and ending with 1. gaps is the name of a gap sequence (a key of
+    _GAP_SEQUENCES) or a list of gaps.
+    """
+
+    if isinstance(gaps, str):
+        if gaps not in _GAP_SEQUENCES:
+            raise ValueError("unknown gap sequence %r (expected one of %s)" % (gaps, ', '.join(sorted(_GAP_SEQUENCES))))
+        #Generate the increasing sequence up to n and use it backwards
+        return _GAP_SEQUENCES[gaps](n)[::-1]
+    gaps = list(gaps)
+    if not gaps or gaps[-1] != 1 or any(gap < 1 for gap in gaps):
+        raise ValueError("gaps must be positive and end with 1")
+    return gaps
+
+
+def _ciura_gaps(n):
+    """
+    Returns: Ciura's gaps below n (but at least [1]) in increasing order,
+    extended past 701 by multiplying by 2.25.
+    """
+
+    gaps = [1]
+    for gap in (4, 10, 23, 57, 132, 301, 701):
+        if gap >= n:
+            return gaps
+        gaps.append(gap)
+    while gaps[-1] * 9 // 4 < n:
+        gaps.append(gaps[-1] * 9 // 4)
+    return gaps
+
+
+def _tokuda_gaps(n):
+    """
+    Returns: Tokuda's gaps ceil((9^k - 4^k) / (5*4^(k-1))) below n (but at
+    least [1]) in increasing order.
+    """
+
+    gaps = [1]
+    k = 2
+    while True:
+        #Ceiling division with integers only: -(-a // b)
+        gap = -((4 ** k - 9 ** k) // (5 * 4 ** (k - 1)))
+        if gap >= n:
+            return gaps
+        gaps.append(gap)
+        k += 1
+
+
+def _sedgewick_gaps(n):
+    """
+    Returns: Sedgewick's gaps 4^k + 3*2^(k-1) + 1 below n (but at least [1])
+    in increasing order.
+    """
+
+    gaps = [1]
+    k = 1
+    while 4 ** k + 3 * 2 ** (k - 1) + 1 < n:
+        gaps.append(4 ** k + 3 * 2 ** (k - 1) + 1)
+        k += 1
+    return gaps
+
+
+def _pratt_gaps(n):
+    """
+    Returns: Pratt's gaps - every 2^p*3^q below n (but at least [1]) - in
+    increasing order.
+    """
+
+    gaps = []
+    power_of_three = 1
+    while power_of_three < n or not gaps:
+        gap = power_of_three
+        while gap < n or not gaps:
+            gaps.append(gap)
+            gap *= 2
+        power_of_three *= 3
+    return sorted(gaps)
+
+
+#Gap sequences shell_sort can use, by name
+_GAP_SEQUENCES = {
+    'ciura': _ciura_gaps,
+    'tokuda': _tokuda_gaps,
+    'sedgewick': _sedgewick_gaps,
+    'pratt': _pratt_gaps,
+}
+
+
+def _select_into(sequence, ranks, key, reverse, prefix):
+    """
+    Procedure: Rearranges sequence in place by key and reverse so that
+    every index in ranks holds the value it would hold if sequence were
+    sorted, with smaller or equal values before it and larger or equal
+    values after it, then sorts the first prefix values.
+
+    Precondition: ranks is a sorted list of distinct valid indices and
+    prefix is at most len(sequence).
+    """
+
+    n = len(sequence)
+    #Selecting in descending order is selecting the mirrored ranks in
+    #ascending order and then reversing the list
+    if reverse:
+        ranks = [n - 1 - rank for rank in reversed(ranks)]
+    first = n - prefix if reverse else 0
+    vector = _numeric_array(sequence)
+    if vector is not None and key is None:
+        if ranks:
+            vector.partition(ranks)
+        vector[first:first + prefix].sort()
+        if reverse:
+            vector[:] = vector[::-1].copy()
+        return
+    #Keys are computed once and decorated with their positions, negated for
+    #reverse so that equal keys still come out in their original order
+    if key is not None:
+        step = -1 if reverse else 1
+        values = list(sequence)
+        work = [(key(value), index * step) for index, value in enumerate(values)]
+    else:
+        work = sequence
+    if ranks:
+        _select(work, 0, n - 1, ranks)
+    if prefix > 1:
+        _introsort(work, first, first + prefix - 1)
+    if key is not None:
+        work = [values[index * step] for _, index in work]
+    elif not reverse:
+        return
+    if reverse:
+        work = work[::-1]
+    _write_back(sequence, 0, work)
+
+
+def _select(sequence, start, end, ranks):
     """
+    Procedure: Rearranges sequence[start...end] in place so that every index
+    in ranks holds the value it would hold if the range were sorted, with the
+    introselect algorithm described in nth_element and select_many.
 
-    #Initialize the n sized loop counter
-    index = a
-    while index > 0:
-        #Swap positions if the value below index is greater
-        if sequence[index - 1] > sequence[index]:
-            _swap(sequence, index - 1, index)
-        index += -1
+    Precondition: ranks is a sorted list of distinct indices in start...end
+    """
+
+    #Each stack entry is a range, the slice ranks[first:last] of the ranks
+    #that fall in it, and how many more partitions it is allowed before we
+    #give up and heap sort it
+    stack = [(start, end, 0, len(ranks), 2 * _floor_log2(end - start + 1))]
+    while stack:
+        low, high, first, last, depth = stack.pop()
+        while first < last:
+            #Small ranges are quicker to sort outright
+            if high - low < _INSERTION_CUTOFF:
+                _insertion_sort_range(sequence, low, high, low > start)
+                break
+            #Too many bad pivots - heap sort the range in O(nlog(n)) instead
+            if depth == 0:
+                _heap_sort_range(sequence, low, high)
+                break
+            depth -= 1
+            pivot = _choose_pivot(sequence, low, high)
+            lower, upper = _partition3(sequence, low, high, pivot)
+            #ranks[first:below] are left of the pivots, ranks[above:last]
+            #right of them; the ones in between are already in place
+            below = _bisect(ranks, lower, first, last, False)
+            above = _bisect(ranks, upper, below, last, True)
+            if below > first and above < last:
+                stack.append((upper + 1, high, above, last, depth))
+                high, last = lower - 1, below
+            elif below > first:
+                high, last = lower - 1, below
+            else:
+                low, first = upper + 1, above
 
 
-def _find_min(sequence):
+def _common_prefix(values, start, end, depth):
     """
-    Returns: Index position of the minimum value of a list.
-    this is a helper function for algorithms such as selection sort.
-    Runs in O(n) time.
+    Returns: The length of the longest common prefix of the strings in
+    values[start...end-1], which are known to share their first depth
+    characters.
+
+    ============
+    Description:
+    ============
+    Checking one character at a time would be a python loop over every
+    string for every character. Instead we check a chunk of the first
+    string against all of the others with startswith (which runs in C),
+    doubling the chunk while the checks pass and halving it when one fails,
+    so a prefix of length L takes O(log(L)) checks.
     """
 
-    #Initialize loop counter and return index
-    index = 0
-    counter = 0
-    while counter < len(sequence):
-        #If the "scouting" counter is less than the return index, set index equal to the counter
-        if sequence[counter] < sequence[index]:
-            index = counter
-        counter += 1
-    #Return the min index position
+    first = values[start]
+    length = depth
+    step = 8
+    while step:
+        chunk = first[length:length + step]
+        if not chunk:
+            break
+        if all(values[index].startswith(chunk, length) for index in range(start + 1, end)):
+            length += len(chunk)
+            step *= 2
+        else:
+            step //= 2
+    return length
+
+
+def _character_code(value, depth):
+    """
+    Returns: The code of the character of the str or bytes value at depth,
+    or -1 if value is not that long.
+    """
+
+    return ord(value[depth:depth + 1]) if len(value) > depth else -1
+
+
+def _sort_small_strings(values, start, end, depth, lcps):
+    """
+    Procedure: Sorts the strings values[start...end-1], which share their
+    first depth characters, with insertion sort, and fills in their LCP
+    entries (past the first) if lcps is not None.
+    """
+
+    _insertion_sort_range(values, start, end - 1)
+    if lcps is not None:
+        for index in range(start + 1, end):
+            lcps[index] = _common_prefix(values, index - 1, index + 1, depth)
+
+
+def _introsort(sequence, start, end):
+    """
+    Procedure: Sorts sequence[start...end] in place with the introsort
+    algorithm described in quick_sort.
+
+    Precondition: start and end are valid indices of the sequence.
+    """
+
+    #Each stack entry is a range left to sort and how many more levels of
+    #partitioning it is allowed before we give up and use heap sort
+    stack = _new_stack((start, end, 2 * _floor_log2(end - start + 1)))
+    while stack:
+        low, high, depth = stack.pop()
+        #Partition the range until it is small enough for insertion sort
+        while high - low >= _INSERTION_CUTOFF:
+            #Too many bad pivots - heap sort the range in O(nlog(n)) instead
+            if depth == 0:
+                _heap_sort_range(sequence, low, high)
+                break
+            depth -= 1
+            pivot = _choose_pivot(sequence, low, high)
+            lower, upper = _partition3(sequence, low, high, pivot)
+            #Push the larger side and keep going on the smaller side. This
+            #keeps the stack at O(log(n)) entries.
+            if lower - low < high - upper:
+                stack.append((upper + 1, high, depth))
+                high = lower - 1
+            else:
+                stack.append((low, lower - 1, depth))
+                low = upper + 1
+        else:
+            #Every range but the leftmost has a partitioned value before it
+            #that is no larger than any of its own
+            _insertion_sort_range(sequence, low, high, low > start)
+
+
+def _choose_pivot(sequence, start, end):
+    """
+    Returns: A pivot value for sequence[start...end]. This is the median of
+    the first, middle and last values, or for large ranges the median of
+    three such medians (Tukey's "ninther").
+    """
+
+    middle = (start + end) // 2
+    if end - start < _NINTHER_CUTOFF:
+        return _median_of_three(sequence[start], sequence[middle], sequence[end])
+    step = (end - start) // 8
+    return _median_of_three(
+        _median_of_three(sequence[start], sequence[start + step], sequence[start + 2 * step]),
+        _median_of_three(sequence[middle - step], sequence[middle], sequence[middle + step]),
+        _median_of_three(sequence[end - 2 * step], sequence[end - step], sequence[end]))
+
+
+def _median_of_three(a, b, c):
+    """
+    Returns: The median value of a, b and c using only < comparisons.
+    """
+
+    if a < b:
+        if b < c:
+            return b
+        return c if a < c else a
+    if a < c:
+        return a
+    return c if b < c else b
+
+
+def _partition3(sequence, start, end, pivot):
+    """
+    Returns: A (lower, upper) tuple of index positions after partitioning
+    sequence[start...end] around the value pivot such that:
+    sequence[start...lower-1] < pivot, sequence[lower...upper] == pivot and
+    sequence[upper+1...end] > pivot.
+
+    Precondition: pivot is equal to at least one value in the range.
+
+    ============
+    Description:
+    ============ 
+    This is Dijkstra's "Dutch national flag" three-way partition. Values
+    equal to the pivot end up in the middle of the range and are already in
+    their sorted position, so lists with many duplicates shrink quickly.
+    """
+
+    #[start...lower-1] are less than the pivot, [lower...index-1] are equal,
+    #[index...upper] are unchecked and [upper+1...end] are greater.
+    lower = start
+    index = start
+    upper = end
+    while index <= upper:
+        value = sequence[index]
+        if value < pivot:
+            sequence[lower], sequence[index] = value, sequence[lower]
+            lower += 1
+            index += 1
+        elif pivot < value:
+            sequence[index], sequence[upper] = sequence[upper], value
+            upper -= 1
+        else:
+            index += 1
+    return lower, upper
+
+
+def _insertion_sort_range(sequence, start, end, sentinel=False):
+    """
+    Procedure: Sorts sequence[start...end] in place with the adaptive
+    insertion sort described in insertion_sort. This is the small range
+    kernel for the divide-and-conquer sorts.
+
+    Parameters: sentinel is True if sequence[start-1] is no larger than any
+    value of the range - true of every range quick sort partitions off
+    except the leftmost one. The short ranges quick sort hands over are
+    then sorted by shifting values one slot at a time, which beats a binary
+    search on a handful of values, with no check for the start of the range:
+    the sentinel stops every shift at the latest. It must be False for a
+    range at the start of the sequence (start == 0), which has no
+    sequence[start-1].
+    """
+
+    if sentinel:
+        for index in range(start + 1, end + 1):
+            value = sequence[index]
+            position = index
+            while value < sequence[position - 1]:
+                sequence[position] = sequence[position - 1]
+                position -= 1
+            sequence[position] = value
+        return
+    for index in range(start + 1, end + 1):
+        value = sequence[index]
+        #No inversion with the value before it - already in place
+        if not value < sequence[index - 1]:
+            continue
+        #Find the slot after every value <= value (which keeps the sort
+        #stable) and move the values from there up one slot in one block
+        position = bisect.bisect_right(sequence, value, start, index - 1)
+        sequence[position + 1:index + 1] = sequence[position:index]
+        sequence[position] = value
+
+
+def _heap_sort_range(sequence, start, end, arity=2):
+    """
+    Procedure: Sorts sequence[start...end] in place with heap sort using an
+    arity-ary max-heap rooted at sequence[start]. O(nlog(n)) in the worst
+    case; this is also the fallback for introsort.
+    """
+
+    size = end - start + 1
+    #Step 1: Build the max-heap
+    _heapify(sequence, start, size, arity)
+    #Step 2: Repeatedly move the max value to the end and restore the heap
+    for last in range(size - 1, 0, -1):
+        sequence[start], sequence[start + last] = sequence[start + last], sequence[start]
+        _sift_down(sequence, start, 0, last, arity)
+
+
+def _sift_down(sequence, offset, root, size, arity=2):
+    """
+    Procedure: Moves the value at heap position root down into place in the
+    arity-ary max-heap stored in sequence[offset...offset+size-1].
+    """
+
+    value = sequence[offset + root]
+    while True:
+        first_child = arity * root + 1
+        if first_child >= size:
+            break
+        #Find the largest child (the binary case is common enough to skip
+        #the loop over children)
+        child = first_child
+        if arity == 2:
+            if child + 1 < size and sequence[offset + child] < sequence[offset + child + 1]:
+                child += 1
+        else:
+            for other in range(first_child + 1, min(first_child + arity, size)):
+                if sequence[offset + child] < sequence[offset + other]:
+                    child = other
+        #Heap invariant is satisfied - stop here
+        if not value < sequence[offset + child]:
+            break
+        #Move the child up (rather than swapping) and keep going down
+        sequence[offset + root] = sequence[offset + child]
+        root = child
+    sequence[offset + root] = value
+
+
+def _floor_log2(n):
+    """
+    Returns: The floor of log base 2 of the positive integer n.
+    """
+
+    return n.bit_length() - 1
+
+
+def _merge_sort_range(sequence, start, end):
+    """
+    Procedure: Sorts sequence[start...end] in place with the natural merge
+    sort described in merge_sort. Stable.
+    """
+
+    #Step 1: Split the range into sorted runs. bounds holds the start index of
+    #each run followed by the index just past the last run.
+    min_run = _min_run(end - start + 1)
+    bounds = [start]
+    run_start = start
+    while run_start <= end:
+        run_end = _count_run(sequence, run_start, end)
+        #Grow short runs with insertion sort up to the minimum run length
+        if run_end - run_start + 1 < min_run:
+            run_end = min(run_start + min_run - 1, end)
+            _insertion_sort_range(sequence, run_start, run_end)
+        run_start = run_end + 1
+        bounds.append(run_start)
+    #Step 2: Merge neighbouring runs pass after pass until one run is left.
+    #The buffer never needs to hold more than the smaller of two runs.
+    buffer = _temporary([None] * ((end - start + 1) // 2 + 1))
+    while len(bounds) > 2:
+        merged = [bounds[0]]
+        index = 0
+        while index + 2 < len(bounds):
+            _merge_runs(sequence, bounds[index], bounds[index + 1], bounds[index + 2], buffer)
+            merged.append(bounds[index + 2])
+            index += 2
+        #An odd run out is carried over to the next pass untouched
+        if index + 1 < len(bounds):
+            merged.append(bounds[-1])
+        bounds = merged
+
+
+def _min_run(n):
+    """
+    Returns: The minimum run length for a merge sort of n values. This is
+    timsort's choice: a number between 32 and 64 such that n / min_run is
+    close to, but no more than, a power of two so the merges stay balanced.
+    """
+
+    remainder = 0
+    while n >= 64:
+        remainder |= n & 1
+        n >>= 1
+    return n + remainder
+
+
+def _count_run(sequence, start, end):
+    """
+    Returns: The index of the last value of the run beginning at
+    sequence[start]. A run is either non-descending or strictly descending;
+    a descending run is reversed in place so it becomes ascending (strictly
+    descending runs have no equal values, so reversing them is stable).
+    """
+
+    index = start + 1
+    if index > end:
+        return start
+    if sequence[index] < sequence[start]:
+        while index < end and sequence[index + 1] < sequence[index]:
+            index += 1
+        sequence[start:index + 1] = sequence[start:index + 1][::-1]
+    else:
+        while index < end and not sequence[index + 1] < sequence[index]:
+            index += 1
     return index
 
 
-def _partition(sequence, start, end):
+def _merge_runs(sequence, start, middle, end, buffer):
+    """
+    Procedure: Merges the sorted runs sequence[start...middle-1] and
+    sequence[middle...end-1] in place, using buffer as scratch space.
     """
-    Returns: Index position of the pivot after the partitioning
 
-    Preconditions: sequence is a mutable sequence (i.e. a list) and pivot and end
-    are valid index positions of the sequence.
+    #Values at the front of the left run that are <= the first value of the
+    #right run are already in place, and so are values at the back of the
+    #right run that are >= the last value of the left run. Skip them.
+    start = _gallop(sequence, sequence[middle], start, middle, True, False)
+    if start == middle:
+        return
+    end = _gallop(sequence, sequence[middle - 1], middle, end, False, True)
+    #Copy the smaller run into the buffer
+    if middle - start <= end - middle:
+        _merge_low(sequence, start, middle, end, buffer)
+    else:
+        _merge_high(sequence, start, middle, end, buffer)
+
+
+def _merge_low(sequence, start, middle, end, buffer):
+    """
+    Procedure: Merges sequence[start...middle-1] and sequence[middle...end-1]
+    front to back. The (smaller) left run is copied into buffer first.
+    """
+
+    length = middle - start
+    buffer[0:length] = sequence[start:middle]
+    left = 0
+    right = middle
+    target = start
+    while left < length and right < end:
+        #One value at a time until one run wins _MIN_GALLOP times in a row
+        left_wins = right_wins = 0
+        while left < length and right < end:
+            if sequence[right] < buffer[left]:
+                sequence[target] = sequence[right]
+                right += 1
+                right_wins += 1
+                left_wins = 0
+            else:
+                sequence[target] = buffer[left]
+                left += 1
+                left_wins += 1
+                right_wins = 0
+            target += 1
+            if left_wins >= _MIN_GALLOP or right_wins >= _MIN_GALLOP:
+                break
+        #Galloping: find how many values in a row come from each run and
+        #move them as one block, until the blocks get short again
+        while left < length and right < end:
+            count = _gallop(buffer, sequence[right], left, length, True, False) - left
+            buffer_block = count
+            if count:
+                sequence[target:target + count] = buffer[left:left + count]
+                target += count
+                left += count
+                if left == length:
+                    break
+            count = _gallop(sequence, buffer[left], right, end, False, False) - right
+            if count:
+                sequence[target:target + count] = sequence[right:right + count]
+                target += count
+                right += count
+            if buffer_block < _MIN_GALLOP and count < _MIN_GALLOP:
+                break
+    #Whatever is left of the right run is already in place
+    if left < length:
+        sequence[target:target + length - left] = buffer[left:length]
+
+
+def _merge_high(sequence, start, middle, end, buffer):
+    """
+    Procedure: Merges sequence[start...middle-1] and sequence[middle...end-1]
+    back to front. The (smaller) right run is copied into buffer first.
+    """
+
+    length = end - middle
+    buffer[0:length] = sequence[middle:end]
+    left = middle - 1
+    right = length - 1
+    target = end - 1
+    while left >= start and right >= 0:
+        #One value at a time until one run wins _MIN_GALLOP times in a row
+        left_wins = right_wins = 0
+        while left >= start and right >= 0:
+            if buffer[right] < sequence[left]:
+                sequence[target] = sequence[left]
+                left -= 1
+                left_wins += 1
+                right_wins = 0
+            else:
+                sequence[target] = buffer[right]
+                right -= 1
+                right_wins += 1
+                left_wins = 0
+            target -= 1
+            if left_wins >= _MIN_GALLOP or right_wins >= _MIN_GALLOP:
+                break
+        #Galloping, back to front
+        while left >= start and right >= 0:
+            count = left + 1 - _gallop(sequence, buffer[right], start, left + 1, True, True)
+            left_block = count
+            if count:
+                sequence[target - count + 1:target + 1] = sequence[left - count + 1:left + 1]
+                target -= count
+                left -= count
+                if left < start:
+                    break
+            count = right + 1 - _gallop(buffer, sequence[left], 0, right + 1, False, True)
+            if count:
+                sequence[target - count + 1:target + 1] = buffer[right - count + 1:right + 1]
+                target -= count
+                right -= count
+            if left_block < _MIN_GALLOP and count < _MIN_GALLOP:
+                break
+    #Whatever is left of the left run is already in place
+    if right >= 0:
+        sequence[start:start + right + 1] = buffer[0:right + 1]
+
+
+def _apply_cycles(sequence, order):
+    """
+    Procedure: Rearranges sequence in place so that its value at index i is
+    the one that was at order[i], moving every value once.
+
+    Precondition: order is a permutation of range(len(sequence))
+
+    ============
+    Description:
+    ============
+    A permutation splits into cycles: the value at i comes from order[i],
+    whose value comes from order[order[i]], and so on until we are back at
+    i. Walking a cycle we save its first value, pull every other value into
+    the slot before it, and drop the saved value into the last slot. A
+    bytearray marks the slots already done, so the only extra memory is one
+    byte per value and one saved value.
+    """
+
+    done = bytearray(len(order))
+    for start in range(len(order)):
+        if done[start]:
+            continue
+        done[start] = 1
+        if order[start] == start:
+            continue
+        saved = sequence[start]
+        index = start
+        source = order[index]
+        while source != start:
+            sequence[index] = sequence[source]
+            done[source] = 1
+            index = source
+            source = order[index]
+        sequence[index] = saved
+
+
+def _bisect(sequence, value, start, end, right):
+    """
+    Returns: The first index i in sequence[start...end-1] whose value goes
+    after value, or end if there is none. Values equal to value go before it
+    if right is True and after it otherwise (bisect_right/bisect_left).
+
+    Precondition: sequence[start...end-1] is sorted.
+    """
+
+    while start < end:
+        middle = (start + end) // 2
+        if (not value < sequence[middle]) if right else (sequence[middle] < value):
+            start = middle + 1
+        else:
+            end = middle
+    return start
+
+
+def _gallop(sequence, value, start, end, right, from_end):
+    """
+    Returns: The first index i in sequence[start...end-1] whose value goes
+    after value, or end if there is none. If right is True, values equal to
+    value stay before it (i.e. the first sequence[i] > value); otherwise
+    they go after it (i.e. the first sequence[i] >= value).
+
+    Precondition: sequence[start...end-1] is sorted.
 
     ============
     Description:
     ============ 
-    Partitions the sequence[start...end] around the pivot - sequence[start] -
-    where the pivot is the first position in the unpartitioned list.
+    This is an exponential search. We probe 1, 2, 4, 8... positions away
+    from the front (or the back, if from_end is True) until we step past the
+    answer, then binary search the last gap. When the answer is k positions
+    from where we started this takes O(log(k)) comparisons instead of
+    O(log(n)), which is what makes galloping merges cheap.
     """
 
-    #Initialize the pivot value and loop counters that will iterate towards completion of the algorithm
-    #i is the end of the first partition range and j is before the start of the second partition range
-    #such that [start.....i-1 | pivot or i | j ...... end] will be the result of the procedure.
-    i = start
-    j = end
-    pivot = sequence[i]  #at this point sequence[i] is the same as sequence[start]
-    while i < j:
-        #If the value after i is greater than the pivot, swap j and the value and decrease the j counter
-        #by 1 (i.e. put that value after the pivot as far as possible)
-        if sequence[i + 1] >= pivot:
-            _swap(sequence, i + 1, j)
-            j = j - 1
-        #Else, swap the value and the i position value (i.e. put the value before the pivot)
+    low = start
+    high = end
+    step = 1
+    if from_end:
+        probe = end - 1
+        while probe >= start:
+            if (not value < sequence[probe]) if right else (sequence[probe] < value):
+                low = probe + 1
+                break
+            high = probe
+            probe -= step
+            step *= 2
+    else:
+        probe = start
+        while probe < end:
+            if (not value < sequence[probe]) if right else (sequence[probe] < value):
+                low = probe + 1
+            else:
+                high = probe
+                break
+            probe += step
+            step *= 2
+    #Binary search between the last two probes
+    while low < high:
+        middle = (low + high) // 2
+        if (not value < sequence[middle]) if right else (sequence[middle] < value):
+            low = middle + 1
         else:
-            _swap(sequence, i + 1, i)
-            i = i + 1
-    return i
+            high = middle
+    return low
 
 
-def _merge(left, right):
+def _heap_merge(iterables, key=None, reverse=False):
     """
-    Returns: New list by merging two different sequences together in sorted
-    order. 
+    Returns: A generator merging the sorted iterables into one sorted stream.
+    Stable: equal values come out in the order of the iterables.
 
     ============
     Description:
     ============ 
-    This is a helper function for the Mergesort algorithm.
+    This is a k-way merge. A heap holds the current (smallest remaining)
+    value of every iterable, so finding the next value to yield is O(1) and
+    replacing it with the next value of the same iterable is O(log(k)). Heap
+    entries are [key, iterable number, value, iterator]; the iterable number
+    breaks ties between equal keys, so values themselves are never compared.
+    Only one value per iterable is held in memory at a time.
     """
 
-    new_list = []
-    left_index = 0
-    right_index = 0
-    #Compare both elements and add the least value to the merged sequence
-    while left_index < len(left) and right_index < len(right):
-        if left[left_index] < right[right_index]:
-            new_list.append(left[left_index])
-            left_index += 1
+    heap = []
+    for number, iterable in enumerate(iterables):
+        iterator = iter(iterable)
+        for value in iterator:
+            heap.append([_merge_key(value, key, reverse), number, value, iterator])
+            break
+    heapq.heapify(heap)
+    while len(heap) > 1:
+        entry = heap[0]
+        yield entry[2]
+        for value in entry[3]:
+            entry[0] = _merge_key(value, key, reverse)
+            entry[2] = value
+            heapq.heapreplace(heap, entry)
+            break
         else:
-            new_list.append(right[right_index])
-            right_index += 1
-    #Once one list is empty, add the rest of the other list to the merged seq
-    if left_index >= len(left):
-        new_list = new_list + (right[right_index:])
-    else:
-        new_list = new_list + (left[left_index:])
-    return new_list
+            heapq.heappop(heap)
+    #Only one iterable left: no more comparing to do
+    if heap:
+        entry = heap[0]
+        yield entry[2]
+        for value in entry[3]:
+            yield value
+
+
+def _merge_key(value, key, reverse):
+    """
+    Returns: The heap key of value for _heap_merge.
+    """
+
+    k = value if key is None else key(value)
+    return _Reversed(k) if reverse else k
+
+
+class _Reversed(object):
+    """
+    Wraps a key so that it compares the other way around, turning heapq's
+    min-heap into a max-heap.
+    """
+    __slots__ = ('key',)
+
+    def __init__(self, key):
+        self.key = key
+
+    def __lt__(self, other):
+        return other.key < self.key
 
+    def __eq__(self, other):
+        return self.key == other.key
 
-def _heapify(sequence):     
+
+def _heapify(sequence, offset, size, arity=2):
     """     
-    Returns: A balanced min-heap data structure with elements from sequence.
+    Procedure: Arranges sequence[offset...offset+size-1] into an arity-ary
+    max-heap in place.
 
     Precondition: sequence is a mutable sequence (i.e. a list)
 
     ============
     Description:
     ============ 
-    This algorithm runs in O(nlog(n)) time complexity and is a
-    helper function for the heap sort algorithm.
+    This is Floyd's bottom-up heap construction and a helper function for
+    the heap sort algorithm. Sifting down every parent from the last one
+    back to the root runs in O(n) time: half the nodes are leaves and do not
+    move at all, a quarter move at most one level, and so on.
     """
 
-    #Initialize our iterative variables: heap_invariant as a logic gate for maintaining
-    #heap invariant during heap creation, counter for looping, and an empty list
-    #for our heap.
-    counter = 0
-    heap = []
-    #Insert all elements into a heap
-    while counter < len(sequence):
-        #Add the list value to the bottom of the heap
-        heap.append(sequence[counter])
-        #Maintain the heap invariant
-        child = len(heap) - 1
-        heap_invariant = False
-        while not heap_invariant:
-            #If the child is at the root - The heap invariant is satisfied and break out of the loop
-            if child == 0:
-                break
-            #Else, compare the child with the parent. If the child is less than the parent, swap it up.
-            parent = (child - 1)/2
-            if heap[child] >= heap[parent]:
-                heap_invariant = True
-            elif heap[child] < heap[parent]:
-                _swap(heap, child, parent)
-                child = parent
-        #Repeat until all elements of the list are in a heap
-        counter += 1
-    return heap
+    #The parent of the last node is the last node with children
+    for root in range((size - 2) // arity, -1, -1):
+        _sift_down(sequence, offset, root, size, arity)
 
 
 def _in_order(sequence):
@@ -730,137 +3199,589 @@ def _in_order(sequence):
     return True
 
 
-def _get_digit(integer, d):
+def _radix_keys(keys):
     """
-    Returns: Digit d of an integer. The 0th digit is the rightmost digit.
-    """
-    integer_string = str(integer)
-    d = d + 1
-    #Account for extra digit padding
-    if d > len(integer_string):
-        return 0
-    return int(integer_string[-d])
-
-
-#== Testing Application ==================================================#
-if __name__ == '__main__':
-    print "INSERTION SORT:"
-    b = [random.randint(1,10) for _ in range(5000)]
-    insertion_sort(b)
-    print `b`
-    #=========================================#
-    """print "BUBBLE SORT:"
-    b = [random.randint(1,10) for _ in range(5000)]
-    bubble_sort(b)
-    print `b`"""
-    #=========================================#
-    print "SELECTION SORT:"
-    b = [random.randint(1,10) for _ in range(5000)]
-    selection_sort(b)
-    print `b`
-    #=========================================#
-    print "QUICK SORT:"
-    b = [random.randint(1,10) for _ in range(5000)]
-    quick_sort(b)
-    print `b`
-    #=========================================#
-    print "HEAP SORT:"
-    b = [random.randint(1,10) for _ in range(5000)]
-    d = heap_sort(b)
-    print `d`
-    #=========================================#
-    print "MERGE SORT:"
-    b = [random.randint(1,10) for _ in range(5000)]
-    b = merge_sort(b)
-    print `b`
-    #=========================================#
-    print "SHELL SORT:"
-    b = [random.randint(1,10) for _ in range(5000)]
-    shell_sort(b)
-    print `b`
-    #=========================================#
-    print "RADIX SORT:"
-    b = [random.randint(1,10) for _ in range(5000)]
-    print radix_sort(b, 0, 4999, 2)
-
-
+    Returns: A (unsigned_keys, offset) tuple. unsigned_keys is a new list of
+    non-negative integers in the same order as keys. For integer keys,
+    unsigned_key = key - offset; for float keys, offset is None and the
+    unsigned keys are the flipped IEEE 754 bits of the floats, so -0.0 goes
+    before 0.0 and every NaN after infinity.
 
+    Raises a TypeError if a key is not a real number.
+    """
 
+    for k in keys:
+        if not isinstance(k, numbers.Real):
+            raise TypeError("radix_sort keys must be integers or floats, not %r" % (k,))
+    if all(isinstance(k, numbers.Integral) for k in keys):
+        offset = int(min(keys))
+        return [int(k) - offset for k in keys], offset
+    #Reinterpret the floats as 64 bit unsigned integers, then flip them
+    count = len(keys)
+    bits = struct.unpack('%dQ' % count, struct.pack('%dd' % count, *keys))
+    sign = 1 << 63
+    mask = (1 << 64) - 1
+    #Every NaN, whatever its sign and payload, gets the key of the same
+    #positive NaN, so that they all go after infinity
+    infinity = 0x7ff0000000000000
+    nan = 0x7ff8000000000000 | sign
+    return [nan if b & ~sign > infinity else b ^ mask if b & sign else b | sign for b in bits], None
+
+
+def _record_keys(column):
+    """
+    Returns: A new list of non-negative integers in the same order as the
+    values of column: the unsigned keys of _radix_keys for real numbers,
+    or else the rank of each value among the distinct values of column.
+    """
 
+    if all(isinstance(value, numbers.Real) for value in column):
+        return _radix_keys(column)[0]
+    ranks = dict((value, rank) for rank, value in enumerate(sorted(set(column))))
+    return [ranks[value] for value in column]
 
 
+def _counting_passes(keys, values, radix):
+    """
+    Returns: A (keys, values) tuple of new lists, stably sorted by keys with
+    LSD counting sort passes. values is a list that is moved along with the
+    keys, or None to sort the keys alone.
 
+    Precondition: keys are non-negative integers and radix is a power of two.
+    """
 
+    count = len(keys)
+    shift_size = radix.bit_length() - 1
+    mask = radix - 1
+    passes = (max(keys).bit_length() + shift_size - 1) // shift_size
+    #Two pairs of buffers that take turns being the input and the output
+    key_buffer = _temporary([0] * count)
+    value_buffer = None if values is None else _temporary([None] * count)
+    for shift in range(0, passes * shift_size, shift_size):
+        #Count the keys in each bucket
+        counts = [0] * radix
+        for k in keys:
+            counts[(k >> shift) & mask] += 1
+        #Every key has the same digit - this pass would not move anything
+        if max(counts) == count:
+            continue
+        #Prefix sums: counts[d] becomes the first output slot for digit d
+        total = 0
+        for digit in range(radix):
+            counts[digit], total = total, total + counts[digit]
+        #Drop every key (and value) into its slot
+        if values is None:
+            for k in keys:
+                digit = (k >> shift) & mask
+                key_buffer[counts[digit]] = k
+                counts[digit] += 1
+        else:
+            for index in range(count):
+                k = keys[index]
+                digit = (k >> shift) & mask
+                slot = counts[digit]
+                key_buffer[slot] = k
+                value_buffer[slot] = values[index]
+                counts[digit] = slot + 1
+            values, value_buffer = value_buffer, values
+        keys, key_buffer = key_buffer, keys
+    return keys, values
 
 
+#== Vectorized Backend ===================================================
+#Sorts and searches call _numeric_array first. When it returns an array,
+#they hand the work to the numpy kernels below; otherwise they run their
+#pure Python code. Kernels that sort in place work on the caller's buffer
+#itself, because the array shares its memory.
 
+#Block size for the early-exit vectorized linear search
+_SCAN_BLOCK = 1 << 16
 
 
+def _numeric_array(sequence):
+    """
+    Returns: A 1-D numpy array sharing memory with sequence if sequence is a
+    numeric buffer - a numpy array, an array.array or a memoryview of
+    numbers - and numpy is installed. Otherwise returns None.
+    """
 
+    if numpy is None:
+        return None
+    if isinstance(sequence, numpy.ndarray):
+        vector = sequence
+    elif isinstance(sequence, (array.array, memoryview)):
+        vector = numpy.asarray(memoryview(sequence))
+    else:
+        return None
+    if vector.ndim != 1 or vector.dtype.kind not in 'biuf':
+        return None
+    return vector
 
 
+def _like(sequence, vector):
+    """
+    Returns: vector as the same kind of buffer as sequence - an array.array
+    with the same typecode for an array.array, else the numpy array itself.
+    """
 
+    if isinstance(sequence, array.array):
+        return array.array(sequence.typecode, vector.tobytes())
+    return vector
 
 
+def _vector_sort(vector, kind, reverse):
+    """
+    Procedure: Sorts the numpy array vector in place with numpy's sort kind,
+    into descending order if reverse is True.
+    """
 
+    vector.sort(kind=kind)
+    if reverse:
+        vector[:] = vector[::-1].copy()
 
 
+def _vector_shell_sort(vector, gaps, reverse):
+    """
+    Procedure: Shell sorts the numpy array vector in place with gaps (largest
+    first, ending with 1), into descending order if reverse is True.
 
+    ============
+    Description:
+    ============
+    For a gap g, the values at positions c, c+g, c+2g, ... form one of g
+    interleaved subsequences. Read row by row, the buffer is a table with g
+    columns, where column c is that subsequence. The first n % g columns
+    are one row longer than the rest, so the table is taken as two strided
+    views - the full rows plus those longer columns - and each view has its
+    columns sorted in place, without copying the buffer.
+    """
 
+    n = len(vector)
+    step = vector.strides[0]
+    for gap in gaps:
+        rows, extra = divmod(n, gap)
+        if rows == 0:
+            continue
+        #The extra columns, one row longer than the others
+        if extra:
+            numpy.lib.stride_tricks.as_strided(vector, (rows + 1, extra), (gap * step, step)).sort(axis=0)
+        #The remaining columns
+        numpy.lib.stride_tricks.as_strided(vector[extra:], (rows, gap - extra), (gap * step, step)).sort(axis=0)
+    if reverse:
+        vector[:] = vector[::-1].copy()
+
+
+def _vector_sort_records(records, keys, reverse):
+    """
+    Returns: A numpy array of the positions of the structured array records
+    in the order of radix_sort_records: one stable argsort per key field,
+    least significant first.
+    """
 
+    order = numpy.arange(len(records))
+    for name, descending in reversed(list(zip(keys, reverse))):
+        column = records[name][order]
+        if descending:
+            #Sorting the column backwards and reading the result backwards
+            #gives a stable descending order
+            ranks = numpy.argsort(column[::-1], kind='stable')[::-1]
+            ranks = len(column) - 1 - ranks
+        else:
+            ranks = numpy.argsort(column, kind='stable')
+        order = order[ranks]
+    return order
 
 
+def _vector_linear_search(vector, value):
+    """
+    Returns: Index position of the first value in vector equal to value. If
+    the value is not there, raise a ValueError.
 
+    The comparison is done a block at a time so an early hit does not pay
+    for a scan of the whole array.
+    """
 
+    for start in range(0, len(vector), _SCAN_BLOCK):
+        hits = numpy.flatnonzero(vector[start:start + _SCAN_BLOCK] == value)
+        if len(hits):
+            return start + int(hits[0])
+    raise ValueError
 
 
+def _vector_binary_search(vector, value):
+    """
+    Returns: Index position of the first value in the sorted vector equal to
+    value. If the value is not there, raise a ValueError.
+    """
 
+    index = int(numpy.searchsorted(vector, value))
+    if index < len(vector) and vector[index] == value:
+        return index
+    raise ValueError
 
 
+def _vector_search_many(vector, queries, mode, missing):
+    """
+    Returns: A numpy array with the binary_search_many answer for each query
+    against the sorted vector.
+    """
 
+    if not hasattr(queries, '__len__'):
+        queries = list(queries)
+    queries = numpy.asarray(queries)
+    positions = numpy.searchsorted(vector, queries, side='right' if mode == 'right' else 'left')
+    if mode == 'exact':
+        found = positions < len(vector)
+        found[found] = vector[positions[found]] == queries[found]
+        positions = numpy.where(found, positions, missing)
+    return positions
 
 
+#== Parallel Sorting =====================================================
+#parallel_sort runs the functions below in worker processes, so they have
+#to live at module level where the workers can find them by name.
 
+def _shared_memory():
+    """
+    Returns: The multiprocessing.shared_memory module, or None if this
+    Python (older than 3.8) does not have it.
+    """
 
+    try:
+        from multiprocessing import shared_memory
+    except ImportError:
+        return None
+    return shared_memory
 
 
+def _chunk_bounds(length, parts):
+    """
+    Returns: A list of parts + 1 index positions splitting range(length)
+    into parts chunks of (nearly) equal size.
+    """
 
+    return [length * part // parts for part in range(parts + 1)]
 
 
+def _splitters(chunks, parts):
+    """
+    Returns: A sorted list of parts - 1 values that cut the sorted chunks
+    (lists or numpy arrays) into parts groups of about the same total size.
+    The values are picked from an evenly spaced sample of every chunk.
+    """
 
+    sample = []
+    for chunk in chunks:
+        step = max(len(chunk) // _SPLITTER_SAMPLES, 1)
+        sample.extend(chunk[step - 1::step])
+    sample = merge_sort(sample)
+    return [sample[len(sample) * part // parts] for part in range(1, parts)]
 
 
+def _parallel_sort_pickled(sequence, workers, executor):
+    """
+    Returns: A new sorted list of the values of sequence, sorted and merged
+    by the executor's workers. Values are pickled to and from the workers.
+    """
 
+    bounds = _chunk_bounds(len(sequence), workers)
+    chunks = [sequence[bounds[i]:bounds[i + 1]] for i in range(workers)]
+    #Phase 1: sort the chunks
+    chunks = list(executor.map(merge_sort, chunks))
+    #Phase 2: cut every chunk at the splitters and merge each group. Values
+    #equal to a splitter all go to the later group, which keeps it stable.
+    splitters = _splitters(chunks, workers)
+    cuts = [[0] + [_bisect(chunk, splitter, 0, len(chunk), False) for splitter in splitters] + [len(chunk)]
+            for chunk in chunks]
+    groups = [[chunk[cut[part]:cut[part + 1]] for chunk, cut in zip(chunks, cuts)] for part in range(workers)]
+    result = []
+    for merged in executor.map(_merge_chunks, groups):
+        result.extend(merged)
+    return result
+
+
+def _merge_chunks(chunks):
+    """
+    Returns: A new list merging the sorted lists in chunks. Runs in a worker.
 
+    The chunks are simply laid end to end and handed to the natural merge
+    sort, which finds them as runs and merges them with galloping. Equal
+    values keep the order of the chunks, so the merge is stable.
+    """
 
+    result = []
+    for chunk in chunks:
+        result.extend(chunk)
+    if len(result) > 1:
+        _merge_sort_range(result, 0, len(result) - 1)
+    return result
 
 
+def _parallel_sort_shared(vector, workers, executor):
+    """
+    Procedure: Sorts the numpy array vector in place using the executor's
+    workers, with the data in shared memory instead of being pickled.
+    """
 
+    shared_memory = _shared_memory()
+    length = len(vector)
+    dtype = vector.dtype.str
+    source = shared_memory.SharedMemory(create=True, size=vector.nbytes)
+    target = shared_memory.SharedMemory(create=True, size=vector.nbytes)
+    try:
+        data = numpy.ndarray(length, dtype=dtype, buffer=source.buf)
+        data[:] = vector
+        #Phase 1: sort the chunks in place in shared memory
+        bounds = _chunk_bounds(length, workers)
+        jobs = [executor.submit(_sort_shared_chunk, source.name, dtype, length, bounds[i], bounds[i + 1])
+                for i in range(workers)]
+        for job in jobs:
+            job.result()
+        #Phase 2: cut the chunks at the splitters and merge each group into
+        #its own slice of the target buffer
+        chunks = [data[bounds[i]:bounds[i + 1]] for i in range(workers)]
+        splitters = numpy.asarray(_splitters(chunks, workers), dtype=dtype)
+        cuts = [numpy.concatenate(([0], numpy.searchsorted(chunk, splitters), [len(chunk)])) for chunk in chunks]
+        jobs = []
+        output_start = 0
+        for part in range(workers):
+            ranges = [(bounds[i] + int(cuts[i][part]), bounds[i] + int(cuts[i][part + 1])) for i in range(workers)]
+            jobs.append(executor.submit(_merge_shared_group, source.name, target.name, dtype, length, ranges, output_start))
+            output_start += sum(stop - start for start, stop in ranges)
+        for job in jobs:
+            job.result()
+        vector[:] = numpy.ndarray(length, dtype=dtype, buffer=target.buf)
+        del data, chunks
+    finally:
+        for block in (source, target):
+            block.close()
+            block.unlink()
+
+
+def _sort_shared_chunk(name, dtype, length, start, stop):
+    """
+    Procedure: Sorts [start...stop-1] of the shared memory array called name
+    in place. Runs in a worker.
+    """
 
+    block = _shared_memory().SharedMemory(name=name)
+    try:
+        data = numpy.ndarray(length, dtype=dtype, buffer=block.buf)
+        data[start:stop].sort(kind='quicksort')
+        del data
+    finally:
+        block.close()
 
 
+def _merge_shared_group(source_name, target_name, dtype, length, ranges, output_start):
+    """
+    Procedure: Merges the sorted slices ranges of the shared array
+    source_name into the shared array target_name, starting at index
+    output_start. Runs in a worker.
 
+    numpy has no k-way merge, but its stable sort is a run-detecting merge
+    sort (or a radix sort for small integers), so sorting the slices laid
+    end to end merges them.
+    """
 
+    source = _shared_memory().SharedMemory(name=source_name)
+    target = _shared_memory().SharedMemory(name=target_name)
+    try:
+        data = numpy.ndarray(length, dtype=dtype, buffer=source.buf)
+        output = numpy.ndarray(length, dtype=dtype, buffer=target.buf)
+        merged = numpy.concatenate([data[start:stop] for start, stop in ranges])
+        merged.sort(kind='stable')
+        output[output_start:output_start + len(merged)] = merged
+        del data, output
+    finally:
+        source.close()
+        target.close()
+
+
+#== External Sorting =====================================================
+def _external_sort(iterable, key, reverse, run_limit, fan_in, temp_dir, run_format):
+    """
+    Returns: A generator over the values of iterable in sorted order, as
+    described in external_sort. Each run holds about run_limit bytes of
+    values.
+    """
 
+    #Every run file ever written, so they can all be cleaned up
+    created = []
+    paths = []
+    try:
+        #Step 1: Write sorted runs of run_limit bytes
+        chunk = []
+        size = 0
+        for value in iterable:
+            chunk.append(value)
+            size += sys.getsizeof(value)
+            if size >= run_limit:
+                paths.append(_write_run(merge_sort(chunk, key, reverse), temp_dir, run_format, created))
+                chunk = []
+                size = 0
+        chunk = merge_sort(chunk, key, reverse)
+        #Everything fit in memory: no files needed
+        if not paths:
+            for value in chunk:
+                yield value
+            return
+        if chunk:
+            paths.append(_write_run(chunk, temp_dir, run_format, created))
+        del chunk
+        #Step 2: Merge groups of fan_in neighbouring runs into longer runs
+        #until one final merge can take them all. Keeping the runs in order
+        #keeps the sort stable.
+        while len(paths) > fan_in:
+            merged_paths = []
+            for start in range(0, len(paths), fan_in):
+                group = paths[start:start + fan_in]
+                merged = _heap_merge([_read_run(path, run_format) for path in group], key, reverse)
+                merged_paths.append(_write_run(merged, temp_dir, run_format, created))
+                for path in group:
+                    os.remove(path)
+            paths = merged_paths
+        for value in _heap_merge([_read_run(path, run_format) for path in paths], key, reverse):
+            yield value
+    finally:
+        for path in created:
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def _write_run(values, temp_dir, run_format, created):
+    """
+    Returns: The path of a new temporary file holding the sorted values. The
+    path is also added to the list created.
+    """
 
+    handle, path = tempfile.mkstemp(suffix='.run', prefix='pydata-', dir=temp_dir)
+    os.close(handle)
+    created.append(path)
+    _RUN_FORMATS[run_format][0](values, path)
+    return path
 
 
+def _read_run(path, run_format):
+    """
+    Returns: A generator over the values stored in the run file at path.
+    """
 
+    return _RUN_FORMATS[run_format][1](path)
 
 
+def _write_pickle_run(values, path):
+    """
+    Procedure: Writes values to path as a series of pickled blocks.
+    """
 
+    with open(path, 'wb') as run:
+        block = []
+        for value in values:
+            block.append(value)
+            if len(block) == _RUN_BLOCK:
+                pickle.dump(block, run, pickle.HIGHEST_PROTOCOL)
+                block = []
+        if block:
+            pickle.dump(block, run, pickle.HIGHEST_PROTOCOL)
 
 
+def _read_pickle_run(path):
+    """
+    Returns: A generator over the values of a pickled run file.
+    """
 
+    with open(path, 'rb') as run:
+        while True:
+            try:
+                block = pickle.load(run)
+            except EOFError:
+                return
+            for value in block:
+                yield value
 
 
+def _write_line_run(values, path):
+    """
+    Procedure: Writes values to path as one UTF-8 line each.
+    """
 
+    with io.open(path, 'w', encoding='utf-8', newline='\n') as run:
+        for value in values:
+            run.write(value)
+            run.write(u'\n')
 
 
+def _read_line_run(path):
+    """
+    Returns: A generator over the lines of a line run file, without their
+    newlines.
+    """
 
+    with io.open(path, 'r', encoding='utf-8', newline='\n') as run:
+        for line in run:
+            yield line[:-1]
 
 
+#The writer and reader of each external_sort run format
+_RUN_FORMATS = {
+    'pickle': (_write_pickle_run, _read_pickle_run),
+    'lines': (_write_line_run, _read_line_run),
+}
 
 
+class _RecordFile(object):
+    """
+    Instances present a memory-mapped file of fixed-width records as a
+    mutable sequence for the sorts, without numpy. Each item is a (key,
+    record bytes) tuple, so items compare by key first.
+    """
 
+    def __init__(self, mapped, record_size, key_offset, key_format):
+        self._mapped = mapped
+        self._record_size = record_size
+        self._key_offset = key_offset
+        self._key = struct.Struct(key_format)
+
+    def key(self, index):
+        """
+        Returns: The key of record index, read without copying the record.
+        """
+        return self._key.unpack_from(self._mapped, index * self._record_size + self._key_offset)[0]
+
+    def __len__(self):
+        return len(self._mapped) // self._record_size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(len(self)))]
+        start = index * self._record_size
+        return (self.key(index), self._mapped[start:start + self._record_size])
+
+    def __setitem__(self, index, item):
+        if isinstance(index, slice):
+            for position, value in zip(range(*index.indices(len(self))), list(item)):
+                self[position] = value
+            return
+        start = index * self._record_size
+        self._mapped[start:start + self._record_size] = item[1]
+
+
+def _reverse_records(records):
+    """
+    Procedure: Reverses the numpy array or _RecordFile records in place,
+    swapping blocks of records from the two ends so that only one block is
+    ever held in memory.
+    """
 
+    low = 0
+    high = len(records)
+    while high - low > 1:
+        size = min(_RUN_BLOCK, (high - low) // 2)
+        front = records[low:low + size]
+        if numpy is not None and isinstance(front, numpy.ndarray):
+            front = front.copy()
+        records[low:low + size] = records[high - size:high][::-1]
+        records[high - size:high] = front[::-1]
+        low += size
+        high -= size
@@ -0,0 +1,368 @@
+#asyncalgorithms.py
+
+"""
+===============
+asyncalgorithms
+===============
+Module of sorting and searching coroutines for programs built on asyncio.
+
+An event loop runs one thing at a time. A sort that takes two seconds
+inside a coroutine stops every other request the loop is serving for two
+seconds. The coroutines here do the same work as the ones in
+pydata.Algorithms, but in small slices: after each slice has used up a time
+budget (a few milliseconds) they hand control back to the event loop with
+"await asyncio.sleep(0)", so other tasks keep running in between.
+
+Big jobs can instead be sent to a thread or process pool executor, which
+keeps the event loop free without slicing at all.
+
+Every coroutine can report its progress to a callback, and can be cancelled
+like any other asyncio task. A cancelled sort leaves its sequence exactly
+as it was: all of the work happens on a copy that is only written back at
+the very end (and once writing back has started, it is finished before the
+cancellation goes through).
+
+Needs Python 3.7 or later.
+
+    await async_sort(values, budget_ms=5)
+    await async_sort(values, executor=pool, offload_threshold=100000)
+
+Contents
+--------
+* Async Sort (sliced merge sort, or offloaded to an executor)
+* Async Linear Search
+"""
+
+import asyncio
+import bisect
+import time
+
+from pydata import Algorithms
+
+#Values sorted by insertion sort before the merge passes start
+_ASYNC_RUN = 64
+#Values handled between two checks of the clock
+_ASYNC_PIECE = 512
+#Default length from which async_sort hands the work to its executor
+_OFFLOAD_THRESHOLD = 100000
+
+
+#== Async Algorithms =====================================================
+async def async_sort(sequence, key=None, reverse=False, budget_ms=5, executor=None,
+                     offload_threshold=_OFFLOAD_THRESHOLD, progress=None):
+    """
+    Returns: The same sequence, sorted in place without blocking the event
+    loop for more than about budget_ms milliseconds at a time. Stable.
+
+    Parameters: key and reverse work like they do for the built-in sorted;
+    key is called exactly once per value. executor is an optional
+    concurrent.futures executor: sequences of at least offload_threshold
+    values are sorted there by Algorithms.merge_sort instead (key must then
+    be picklable for a process pool). Numeric buffers are always sorted by
+    numpy in an executor (the loop's default thread pool if executor is
+    None), since numpy cannot be sliced up but does not hold the GIL.
+    progress, if given, is called with the fraction of the work done (from
+    0.0 to 1.0) each time the sort yields to the event loop.
+
+    Precondition: sequence is a mutable sequence (i.e. a list)
+
+    ============
+    Description:
+    ============
+    The sort is a bottom-up merge sort written as a generator: it sorts
+    runs of _ASYNC_RUN values with insertion sort, then merges neighbouring
+    runs pass after pass, doubling their width, and yields after every
+    piece of about _ASYNC_PIECE values. The driver below runs the generator
+    and checks the clock at each yield; when the budget is spent it sleeps
+    for zero seconds, which lets every other ready task run first. A merge
+    sort suits this well because no piece of its work is ever bigger than a
+    merge step, however long the list is.
+
+    Every step that touches all n values is cut into pieces the same way:
+    copying the input, the merges (including copying what is left of a run
+    once the other is used up), and writing the sorted values back. The
+    merge passes swap between two lists, and whichever one ends up sorted
+    is written back directly, so there is no extra copy at the end.
+
+    Cancelling the task raises asyncio.CancelledError at one of those
+    pauses. Until the sorted values start being written back, the sequence
+    has not been touched; after that, the write back is finished first so
+    that the sequence is never left half written. An offloaded sort cannot
+    be stopped once it is running in the executor, but its result is
+    thrown away.
+    """
+
+    loop = asyncio.get_running_loop()
+    vector = Algorithms._numeric_array(sequence)
+    if vector is not None and key is None:
+        result = await loop.run_in_executor(executor, Algorithms.merge_sort, vector.copy(), None, reverse)
+        vector[:] = result
+        _report(progress, 1.0)
+        return sequence
+    total = _sort_work(len(sequence), key)
+    if executor is not None and len(sequence) >= offload_threshold:
+        #merge_sort makes its own copy, in the executor
+        result = await loop.run_in_executor(executor, Algorithms.merge_sort, sequence, key, reverse)
+        backwards = False
+        done = total - len(sequence)
+    else:
+        output = []
+        done = await _run_sliced(_sorted_steps(sequence, key, reverse, output), total, budget_ms, progress)
+        result, backwards = output
+        #Start the write back with a whole budget of its own
+        await asyncio.sleep(0)
+    await _run_sliced(_write_steps(sequence, result, backwards), total, budget_ms, progress, done, True)
+    _report(progress, 1.0)
+    return sequence
+
+
+async def async_linear_search(sequence, value, budget_ms=5, progress=None):
+    """
+    Returns: Index position of the searched value, found without blocking
+    the event loop for more than about budget_ms milliseconds at a time. If
+    the value is not in the sequence, raise a ValueError.
+
+    Parameters: progress works as it does for async_sort.
+
+    ============
+    Description:
+    ============
+    This is Algorithms.linear_search_i in pieces of _ASYNC_PIECE values,
+    with a pause for the event loop whenever the budget runs out. Sorted
+    data does not need this: a binary search is only O(log(n)) steps.
+    """
+
+    found = []
+    await _run_sliced(_search_steps(sequence, value, found), len(sequence), budget_ms, progress)
+    if not found:
+        raise ValueError
+    _report(progress, 1.0)
+    return found[0]
+
+
+#== Helper Functions =====================================================
+async def _run_sliced(steps, total, budget_ms, progress, done=0, finish=False):
+    """
+    Returns: done plus the work done by the generator steps, after running
+    it to the end and yielding to the event loop whenever budget_ms
+    milliseconds have passed since it last did. steps yields how much work
+    it did since its last yield, out of total.
+
+    Parameters: if finish is True, cancelling the task does not stop steps:
+    it is run to the end first, and asyncio.CancelledError is raised then.
+    """
+
+    budget = budget_ms / 1000.0
+    cancelled = None
+    deadline = time.perf_counter() + budget
+    for work in steps:
+        done += work
+        if time.perf_counter() >= deadline:
+            _report(progress, min(1.0, float(done) / max(total, 1)))
+            try:
+                await asyncio.sleep(0)
+            except asyncio.CancelledError as error:
+                if not finish:
+                    raise
+                cancelled = error
+            deadline = time.perf_counter() + budget
+    if cancelled is not None:
+        raise cancelled
+    return done
+
+
+def _report(progress, fraction):
+    """
+    Procedure: Calls progress with fraction, if progress is not None.
+    """
+
+    if progress is not None:
+        progress(fraction)
+
+
+def _sort_work(length, key):
+    """
+    Returns: The number of units of work _sorted_steps and _write_steps
+    yield for length values: one per value to copy them, for the runs, for
+    each merge pass and to write them back, plus one per value each to
+    compute and to strip the keys.
+    """
+
+    passes = 0
+    width = _ASYNC_RUN
+    while width < length:
+        passes += 1
+        width *= 2
+    return length * (passes + 3 + (2 if key is not None else 0))
+
+
+def _sorted_steps(sequence, key, reverse, output):
+    """
+    Returns: A generator that sorts a copy of sequence by key and reverse,
+    stably, in small pieces. It yields the number of values it handled
+    after each piece. At the end it appends to the empty list output a list
+    of the sorted values and whether that list has to be read backwards
+    (from its end) to be in order.
+
+    ============
+    Description:
+    ============
+    For reverse, the copy is made backwards, sorted into ascending order
+    and read backwards again, which keeps equal values in their original
+    order. With a key, the keys are computed once and sorted together with
+    a list of the positions of their values (instead of sorting (key,
+    position) pairs as Algorithms._sorted_by_key does): a million pairs are
+    a million more objects for the garbage collector to walk through, and
+    every collection would pause the event loop for longer.
+    """
+
+    length = len(sequence)
+    #Copy the input, backwards for reverse
+    values = []
+    for start in range(0, length, _ASYNC_PIECE):
+        stop = min(start + _ASYNC_PIECE, length)
+        values.extend(sequence[length - stop:length - start][::-1] if reverse else sequence[start:stop])
+        yield stop - start
+    if key is None:
+        result, _ = yield from _merge_sort_steps(values, None)
+        output.extend((result, reverse))
+        return
+    keys = []
+    positions = []
+    for start in range(0, length, _ASYNC_PIECE):
+        stop = min(start + _ASYNC_PIECE, length)
+        keys.extend(key(value) for value in values[start:stop])
+        positions.extend(range(start, stop))
+        yield stop - start
+    keys, positions = yield from _merge_sort_steps(keys, positions)
+    #Read the values back in the order of their sorted positions
+    result = []
+    for start in range(0, length, _ASYNC_PIECE):
+        stop = min(start + _ASYNC_PIECE, length)
+        result.extend(values[index] for index in positions[start:stop])
+        yield stop - start
+    for items in (keys, positions, values):
+        yield from _release_steps(items)
+    output.extend((result, reverse))
+
+
+def _merge_sort_steps(keys, positions):
+    """
+    Returns: A generator that sorts the list keys with a stable bottom-up
+    merge sort, making the same moves in the list positions (unless it is
+    None), and yields the number of values it handled after every piece of
+    at most about _ASYNC_PIECE values. It returns a tuple of the sorted
+    keys and positions, which are either the lists given (the new lists
+    used as buffers are then emptied) or new lists (and the lists given
+    are emptied).
+    """
+
+    length = len(keys)
+    #Step 1: Sort short runs with binary insertion sort
+    for start in range(0, length, _ASYNC_RUN):
+        stop = min(start + _ASYNC_RUN, length)
+        for index in range(start + 1, stop):
+            value = keys[index]
+            #bisect_right puts a value after the ones equal to it: stable
+            position = bisect.bisect_right(keys, value, start, index)
+            if position < index:
+                keys[position + 1:index + 1] = keys[position:index]
+                keys[position] = value
+                if positions is not None:
+                    positions[position:index + 1] = [positions[index]] + positions[position:index]
+        yield stop - start
+    if length <= _ASYNC_RUN:
+        return keys, positions
+    #Step 2: Merge neighbouring runs, doubling their width every pass. Each
+    #pass merges from source into target, and then they trade places.
+    source, target = keys, [None] * length
+    carried, carried_target = positions, None if positions is None else [None] * length
+    width = _ASYNC_RUN
+    while width < length:
+        for start in range(0, length, 2 * width):
+            middle = min(start + width, length)
+            end = min(start + 2 * width, length)
+            left, right, out = start, middle, start
+            while left < middle and right < end:
+                stop = out + _ASYNC_PIECE
+                while out < stop and left < middle and right < end:
+                    #Take from the left run on ties, which keeps it stable
+                    if source[right] < source[left]:
+                        take = right
+                        right += 1
+                    else:
+                        take = left
+                        left += 1
+                    target[out] = source[take]
+                    if carried is not None:
+                        carried_target[out] = carried[take]
+                    out += 1
+                yield out - stop + _ASYNC_PIECE
+            #One of the runs is used up; copy the rest of the other
+            for first, last in ((left, middle), (right, end)):
+                while first < last:
+                    stop = min(first + _ASYNC_PIECE, last)
+                    target[out:out + stop - first] = source[first:stop]
+                    if carried is not None:
+                        carried_target[out:out + stop - first] = carried[first:stop]
+                    out += stop - first
+                    yield stop - first
+                    first = stop
+        source, target = target, source
+        carried, carried_target = carried_target, carried
+        width *= 2
+    yield from _release_steps(target)
+    if carried_target is not None:
+        yield from _release_steps(carried_target)
+    return source, carried
+
+
+def _write_steps(sequence, values, backwards):
+    """
+    Returns: A generator that writes the list values (read from its end if
+    backwards is True) over sequence in place, a piece of _ASYNC_PIECE
+    values at a time, yielding the number of values written after each.
+    A list values is emptied afterwards.
+    """
+
+    length = len(values)
+    for start in range(0, length, _ASYNC_PIECE):
+        stop = min(start + _ASYNC_PIECE, length)
+        piece = values[length - stop:length - start][::-1] if backwards else values[start:stop]
+        Algorithms._write_back(sequence, start, piece)
+        yield stop - start
+    if isinstance(values, list):
+        yield from _release_steps(values)
+
+
+def _release_steps(items):
+    """
+    Returns: A generator that empties the list items a piece at a time from
+    its end, yielding 0 after each piece.
+
+    Dropping a list of a million values in one go means a million reference
+    counts to update (and a million objects to free, for keys), which
+    blocks the event loop for milliseconds like any other step over all
+    the values.
+    """
+
+    while items:
+        del items[-_ASYNC_PIECE:]
+        yield 0
+
+
+def _search_steps(sequence, value, found):
+    """
+    Returns: A generator that searches sequence for value a piece at a
+    time, yielding the number of values looked at after each piece. If it
+    finds value, it appends its index to the empty list found.
+    """
+
+    length = len(sequence)
+    for start in range(0, length, _ASYNC_PIECE):
+        stop = min(start + _ASYNC_PIECE, length)
+        for index in range(start, stop):
+            if sequence[index] == value:
+                found.append(index)
+                return
+        yield stop - start
@@ -0,0 +1,597 @@
+#benchmarks.py
+
+"""
+==========
+benchmarks
+==========
+Module for timing the algorithms in pydata.Algorithms in a way that can be
+repeated and compared. Every benchmark sorts the same inputs (made from a
+fixed random seed) several times, and reports the median time, the spread
+of the times (the interquartile range, or IQR) and the peak memory used.
+
+Results are saved as JSON. Two result files - say, one from before a change
+and one from after - can then be compared, and any benchmark that got
+noticeably and consistently slower (beyond the noise of both runs, and
+after allowing for the machine itself having got slower or faster, as seen
+in the built-in list.sort benchmarks) is flagged as a regression.
+
+Usage
+-----
+Run the benchmarks and save the results:
+
+    python -m pydata.Benchmarks run --output before.json
+    python -m pydata.Benchmarks run --sizes 1000 100000 --algorithms quick merge
+
+Compare two result files (exits with status 1 if anything regressed):
+
+    python -m pydata.Benchmarks compare before.json after.json
+
+Contents
+--------
+Input generators: random, sorted, reversed, sawtooth, organ pipe, few
+unique, many duplicates, strings, tuples
+
+Algorithms: every sort in pydata.Algorithms, the adaptive sort, the batched
+binary search and the built-in list.sort as a baseline
+"""
+
+import argparse
+import json
+import math
+import platform
+import random
+import sys
+import time
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+from pydata import Algorithms
+
+#Default sizes, repeats and warmup runs for a benchmark run
+DEFAULT_SIZES = [1000, 10000, 100000]
+DEFAULT_REPEATS = 7
+DEFAULT_WARMUP = 1
+DEFAULT_SEED = 2013
+#A benchmark is a regression if it is this much slower (and outside noise)
+DEFAULT_THRESHOLD = 0.10
+#...and at least this many seconds slower per call
+DEFAULT_MIN_SLOWDOWN = 1e-5
+#...and the rank test says the slowdown is this unlikely to be chance
+DEFAULT_ALPHA = 0.01
+#The benchmark whose change between two runs is taken as the change in
+#the speed of the machine itself
+DEFAULT_BASELINE = 'builtin'
+#Every timed sample runs the benchmark enough times to take at least this
+#many seconds, so that short benchmarks are not lost in clock noise
+MIN_SAMPLE_TIME = 0.01
+
+#The most precise clock available (Python 2 has no perf_counter)
+_clock = getattr(time, 'perf_counter', time.time)
+
+
+#== Input Generators =====================================================
+def random_input(size, rng):
+    """
+    Returns: size random integers between 0 and size * 10.
+    """
+
+    return [rng.randint(0, size * 10) for _ in range(size)]
+
+
+def sorted_input(size, rng):
+    """
+    Returns: size integers that are already in ascending order.
+    """
+
+    return sorted(random_input(size, rng))
+
+
+def reversed_input(size, rng):
+    """
+    Returns: size integers in descending order.
+    """
+
+    return sorted(random_input(size, rng), reverse=True)
+
+
+def sawtooth_input(size, rng):
+    """
+    Returns: size integers made of ascending runs of about sqrt(size) values
+    each - a classic input for run-detecting sorts.
+    """
+
+    tooth = max(int(size ** 0.5), 1)
+    return [index % tooth for index in range(size)]
+
+
+def organ_pipe_input(size, rng):
+    """
+    Returns: size integers going up and then back down (0, 1, ..., 1, 0) -
+    a classic killer of naive quick sort pivots.
+    """
+
+    half = size // 2
+    return list(range(half)) + list(range(size - half - 1, -1, -1))
+
+
+def few_unique_input(size, rng):
+    """
+    Returns: size integers with only 10 distinct values (like the old
+    __main__ demo of pydata.Algorithms).
+    """
+
+    return [rng.randint(1, 10) for _ in range(size)]
+
+
+def many_duplicates_input(size, rng):
+    """
+    Returns: size integers with about sqrt(size) distinct values.
+    """
+
+    distinct = max(int(size ** 0.5), 1)
+    return [rng.randint(0, distinct) for _ in range(size)]
+
+
+def strings_input(size, rng):
+    """
+    Returns: size random strings sharing a long common prefix, like URLs.
+    """
+
+    return ['https://example.com/path/%08d' % rng.randint(0, size * 10) for _ in range(size)]
+
+
+def tuples_input(size, rng):
+    """
+    Returns: size random (small integer, float) tuples - records whose first
+    field has many duplicates.
+    """
+
+    return [(rng.randint(0, 100), rng.random()) for _ in range(size)]
+
+
+#Every input generator by name
+INPUTS = {
+    'random': random_input,
+    'sorted': sorted_input,
+    'reversed': reversed_input,
+    'sawtooth': sawtooth_input,
+    'organ_pipe': organ_pipe_input,
+    'few_unique': few_unique_input,
+    'many_duplicates': many_duplicates_input,
+    'strings': strings_input,
+    'tuples': tuples_input,
+}
+
+
+#== Algorithms ===========================================================
+def _sorted_copy(sort):
+    """
+    Returns: A benchmark function that runs the in-place sort on its input.
+    """
+
+    def run(values):
+        sort(values)
+        return values
+    return run
+
+
+def _search_many(values):
+    """
+    Returns: The sorted values after looking up every value of values in
+    them with binary_search_many. The lookups are what is being timed.
+    """
+
+    values.sort()
+    Algorithms.binary_search_many(values, values, mode='left')
+    return values
+
+
+#Every benchmark function by name, and the largest size it is run at (the
+#quadratic sorts would take hours at the bigger sizes). Each function is
+#given a fresh copy of the input and returns the sorted result.
+ALGORITHMS = {
+    'builtin': (_sorted_copy(list.sort), None),
+    'sort': (_sorted_copy(Algorithms.sort), None),
+    'quick': (_sorted_copy(Algorithms.quick_sort), None),
+    'merge': (Algorithms.merge_sort, None),
+    'heap': (Algorithms.heap_sort, None),
+    'radix': (Algorithms.radix_sort, None),
+    'shell': (_sorted_copy(Algorithms.shell_sort), None),
+    'insertion': (_sorted_copy(Algorithms.insertion_sort), 2000),
+    'selection': (_sorted_copy(Algorithms.selection_sort), 2000),
+    'bubble': (_sorted_copy(Algorithms.bubble_sort), 1000),
+    'search_many': (_search_many, None),
+}
+
+#Algorithms that only accept some kinds of input
+_ACCEPTS = {
+    'radix': lambda values: all(isinstance(value, int) for value in values[:100]),
+}
+
+
+#== Timing ===============================================================
+def time_benchmark(function, values, repeats=DEFAULT_REPEATS, warmup=DEFAULT_WARMUP):
+    """
+    Returns: A dict with the 'median', 'iqr', 'min' and 'max' time (in
+    seconds) of one call of function over repeats samples, every call on a
+    fresh copy of values, after warmup untimed calls. 'times' has the time
+    per call of every sample, and 'loops' the number of calls per sample.
+
+    Raises an AssertionError if function does not return sorted values.
+
+    ============
+    Description:
+    ============
+    A sort of 1000 values takes well under a millisecond, which is close to
+    how precise the clock is and much shorter than the hiccups of a busy
+    machine, so timing one call at a time mostly measures noise. Like
+    timeit.Timer.autorange, each sample instead runs function as many times
+    in a row (1, 2, 5, 10, 20, 50, ...) as it takes to fill MIN_SAMPLE_TIME,
+    and the sample's time is divided by that number of loops. The copies of
+    values are made before the clock starts, so copying is not timed.
+    """
+
+    for _ in range(warmup):
+        function(list(values))
+    loops = _autorange(function, values)
+    times = [_time_sample(function, values, loops) for _ in range(repeats)]
+    return _summary(times, loops)
+
+
+def peak_memory(function, values):
+    """
+    Returns: The peak number of bytes allocated while function runs on a
+    copy of values, or None if tracemalloc is not available. This is a
+    separate run, since tracing allocations slows everything down.
+    """
+
+    if tracemalloc is None:
+        return None
+    copy = list(values)
+    tracemalloc.start()
+    try:
+        function(copy)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run(sizes=None, algorithms=None, inputs=None, repeats=DEFAULT_REPEATS,
+        warmup=DEFAULT_WARMUP, seed=DEFAULT_SEED, memory=True, progress=None):
+    """
+    Returns: A dict of benchmark results ready to be saved as JSON: 'meta'
+    describes the machine and settings and 'results' has one entry per
+    (algorithm, input, size).
+
+    Parameters: sizes, algorithms and inputs default to all of them (see
+    DEFAULT_SIZES, ALGORITHMS and INPUTS). Every input is made from a random
+    generator seeded with seed, so two runs sort exactly the same data.
+    memory turns peak memory measurement on or off. progress is an optional
+    function called with a line of text after each round of samples and
+    after each benchmark.
+
+    ============
+    Description:
+    ============
+    The speed of a machine drifts: other programs, CPU frequency scaling
+    and (on virtual machines) the neighbours all come and go over seconds.
+    Samples of one benchmark taken back to back all see the same moment,
+    so they agree with each other but not with a run made a minute later,
+    and comparing the two would flag changes that are not there. So the
+    samples are taken in rounds instead: every round times each benchmark
+    once (as time_benchmark does, with the loops calibrated up front), and
+    the samples of a benchmark end up spread over the whole run. Their
+    spread then shows how noisy the machine really is.
+    """
+
+    sizes = sizes or DEFAULT_SIZES
+    algorithms = algorithms or sorted(ALGORITHMS)
+    inputs = inputs or sorted(INPUTS)
+    #Warm up and calibrate every benchmark first
+    benchmarks = []
+    for size in sizes:
+        for input_name in inputs:
+            values = INPUTS[input_name](size, random.Random('%s-%s-%s' % (seed, input_name, size)))
+            for name in algorithms:
+                function, max_size = ALGORITHMS[name]
+                if max_size is not None and size > max_size:
+                    continue
+                if name in _ACCEPTS and not _ACCEPTS[name](values):
+                    continue
+                for _ in range(warmup):
+                    function(list(values))
+                result = {'algorithm': name, 'input': input_name, 'size': size,
+                          'loops': _autorange(function, values),
+                          'peak_memory': peak_memory(function, values) if memory else None}
+                benchmarks.append((function, values, result, []))
+    #Then take the samples in rounds of one sample of every benchmark
+    for round_number in range(repeats):
+        for function, values, result, times in benchmarks:
+            times.append(_time_sample(function, values, result['loops']))
+        if progress is not None:
+            progress('round %d of %d done' % (round_number + 1, repeats))
+    results = []
+    for function, values, result, times in benchmarks:
+        result.update(_summary(times, result['loops']))
+        results.append(result)
+        if progress is not None:
+            progress('%-12s %-16s %8d  median %.6fs  iqr %.6fs' % (
+                result['algorithm'], result['input'], result['size'], result['median'], result['iqr']))
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'seed': seed,
+            'repeats': repeats,
+            'warmup': warmup,
+        },
+        'results': results,
+    }
+
+
+#== Comparing ============================================================
+def compare(old, new, threshold=DEFAULT_THRESHOLD, min_slowdown=DEFAULT_MIN_SLOWDOWN, alpha=DEFAULT_ALPHA,
+            baseline=DEFAULT_BASELINE):
+    """
+    Returns: A list of dicts, one per benchmark found in both old and new
+    (two results from run), with the 'old' and 'new' median times, their
+    'ratio' (new / old, corrected for the speed of the machine), the
+    'machine' speed ratio it was corrected by, the 'p_value' of the
+    slowdown and whether it is a 'regression'.
+
+    The machine ratio is the median new / old ratio of the baseline
+    benchmarks (the built-in list.sort by default), which no change to
+    this code can make slower or faster; every new time is divided by it.
+    It is 1.0 if the runs have no baseline benchmarks in common.
+
+    A benchmark is only a regression if all of these hold, so that a CI job
+    running compare does not fail on noise:
+
+    * its median is more than threshold (10% by default) slower,
+    * and more than min_slowdown seconds slower per call,
+    * the IQRs of the two runs do not overlap: the first quartile of the
+      new times is above the third quartile of the old ones,
+    * and a Mann-Whitney U test of the samples says new being this much
+      slower by chance has a probability (the p_value) below alpha.
+
+    ============
+    Description:
+    ============
+    The Mann-Whitney U test is a rank test: it counts, over every pair of an
+    old and a new sample, how often the new one is slower. If nothing
+    changed, that count is about half of the pairs; the p_value is how
+    likely a count at least this high would be if nothing had changed. It
+    does not assume the times are normally distributed (they are not: they
+    have a long tail of slow samples), and one wild sample cannot move it
+    much. With the normal approximation used here it needs about 5 samples
+    per run to ever go below 0.01.
+    """
+
+    old_results = dict((_benchmark_id(result), result) for result in old['results'])
+    machine = _machine_ratio(old_results, new['results'], baseline)
+    comparisons = []
+    for result in new['results']:
+        before = old_results.get(_benchmark_id(result))
+        if before is None:
+            continue
+        median = result['median'] / machine
+        slowdown = median - before['median']
+        ratio = median / before['median'] if before['median'] else float('inf')
+        old_times = sorted(before['times'])
+        new_times = sorted(time / machine for time in result['times'])
+        p_value = _mann_whitney(old_times, new_times)
+        apart = _quantile(new_times, 0.25) > _quantile(old_times, 0.75)
+        comparisons.append({
+            'algorithm': result['algorithm'],
+            'input': result['input'],
+            'size': result['size'],
+            'old': before['median'],
+            'new': result['median'],
+            'ratio': ratio,
+            'machine': machine,
+            'p_value': p_value,
+            'regression': ratio > 1 + threshold and slowdown > min_slowdown and apart and p_value < alpha,
+        })
+    return comparisons
+
+
+#== Helper Functions =====================================================
+def _benchmark_id(result):
+    """
+    Returns: The (algorithm, input, size) tuple naming a benchmark result.
+    """
+
+    return (result['algorithm'], result['input'], result['size'])
+
+
+def _autorange(function, values):
+    """
+    Returns: The smallest number of loops in 1, 2, 5, 10, 20, 50, ... for
+    which calling function that many times takes at least MIN_SAMPLE_TIME.
+    """
+
+    loops = 1
+    while True:
+        for factor in (1, 2, 5):
+            count = loops * factor
+            if _time_loops(function, values, count)[0] >= MIN_SAMPLE_TIME:
+                return count
+        loops *= 10
+
+
+def _time_sample(function, values, loops):
+    """
+    Returns: The time of one call of function in a sample of loops calls,
+    each on a fresh copy of values.
+
+    Raises an AssertionError if function does not return sorted values.
+    """
+
+    elapsed, result = _time_loops(function, values, loops)
+    assert _is_sorted(result), "benchmark did not sort its input"
+    return elapsed / loops
+
+
+def _summary(times, loops):
+    """
+    Returns: The dict of timing statistics time_benchmark returns for the
+    sampled times per call.
+    """
+
+    times = sorted(times)
+    return {
+        'median': _quantile(times, 0.5),
+        'iqr': _quantile(times, 0.75) - _quantile(times, 0.25),
+        'min': times[0],
+        'max': times[-1],
+        'times': times,
+        'loops': loops,
+    }
+
+
+def _time_loops(function, values, loops):
+    """
+    Returns: A tuple of the seconds it took to call function loops times,
+    each time on a fresh copy of values, and the result of the last call.
+    """
+
+    copies = [list(values) for _ in range(loops)]
+    start = _clock()
+    for copy in copies:
+        result = function(copy)
+    elapsed = _clock() - start
+    return elapsed, result
+
+
+def _machine_ratio(old_results, new_results, baseline):
+    """
+    Returns: The median new / old ratio of the median times of the baseline
+    benchmarks in both old_results (a dict by _benchmark_id) and the list
+    new_results, or 1.0 if there are none.
+    """
+
+    ratios = sorted(result['median'] / old_results[_benchmark_id(result)]['median']
+                    for result in new_results
+                    if result['algorithm'] == baseline and _benchmark_id(result) in old_results
+                    and old_results[_benchmark_id(result)]['median'])
+    return _quantile(ratios, 0.5) if ratios else 1.0
+
+
+def _mann_whitney(old, new):
+    """
+    Returns: The one-sided p-value of a Mann-Whitney U test that the times
+    in new are larger than the times in old, using the normal
+    approximation with a continuity correction.
+    """
+
+    if not old or not new:
+        return 1.0
+    #U counts the pairs in which the new time is the slower one, with ties
+    #counting half
+    u = 0.0
+    for before in old:
+        for after in new:
+            if after > before:
+                u += 1
+            elif after == before:
+                u += 0.5
+    pairs = len(old) * len(new)
+    deviation = math.sqrt(pairs * (len(old) + len(new) + 1) / 12.0)
+    z = (u - 0.5 - pairs / 2.0) / deviation
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def _quantile(values, fraction):
+    """
+    Returns: The fraction quantile of the sorted list values, interpolating
+    linearly between the two closest values.
+    """
+
+    position = (len(values) - 1) * fraction
+    low = int(position)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (position - low)
+
+
+def _is_sorted(values):
+    """
+    Returns: True if values is in ascending order.
+    """
+
+    return all(not values[index + 1] < values[index] for index in range(len(values) - 1))
+
+
+def _print(line):
+    """
+    Procedure: Prints line and flushes it, so progress shows up right away.
+    """
+
+    sys.stdout.write(line + '\n')
+    sys.stdout.flush()
+
+
+#== Command Line =========================================================
+def main(arguments=None):
+    """
+    Returns: The exit status of the benchmark command line (see the module
+    docstring for usage): 0, or 1 if compare found a regression.
+    """
+
+    parser = argparse.ArgumentParser(prog='python -m pydata.Benchmarks',
+                                     description='Benchmark the pydata sorting algorithms.')
+    commands = parser.add_subparsers(dest='command')
+    run_parser = commands.add_parser('run', help='run the benchmarks and save the results as JSON')
+    run_parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    run_parser.add_argument('--algorithms', nargs='+', choices=sorted(ALGORITHMS))
+    run_parser.add_argument('--inputs', nargs='+', choices=sorted(INPUTS))
+    run_parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS)
+    run_parser.add_argument('--warmup', type=int, default=DEFAULT_WARMUP)
+    run_parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    run_parser.add_argument('--no-memory', action='store_true', help='skip peak memory measurement')
+    run_parser.add_argument('--output', help='file to save the JSON results to (default: stdout)')
+    compare_parser = commands.add_parser('compare', help='compare two result files and flag regressions')
+    compare_parser.add_argument('old')
+    compare_parser.add_argument('new')
+    compare_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    compare_parser.add_argument('--min-slowdown', type=float, default=DEFAULT_MIN_SLOWDOWN,
+                                help='smallest slowdown per call, in seconds, that can be a regression')
+    compare_parser.add_argument('--alpha', type=float, default=DEFAULT_ALPHA,
+                                help='largest p-value of the rank test that can be a regression')
+    compare_parser.add_argument('--baseline', default=DEFAULT_BASELINE, choices=sorted(ALGORITHMS),
+                                help='benchmark that measures the change in speed of the machine')
+    options = parser.parse_args(arguments)
+
+    if options.command == 'run':
+        results = run(options.sizes, options.algorithms, options.inputs, options.repeats,
+                      options.warmup, options.seed, not options.no_memory,
+                      _print if options.output else None)
+        if options.output:
+            with open(options.output, 'w') as output:
+                json.dump(results, output, indent=2)
+        else:
+            _print(json.dumps(results, indent=2))
+        return 0
+    if options.command == 'compare':
+        with open(options.old) as old_file, open(options.new) as new_file:
+            comparisons = compare(json.load(old_file), json.load(new_file), options.threshold,
+                                  options.min_slowdown, options.alpha, options.baseline)
+        if comparisons:
+            _print('machine speed ratio x%.2f (from the %s benchmarks); the ratios below are corrected for it'
+                   % (comparisons[0]['machine'], options.baseline))
+        for comparison in comparisons:
+            _print('%-12s %-16s %8d  %.6fs -> %.6fs  x%.2f  p=%.4f%s' % (
+                comparison['algorithm'], comparison['input'], comparison['size'], comparison['old'],
+                comparison['new'], comparison['ratio'], comparison['p_value'],
+                '  REGRESSION' if comparison['regression'] else ''))
+        return 1 if any(comparison['regression'] for comparison in comparisons) else 0
+    parser.print_help()
+    return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,6 +1,7 @@
 #datastructures.py
 #Charles J. Lai
 #July 13, 2013
+import bisect
 
 """
 ==============
@@ -19,6 +20,7 @@ Contents
 --------
 Helper Data Structures:
 * Node
+* Sequence View
 * Linked List
 * Doubly Linked List
 * TreeCell
@@ -31,6 +33,8 @@ Classic Data Structures:
 * Linked Queue
 * Priority Queue
 * Dictionary/Hash Table
+* Sorted List
+* Search Index
 
 """
 
@@ -135,6 +139,107 @@ class Node(object):
             return False
 
 
+class SequenceView(object):
+    """
+    Instances represent a window onto part of another sequence, without
+    copying it.
+
+    ===========
+    Description
+    ===========
+    Slicing a python list (sequence[1:]) makes a brand new list and copies
+    every value into it. Recursive algorithms that slice on every call, like
+    a recursive binary search, end up copying far more data than they ever
+    look at. A view instead remembers just three things: the base sequence,
+    the offset where the window starts, and its length. Indexing a view
+    reads straight from the base, writing to it writes to the base, and
+    slicing a view makes another view of the same base in O(1) time.
+
+    Views of views always point at the original base sequence, so a chain
+    of nested views is never slower to index than a single one. Slices with
+    a step other than 1 cannot be a window and are returned as a new list.
+    """
+    #Properties - __slots__ keeps each view down to three references
+    __slots__ = ('_base', '_offset', '_length')
+
+    @property
+    def base(self):
+        return self._base
+
+    @property
+    def offset(self):
+        return self._offset
+
+    #Methods
+    def __init__(self, base, offset=0, length=None):
+        """
+        Constructor: A view of base[offset...offset+length-1]. The length
+        defaults to (and is capped at) the rest of the base sequence.
+
+        Precondition: base is an indexable sequence and offset >= 0
+        """
+        #Collapse a view of a view onto the original base
+        if isinstance(base, SequenceView):
+            offset = base._offset + min(offset, base._length)
+            available = base._length - (offset - base._offset)
+            base = base._base
+        else:
+            available = len(base) - offset
+        if length is None or length > available:
+            length = available
+        self._base = base
+        self._offset = offset
+        self._length = max(length, 0)
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        """
+        Returns: The value at index, or a new view for a slice.
+        """
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._length)
+            if step != 1:
+                return [self._base[self._offset + i] for i in range(start, stop, step)]
+            return SequenceView(self._base, self._offset + start, stop - start)
+        return self._base[self._offset + self._position(index)]
+
+    def __setitem__(self, index, value):
+        """
+        Procedure: Writes value(s) through to the base sequence. A slice
+        must have a step of 1 and be given the same number of values.
+        """
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._length)
+            values = list(value)
+            if step != 1 or len(values) != max(stop - start, 0):
+                raise ValueError("a view can only replace a window with as many values")
+            self._base[self._offset + start:self._offset + start + len(values)] = values
+        else:
+            self._base[self._offset + self._position(index)] = value
+
+    def __iter__(self):
+        base = self._base
+        for index in range(self._offset, self._offset + self._length):
+            yield base[index]
+
+    def __repr__(self):
+        return 'SequenceView(%r)' % (list(self),)
+
+    def _position(self, index):
+        """
+        Returns: index as a non-negative position in the view, counting
+        negative indices from the end. Raises an IndexError if it is out of
+        range.
+        """
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("SequenceView index out of range")
+        return index
+
+
 class LinkedList(Node):
     """
     Instances represent a linked list data structure which can also be used to
@@ -393,4 +498,553 @@ class HashTable(object):
     pass
 
 
+class SortedList(object):
+    """
+    Instances represent a list that keeps its values in sorted order as
+    values are added and removed, with O(log(n)) inserts, removals, lookups
+    and indexing.
+
+    ============
+    Description:
+    ============
+    A plain python list can be kept sorted by inserting each value at the
+    index a binary search finds for it, but every insert shifts all of the
+    values after it - O(n) each, which is far too slow for millions of
+    values. Sorting again after every append is worse.
+
+    A SortedList splits its values into many short sorted lists (the
+    "sublists"), each at most 2*load values long, and keeps the last (and
+    largest) value of every sublist in a separate list, the "maxes". To add
+    a value, a binary search of the maxes finds the sublist it belongs in
+    and a second binary search finds its place there. Only that one short
+    sublist is shifted. A sublist that grows past 2*load values is split
+    in half, and one that shrinks below load/2 values is merged with its
+    neighbour, so they stay short. This is the layout of Grant Jenks'
+    sortedcontainers.
+
+    Indexing by position needs to know how many values come before each
+    sublist. Those counts live in a Fenwick tree (binary indexed tree) over
+    the sublist lengths: a list in which entry i holds the total length of a
+    block of sublists ending at i, sized so that any prefix total is the sum
+    of O(log(m)) entries for m sublists, and growing one sublist updates
+    just as few. The tree is rebuilt in O(m) only after sublists are split,
+    merged or removed.
+
+    Precondition: the values can all be compared with each other.
+    """
+    #Properties
+    _lists = None       #Field:The sorted sublists, in order
+    _maxes = None       #Field:The last value of each sublist
+    _index = None       #Field:Fenwick tree of the sublist lengths, or None if it needs rebuilding
+    _len = 0            #Field:The number of values in the SortedList
+    _load = 1000        #Field:Sublists are split when they grow past twice this length
+
+    def __init__(self, iterable=None, load=1000):
+        """
+        Constructor: Creates a new SortedList of the values of iterable
+        (empty if it is None). load sets the length of the sublists; the
+        default suits lists of a few thousand up to tens of millions of
+        values.
+
+        Precondition: load is an integer >= 4
+        """
+        self._lists = []
+        self._maxes = []
+        self._index = None
+        self._len = 0
+        self._load = load
+        if iterable is not None:
+            self.update(iterable)
+
+    #Data Entry/Removal Methods
+    def add(self, value):
+        """
+        Procedure: Adds value to the SortedList in O(log(n)) time. Equal
+        values go after the ones already in the list.
+        """
+        if not self._maxes:
+            self._lists.append([value])
+            self._maxes.append(value)
+            self._index = None
+            self._len = 1
+            return
+        position = bisect.bisect_right(self._maxes, value)
+        #Larger than everything - append to the last sublist
+        if position == len(self._maxes):
+            position -= 1
+            self._lists[position].append(value)
+            self._maxes[position] = value
+        else:
+            bisect.insort_right(self._lists[position], value)
+        self._len += 1
+        self._grew(position)
+
+    def update(self, iterable):
+        """
+        Procedure: Adds every value of iterable to the SortedList. Adding
+        many values at once sorts them and merges them with the values
+        already in the list in O(n + klog(k)) time for k new values.
+        """
+        values = sorted(iterable)
+        if not values:
+            return
+        #A few values are cheaper to add one at a time
+        if len(values) * 4 < self._len:
+            for value in values:
+                self.add(value)
+            return
+        #Timsort finds the two sorted runs and merges them in linear time
+        if self._len:
+            values = sorted(list(self) + values)
+        load = self._load
+        self._lists = [values[start:start + load] for start in range(0, len(values), load)]
+        self._maxes = [sublist[-1] for sublist in self._lists]
+        self._index = None
+        self._len = len(values)
+
+    def remove(self, value):
+        """
+        Procedure: Removes one copy of value from the SortedList in
+        O(log(n)) time. Raises a ValueError if value is not in it.
+        """
+        position = bisect.bisect_left(self._maxes, value)
+        if position < len(self._maxes):
+            sublist = self._lists[position]
+            offset = bisect.bisect_left(sublist, value)
+            if sublist[offset] == value:
+                self._delete(position, offset)
+                return
+        raise ValueError("%r not in SortedList" % (value,))
+
+    def discard(self, value):
+        """
+        Procedure: Removes one copy of value from the SortedList if it is
+        there, and does nothing otherwise.
+        """
+        if value in self:
+            self.remove(value)
+
+    def pop(self, index=-1):
+        """
+        Returns: The value at position index (the last value by default),
+        removing it from the SortedList in O(log(n)) time.
+        """
+        value = self[index]
+        del self[index]
+        return value
+
+    def clear(self):
+        """
+        Procedure: Removes every value from the SortedList.
+        """
+        self._lists = []
+        self._maxes = []
+        self._index = None
+        self._len = 0
+
+    def __delitem__(self, index):
+        position, offset = self._locate(index)
+        self._delete(position, offset)
+
+    #Data Checking Methods
+    def bisect_left(self, value):
+        """
+        Returns: The index where value would be inserted to keep the list
+        sorted, before any copies of value already in it. O(log(n)) time.
+        """
+        position = bisect.bisect_left(self._maxes, value)
+        if position == len(self._maxes):
+            return self._len
+        return self._position(position, bisect.bisect_left(self._lists[position], value))
+
+    def bisect_right(self, value):
+        """
+        Returns: The index where value would be inserted to keep the list
+        sorted, after any copies of value already in it. O(log(n)) time.
+        """
+        position = bisect.bisect_right(self._maxes, value)
+        if position == len(self._maxes):
+            return self._len
+        return self._position(position, bisect.bisect_right(self._lists[position], value))
+
+    bisect = bisect_right
+
+    def count(self, value):
+        """
+        Returns: The number of copies of value in the SortedList.
+        """
+        return self.bisect_right(value) - self.bisect_left(value)
+
+    def index(self, value):
+        """
+        Returns: The index of the first copy of value in the SortedList.
+        Raises a ValueError if value is not in it.
+        """
+        index = self.bisect_left(value)
+        if index == self._len or self[index] != value:
+            raise ValueError("%r not in SortedList" % (value,))
+        return index
+
+    def irange(self, minimum=None, maximum=None, inclusive=(True, True), reverse=False):
+        """
+        Returns: An iterator over the values from minimum to maximum, in
+        order (or backwards if reverse is True). A bound of None means no
+        bound on that side; inclusive says whether each bound itself is in
+        the range. Finding the range takes O(log(n)) time, and then each
+        value is read in O(1).
+        """
+        if minimum is None:
+            start = 0
+        else:
+            start = self.bisect_left(minimum) if inclusive[0] else self.bisect_right(minimum)
+        if maximum is None:
+            stop = self._len
+        else:
+            stop = self.bisect_right(maximum) if inclusive[1] else self.bisect_left(maximum)
+        return self._range(start, stop, reverse)
+
+    def __len__(self):
+        return self._len
+
+    def __contains__(self, value):
+        position = bisect.bisect_left(self._maxes, value)
+        if position == len(self._maxes):
+            return False
+        sublist = self._lists[position]
+        return sublist[bisect.bisect_left(sublist, value)] == value
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._len)
+            if step == 1:
+                return list(self._range(start, stop, False))
+            return [self[position] for position in range(start, stop, step)]
+        position, offset = self._locate(index)
+        return self._lists[position][offset]
+
+    def __iter__(self):
+        for sublist in self._lists:
+            for value in sublist:
+                yield value
+
+    def __reversed__(self):
+        for sublist in reversed(self._lists):
+            for value in reversed(sublist):
+                yield value
+
+    def __repr__(self):
+        return 'SortedList(%r)' % (list(self),)
+
+    #Helper Methods
+    def _grew(self, position):
+        """
+        Procedure: Updates the SortedList after sublist position gained a
+        value, splitting it in half if it is now longer than 2*load.
+        """
+        sublist = self._lists[position]
+        if len(sublist) > 2 * self._load:
+            half = sublist[self._load:]
+            del sublist[self._load:]
+            self._maxes[position] = sublist[-1]
+            self._lists.insert(position + 1, half)
+            self._maxes.insert(position + 1, half[-1])
+            self._index = None
+        elif self._index is not None:
+            self._index_add(position, 1)
+
+    def _delete(self, position, offset):
+        """
+        Procedure: Deletes the value at offset of sublist position, merging
+        the sublist with a neighbour if it is now shorter than load/2.
+        """
+        sublist = self._lists[position]
+        del sublist[offset]
+        self._len -= 1
+        if not sublist:
+            del self._lists[position]
+            del self._maxes[position]
+            self._index = None
+        elif len(sublist) < self._load // 2 and len(self._lists) > 1:
+            #Merge into the sublist before (or the one after, for the first)
+            if position == 0:
+                position = 1
+            self._lists[position - 1].extend(self._lists[position])
+            self._maxes[position - 1] = self._lists[position - 1][-1]
+            del self._lists[position]
+            del self._maxes[position]
+            self._index = None
+            self._grew(position - 1)
+        else:
+            self._maxes[position] = sublist[-1]
+            if self._index is not None:
+                self._index_add(position, -1)
+
+    def _build_index(self):
+        """
+        Procedure: Builds the Fenwick tree of the sublist lengths in O(m)
+        time. Entry i holds the total length of sublists (i & (i + 1))...i.
+        """
+        index = [len(sublist) for sublist in self._lists]
+        for position in range(len(index)):
+            parent = position | (position + 1)
+            if parent < len(index):
+                index[parent] += index[position]
+        self._index = index
+
+    def _index_add(self, position, delta):
+        """
+        Procedure: Adds delta to the length of sublist position in the
+        Fenwick tree.
+        """
+        index = self._index
+        while position < len(index):
+            index[position] += delta
+            position |= position + 1
+
+    def _position(self, position, offset):
+        """
+        Returns: The index in the SortedList of the value at offset of
+        sublist position.
+        """
+        if self._index is None:
+            self._build_index()
+        #Sum the lengths of the sublists before position
+        total = offset
+        position -= 1
+        while position >= 0:
+            total += self._index[position]
+            position = (position & (position + 1)) - 1
+        return total
+
+    def _locate(self, index):
+        """
+        Returns: A (position, offset) tuple - the sublist holding the value at
+        index of the SortedList and where it is in that sublist. Raises an
+        IndexError if index is out of range; negative indices count from the
+        end.
+        """
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("SortedList index out of range")
+        #The ends are common and need no tree
+        if index < len(self._lists[0]):
+            return 0, index
+        if index >= self._len - len(self._lists[-1]):
+            return len(self._lists) - 1, index - self._len + len(self._lists[-1])
+        if self._index is None:
+            self._build_index()
+        #Walk down the Fenwick tree, skipping whole blocks of sublists that
+        #end before index - the largest first
+        tree = self._index
+        position = 0
+        step = 1 << (len(tree).bit_length() - 1)
+        while step:
+            block = position + step
+            if block <= len(tree) and tree[block - 1] <= index:
+                index -= tree[block - 1]
+                position = block
+            step >>= 1
+        return position, index
+
+    def _range(self, start, stop, reverse):
+        """
+        Returns: An iterator over the values at indices start...stop-1, in
+        order or backwards if reverse is True.
+        """
+        if start >= stop:
+            return
+        if reverse:
+            position, offset = self._locate(stop - 1)
+            remaining = stop - start
+            while remaining:
+                sublist = self._lists[position]
+                while offset >= 0 and remaining:
+                    yield sublist[offset]
+                    offset -= 1
+                    remaining -= 1
+                position -= 1
+                offset = len(self._lists[position]) - 1
+        else:
+            position, offset = self._locate(start)
+            remaining = stop - start
+            while remaining:
+                sublist = self._lists[position]
+                while offset < len(sublist) and remaining:
+                    yield sublist[offset]
+                    offset += 1
+                    remaining -= 1
+                position += 1
+                offset = 0
+
+
+class SearchIndex(object):
+    """
+    Instances represent a sequence together with a hash table from each of
+    its values to the positions it is found at, so that lookups take O(1)
+    time instead of a linear search.
+
+    ============
+    Description:
+    ============
+    A linear search looks at every value until it finds the one it wants:
+    O(n) per lookup, which adds up fast when the same list is searched
+    thousands of times. A SearchIndex pays O(n) once to walk the sequence
+    and record, for every distinct value, the sorted list of positions it
+    appears at. After that, finding the first, the last or every position
+    of a value is a dictionary lookup.
+
+    The index wraps its sequence: appending, extending, popping and
+    assigning through the SearchIndex keeps the table up to date (an
+    assignment costs O(log(k) + k) for a value that appears k times).
+    Changes made to the sequence directly are not seen - call rebuild()
+    afterwards. Values must be hashable.
+    """
+    #Properties
+    _data = None        #Field:The wrapped sequence
+    _positions = None   #Field:Dict of value to the sorted list of positions it is at
+
+    @property
+    def data(self):
+        return self._data
+
+    def __init__(self, sequence):
+        """
+        Constructor: Creates a new SearchIndex over sequence in O(n) time.
+
+        Precondition: sequence is a mutable sequence (i.e. a list) of
+        hashable values
+        """
+        self._data = sequence
+        self.rebuild()
+
+    #Data Entry/Removal Methods
+    def rebuild(self):
+        """
+        Procedure: Rebuilds the index from the sequence in O(n) time, after
+        the sequence was changed without going through the SearchIndex.
+        """
+        positions = {}
+        for index, value in enumerate(self._data):
+            positions.setdefault(value, []).append(index)
+        self._positions = positions
+
+    def append(self, value):
+        """
+        Procedure: Appends value to the sequence and records its position.
+        """
+        self._positions.setdefault(value, []).append(len(self._data))
+        self._data.append(value)
+
+    def extend(self, values):
+        """
+        Procedure: Appends every value of values to the sequence.
+        """
+        for value in values:
+            self.append(value)
+
+    def pop(self):
+        """
+        Returns: The last value of the sequence, removing it.
+        """
+        value = self._data.pop()
+        self._forget(value, len(self._data))
+        return value
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            self._data[index] = value
+            self.rebuild()
+            return
+        length = len(self._data)
+        if not -length <= index < length:
+            raise IndexError("SearchIndex assignment index out of range")
+        if index < 0:
+            index += length
+        self._forget(self._data[index], index)
+        self._data[index] = value
+        bisect.insort(self._positions.setdefault(value, []), index)
+
+    #Data Checking Methods
+    def first(self, value, missing=-1):
+        """
+        Returns: The first position of value in the sequence, or missing if
+        it is not there. O(1) time.
+        """
+        positions = self._positions.get(value)
+        return positions[0] if positions else missing
+
+    def last(self, value, missing=-1):
+        """
+        Returns: The last position of value in the sequence, or missing if
+        it is not there. O(1) time.
+        """
+        positions = self._positions.get(value)
+        return positions[-1] if positions else missing
+
+    def all(self, value):
+        """
+        Returns: A new list of every position of value in the sequence, in
+        increasing order (empty if it is not there).
+        """
+        return list(self._positions.get(value, ()))
+
+    def index(self, value):
+        """
+        Returns: The first position of value in the sequence. Raises a
+        ValueError if it is not there, like list.index and linear_search_i.
+        """
+        positions = self._positions.get(value)
+        if not positions:
+            raise ValueError("%r is not in the sequence" % (value,))
+        return positions[0]
+
+    def count(self, value):
+        """
+        Returns: The number of times value appears in the sequence.
+        """
+        return len(self._positions.get(value, ()))
+
+    def first_many(self, values, missing=-1):
+        """
+        Returns: A list of the first position of each value of values, with
+        missing for values that are not in the sequence.
+        """
+        positions = self._positions
+        return [positions[value][0] if value in positions else missing for value in values]
+
+    def contains_many(self, values):
+        """
+        Returns: A list of booleans saying whether each value of values is
+        in the sequence.
+        """
+        positions = self._positions
+        return [value in positions for value in values]
+
+    def __contains__(self, value):
+        return value in self._positions
+
+    def __getitem__(self, index):
+        return self._data[index]
+
+    def __len__(self):
+        return len(self._data)
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __repr__(self):
+        return 'SearchIndex(%r)' % (self._data,)
+
+    #Helper Methods
+    def _forget(self, value, index):
+        """
+        Procedure: Removes index from the positions of value.
+        """
+        positions = self._positions[value]
+        del positions[bisect.bisect_left(positions, index)]
+        if not positions:
+            del self._positions[value]
+
+
 #== Helper Methods =======================================================
\ No newline at end of file
@@ -0,0 +1,104 @@
+#test_argsort.py
+import array
+import random
+import unittest
+
+from pydata import Algorithms
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+ALGORITHMS = (None, 'insertion', 'selection', 'bubble', 'shell', 'quick', 'merge', 'heap', 'radix')
+
+
+def _expected(values, key=None, reverse=False):
+    """
+    Returns: The stable sorting permutation of values, from sorted().
+    """
+    key = key or (lambda value: value)
+    return sorted(range(len(values)), key=lambda index: key(values[index]), reverse=reverse)
+
+
+class ArgsortTest(unittest.TestCase):
+
+    def setUp(self):
+        #Few distinct values, so that only a stable argsort gets them right
+        self.values = [random.randint(-10, 10) for _ in range(300)]
+
+    def test_every_algorithm(self):
+        for algorithm in ALGORITHMS:
+            for key, reverse in ((None, False), (None, True), (abs, False), (abs, True)):
+                before = list(self.values)
+                order = Algorithms.argsort(self.values, key, reverse, algorithm)
+                self.assertIsInstance(order, array.array)
+                self.assertEqual(list(order), _expected(self.values, key, reverse), algorithm)
+                self.assertEqual(self.values, before)
+
+    def test_edge_cases(self):
+        for algorithm in ALGORITHMS:
+            self.assertEqual(list(Algorithms.argsort([], algorithm=algorithm)), [])
+            self.assertEqual(list(Algorithms.argsort(['x'], algorithm=algorithm)), [0])
+            self.assertEqual(list(Algorithms.argsort([7] * 20, reverse=True, algorithm=algorithm)), list(range(20)))
+
+    def test_strings(self):
+        words = [random.choice(['pear', 'apple', 'fig', 'apricot']) for _ in range(100)]
+        self.assertEqual(list(Algorithms.argsort(words, key=len)), _expected(words, len))
+
+    @unittest.skipIf(numpy is None, 'needs numpy')
+    def test_numpy(self):
+        vector = numpy.array(self.values)
+        for reverse in (False, True):
+            order = Algorithms.argsort(vector, reverse=reverse)
+            self.assertIsInstance(order, numpy.ndarray)
+            self.assertEqual(order.tolist(), _expected(self.values, reverse=reverse))
+
+
+class ApplyPermutationTest(unittest.TestCase):
+
+    def test_reorders_every_sequence(self):
+        names = [random.choice('abcdef') for _ in range(200)]
+        ages = [random.randint(0, 90) for _ in range(200)]
+        ids = array.array('i', range(200))
+        order = Algorithms.argsort(ages)
+        expected = [(names[index], ages[index], index) for index in order]
+        Algorithms.apply_permutation(order, names, ages, ids)
+        self.assertEqual(list(zip(names, ages, ids)), expected)
+        self.assertEqual(ages, sorted(ages))
+
+    def test_edge_cases(self):
+        empty = []
+        Algorithms.apply_permutation([], empty)
+        self.assertEqual(empty, [])
+        one = ['x']
+        Algorithms.apply_permutation([0], one)
+        self.assertEqual(one, ['x'])
+        same = list(range(10))
+        Algorithms.apply_permutation(list(range(10)), same)
+        self.assertEqual(same, list(range(10)))
+        #With no sequences, only the permutation is checked
+        Algorithms.apply_permutation([1, 0])
+
+    def test_not_a_permutation(self):
+        for permutation in ([0, 0, 1], [0, 1, 3], [-1, 0, 1], [2, 1]):
+            values = ['a', 'b', 'c']
+            with self.assertRaises(ValueError):
+                Algorithms.apply_permutation(permutation, values)
+            #Nothing is moved before the check fails
+            self.assertEqual(values, ['a', 'b', 'c'])
+        first, second = ['a', 'b'], ['a', 'b', 'c']
+        with self.assertRaises(ValueError):
+            Algorithms.apply_permutation([1, 0], first, second)
+        self.assertEqual(first, ['a', 'b'])
+
+    @unittest.skipIf(numpy is None, 'needs numpy')
+    def test_numpy(self):
+        values = numpy.array([30, 10, 20])
+        labels = ['c', 'a', 'b']
+        Algorithms.apply_permutation(Algorithms.argsort(values), values, labels)
+        self.assertEqual((values.tolist(), labels), ([10, 20, 30], ['a', 'b', 'c']))
+
+
+if __name__ == '__main__':
+    unittest.main()
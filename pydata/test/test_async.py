@@ -0,0 +1,138 @@
+#test_async.py
+import array
+import gc
+import random
+import time
+import unittest
+
+try:
+    import asyncio
+    from pydata import AsyncAlgorithms
+#Python 2 has no asyncio, and cannot even parse AsyncAlgorithms
+except (ImportError, SyntaxError):
+    AsyncAlgorithms = None
+
+from pydata import Algorithms
+
+
+def _run(coroutine, loop=None):
+    """
+    Returns: What coroutine returns, run to the end on loop (a new event
+    loop if None).
+    """
+    own = loop is None
+    loop = asyncio.new_event_loop() if own else loop
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        if own:
+            loop.close()
+
+
+@unittest.skipIf(AsyncAlgorithms is None, 'needs Python 3.7+')
+class AsyncSortTest(unittest.TestCase):
+
+    def test_sorts(self):
+        values = [random.randint(-50, 50) for _ in range(3000)]
+        for key, reverse in ((None, False), (None, True), (abs, False), (abs, True)):
+            data = list(values)
+            self.assertIs(_run(AsyncAlgorithms.async_sort(data, key=key, reverse=reverse)), data)
+            self.assertEqual(data, sorted(values, key=key, reverse=reverse))
+
+    def test_stable(self):
+        pairs = [(random.randint(0, 9), index) for index in range(2000)]
+        for reverse in (False, True):
+            data = list(pairs)
+            _run(AsyncAlgorithms.async_sort(data, key=lambda pair: pair[0], reverse=reverse))
+            self.assertEqual(data, sorted(pairs, key=lambda pair: pair[0], reverse=reverse))
+
+    def test_short(self):
+        for length in range(4):
+            data = list(range(length, 0, -1))
+            _run(AsyncAlgorithms.async_sort(data))
+            self.assertEqual(data, sorted(data))
+
+    def test_array_without_numpy(self):
+        values = [random.randint(-50, 50) for _ in range(1000)]
+        previous = Algorithms.numpy
+        Algorithms.numpy = None
+        try:
+            data = array.array('i', values)
+            _run(AsyncAlgorithms.async_sort(data, key=abs, reverse=True))
+        finally:
+            Algorithms.numpy = previous
+        self.assertEqual(list(data), sorted(values, key=abs, reverse=True))
+
+    def test_executor(self):
+        from concurrent.futures import ThreadPoolExecutor
+        values = [random.randint(-50, 50) for _ in range(3000)]
+        with ThreadPoolExecutor(2) as executor:
+            for key, reverse in ((None, False), (abs, True)):
+                data = list(values)
+                _run(AsyncAlgorithms.async_sort(data, key=key, reverse=reverse, executor=executor,
+                                                offload_threshold=1000))
+                self.assertEqual(data, sorted(values, key=key, reverse=reverse))
+
+    def test_progress(self):
+        fractions = []
+        _run(AsyncAlgorithms.async_sort([random.random() for _ in range(50000)], key=abs,
+                                        budget_ms=1, progress=fractions.append))
+        self.assertEqual(fractions, sorted(fractions))
+        self.assertEqual(fractions[-1], 1.0)
+        self.assertGreater(len(fractions), 2)
+
+    def test_cancel_leaves_sequence_unchanged(self):
+        values = [random.random() for _ in range(200000)]
+        data = list(values)
+        loop = asyncio.new_event_loop()
+        try:
+            task = loop.create_task(AsyncAlgorithms.async_sort(data, budget_ms=1))
+            loop.call_later(0.05, task.cancel)
+            with self.assertRaises(asyncio.CancelledError):
+                loop.run_until_complete(task)
+        finally:
+            loop.close()
+        self.assertEqual(data, values)
+
+    def test_event_loop_keeps_running(self):
+        #The gaps between two turns of the loop must not grow with the
+        #length of the sequence. Garbage collections are not part of the
+        #sort's slices (and can pause any program), so they are kept out of
+        #the measurement.
+        budget_ms = 5
+        data = [random.random() for _ in range(400000)]
+        loop = asyncio.new_event_loop()
+        gaps = []
+        last = [time.perf_counter()]
+
+        def tick():
+            now = time.perf_counter()
+            gaps.append(now - last[0])
+            last[0] = now
+            loop.call_soon(tick)
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            loop.call_soon(tick)
+            _run(AsyncAlgorithms.async_sort(data, key=abs, reverse=True, budget_ms=budget_ms), loop)
+        finally:
+            if enabled:
+                gc.enable()
+            loop.close()
+        self.assertEqual(data, sorted(data, reverse=True))
+        self.assertGreater(len(gaps), 100)
+        self.assertLess(max(gaps) * 1000, 4 * budget_ms)
+
+
+@unittest.skipIf(AsyncAlgorithms is None, 'needs Python 3.7+')
+class AsyncLinearSearchTest(unittest.TestCase):
+
+    def test_search(self):
+        values = list(range(10000))
+        self.assertEqual(_run(AsyncAlgorithms.async_linear_search(values, 9999, budget_ms=1)), 9999)
+        with self.assertRaises(ValueError):
+            _run(AsyncAlgorithms.async_linear_search(values, -1))
+
+
+if __name__ == '__main__':
+    unittest.main()
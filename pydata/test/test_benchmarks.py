@@ -0,0 +1,87 @@
+#test_benchmarks.py
+import random
+import unittest
+
+from pydata import Benchmarks
+
+
+def _result(times, algorithm='quick'):
+    """
+    Returns: The run() result of one benchmark of algorithm with the given
+    times.
+    """
+    times = sorted(times)
+    return {
+        'algorithm': algorithm, 'input': 'random', 'size': 1000, 'times': times,
+        'median': Benchmarks._quantile(times, 0.5),
+        'iqr': Benchmarks._quantile(times, 0.75) - Benchmarks._quantile(times, 0.25),
+    }
+
+
+def _results(times):
+    """
+    Returns: A run() result holding one benchmark with the given times.
+    """
+    return {'results': [_result(times)]}
+
+
+class CompareTest(unittest.TestCase):
+
+    def test_noise_is_not_a_regression(self):
+        rng = random.Random(1)
+        flagged = 0
+        for _ in range(500):
+            #Same distribution, with a long tail of slow samples
+            old = [0.001 * (1 + rng.expovariate(5)) for _ in range(7)]
+            new = [0.001 * (1 + rng.expovariate(5)) for _ in range(7)]
+            flagged += Benchmarks.compare(_results(old), _results(new))[0]['regression']
+        #alpha is 1%, and the IQR check makes flagging noise rarer still
+        self.assertLessEqual(flagged, 5)
+
+    def test_consistent_slowdown_is_a_regression(self):
+        rng = random.Random(2)
+        old = [0.001 * (1 + rng.random() * 0.02) for _ in range(7)]
+        new = [time * 1.3 for time in old]
+        comparison = Benchmarks.compare(_results(old), _results(new))[0]
+        self.assertTrue(comparison['regression'])
+        self.assertLess(comparison['p_value'], 0.01)
+
+    def test_tiny_slowdown_is_not_a_regression(self):
+        old = [1e-6 * (1 + index * 0.001) for index in range(7)]
+        new = [time * 1.5 for time in old]
+        self.assertFalse(Benchmarks.compare(_results(old), _results(new))[0]['regression'])
+
+    def test_slower_machine_is_not_a_regression(self):
+        rng = random.Random(3)
+        old = [0.001 * (1 + rng.random() * 0.02) for _ in range(7)]
+        builtin = [0.0005 * (1 + rng.random() * 0.02) for _ in range(7)]
+        before = {'results': [_result(old), _result(builtin, 'builtin')]}
+        after = {'results': [_result([time * 1.3 for time in old]),
+                             _result([time * 1.3 for time in builtin], 'builtin')]}
+        comparisons = Benchmarks.compare(before, after)
+        self.assertFalse(any(comparison['regression'] for comparison in comparisons))
+        self.assertAlmostEqual(comparisons[0]['machine'], 1.3)
+        self.assertAlmostEqual(comparisons[0]['ratio'], 1.0)
+        #Measured against nothing, the same times are a regression
+        self.assertTrue(Benchmarks.compare(before, after, baseline='bubble')[0]['regression'])
+
+    def test_speedup_is_not_a_regression(self):
+        old = [0.002 + index * 1e-5 for index in range(7)]
+        new = [time / 2 for time in old]
+        comparison = Benchmarks.compare(_results(old), _results(new))[0]
+        self.assertFalse(comparison['regression'])
+        self.assertGreater(comparison['p_value'], 0.5)
+
+
+class TimeBenchmarkTest(unittest.TestCase):
+
+    def test_short_benchmarks_loop(self):
+        result = Benchmarks.time_benchmark(Benchmarks.ALGORITHMS['builtin'][0], list(range(50, 0, -1)), repeats=3)
+        self.assertGreater(result['loops'], 1)
+        self.assertEqual(len(result['times']), 3)
+        #Times are per call, so a 50 value sort is far below one sample
+        self.assertLess(result['median'], Benchmarks.MIN_SAMPLE_TIME)
+
+
+if __name__ == '__main__':
+    unittest.main()
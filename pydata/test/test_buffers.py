@@ -0,0 +1,73 @@
+#test_buffers.py
+import array
+import random
+import unittest
+
+from pydata import Algorithms
+
+
+class NoNumpyBufferTest(unittest.TestCase):
+    """
+    array.array sorted as it would be where numpy is not installed.
+    """
+
+    def setUp(self):
+        self.numpy = Algorithms.numpy
+        Algorithms.numpy = None
+        self.values = [random.randint(-500, 500) for _ in range(300)]
+
+    def tearDown(self):
+        Algorithms.numpy = self.numpy
+
+    def check(self, sort, in_place=True):
+        for key, reverse in ((None, True), (abs, False), (abs, True)):
+            data = array.array('i', self.values)
+            result = sort(data, key=key, reverse=reverse)
+            if in_place:
+                result = data
+            self.assertEqual(list(result), sorted(self.values, key=key, reverse=reverse))
+
+    def test_bubble_sort(self):
+        self.values = self.values[:60]
+        self.check(Algorithms.bubble_sort)
+
+    def test_insertion_sort(self):
+        self.check(Algorithms.insertion_sort)
+
+    def test_selection_sort(self):
+        self.check(Algorithms.selection_sort)
+
+    def test_quick_sort(self):
+        self.check(Algorithms.quick_sort)
+
+    def test_merge_sort(self):
+        self.check(Algorithms.merge_sort, in_place=False)
+
+    def test_heap_sort(self):
+        self.check(Algorithms.heap_sort)
+
+    def test_shell_sort(self):
+        self.check(Algorithms.shell_sort)
+
+    def test_radix_sort(self):
+        self.check(Algorithms.radix_sort, in_place=False)
+
+    def test_sort(self):
+        self.check(Algorithms.sort)
+        data = array.array('i', self.values)
+        Algorithms.sort(data)
+        self.assertEqual(list(data), sorted(self.values))
+
+    def test_selection(self):
+        for key, reverse in ((None, False), (None, True), (abs, False), (abs, True)):
+            expected = sorted(self.values, key=key, reverse=reverse)
+            data = array.array('i', self.values)
+            Algorithms.partial_sort(data, 10, key=key, reverse=reverse)
+            self.assertEqual(list(data[:10]), expected[:10])
+            data = array.array('i', self.values)
+            Algorithms.select_many(data, [7, 150], key=key, reverse=reverse)
+            self.assertEqual((data[7], data[150]), (expected[7], expected[150]))
+
+
+if __name__ == '__main__':
+    unittest.main()
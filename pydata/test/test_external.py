@@ -0,0 +1,83 @@
+#test_external.py
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+from pydata import Algorithms
+
+#Small enough that every few values make a run file of their own
+MEMORY = 2000
+
+
+class ExternalSortTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.values = [random.randint(0, 100) for _ in range(2000)]
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def sort(self, values, **options):
+        return Algorithms.external_sort(values, memory_limit=MEMORY, temp_dir=self.directory, **options)
+
+    def test_sorts(self):
+        self.assertEqual(list(self.sort(self.values)), sorted(self.values))
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_key_reverse_stable(self):
+        pairs = [(value, index) for index, value in enumerate(self.values)]
+        for key, reverse in ((None, True), (lambda pair: pair[0] % 7, False), (lambda pair: pair[0] % 7, True)):
+            self.assertEqual(list(self.sort(pairs, key=key, reverse=reverse, fan_in=3)),
+                             sorted(pairs, key=key, reverse=reverse))
+
+    def test_lines(self):
+        lines = [u'%08d' % value for value in self.values]
+        self.assertEqual(list(self.sort(iter(lines), run_format='lines', fan_in=2)), sorted(lines))
+
+    def test_fits_in_memory(self):
+        values = self.values[:10]
+        self.assertEqual(list(Algorithms.external_sort(values, temp_dir=self.directory)), sorted(values))
+
+    def test_run_files_removed_on_close(self):
+        merged = self.sort(self.values, fan_in=4)
+        first = [next(merged) for _ in range(10)]
+        self.assertEqual(first, sorted(self.values)[:10])
+        self.assertNotEqual(os.listdir(self.directory), [])
+        merged.close()
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_run_files_removed_on_error(self):
+        def failing():
+            for value in self.values:
+                yield value
+            raise IOError('input broke')
+        with self.assertRaises(IOError):
+            list(self.sort(failing()))
+        self.assertEqual(os.listdir(self.directory), [])
+
+        def key(value):
+            if value == 'bad':
+                raise ValueError(value)
+            return value
+        with self.assertRaises(ValueError):
+            list(self.sort([str(value) for value in self.values] + ['bad'], key=key))
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_bad_arguments(self):
+        #Raised by the call itself, not by the first next()
+        def untouched():
+            raise AssertionError('the input was read')
+            yield
+        with self.assertRaises(ValueError):
+            self.sort(untouched(), run_format='csv')
+        with self.assertRaises(ValueError):
+            self.sort(untouched(), fan_in=1)
+        with self.assertRaises(ValueError):
+            Algorithms.external_sort(untouched(), memory_limit=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+#test_heap_sort.py
+import random
+import unittest
+
+from pydata import Algorithms
+
+ARITIES = (2, 3, 4, 8)
+
+
+class HeapSortTest(unittest.TestCase):
+
+    def test_edge_cases(self):
+        for arity in ARITIES:
+            for values in ([], [1], [2, 1], [4] * 50, list(range(100)), list(range(100, 0, -1))):
+                data = list(values)
+                self.assertIs(Algorithms.heap_sort(data, arity), data)
+                self.assertEqual(data, sorted(values))
+
+    def test_random(self):
+        #Sizes around a full level of each heap leave the last parent with
+        #fewer than arity children
+        for arity in ARITIES:
+            for size in (arity, arity + 1, arity * arity + 1, 1000):
+                values = [random.randint(0, 50) for _ in range(size)]
+                data = list(values)
+                Algorithms.heap_sort(data, arity)
+                self.assertEqual(data, sorted(values))
+
+    def test_key_reverse(self):
+        values = [random.randint(-100, 100) for _ in range(500)]
+        for arity in ARITIES:
+            data = list(values)
+            Algorithms.heap_sort(data, arity, key=abs, reverse=True)
+            self.assertEqual([abs(value) for value in data], sorted(map(abs, values), reverse=True))
+
+    def test_heapify_is_a_heap(self):
+        for arity in ARITIES:
+            data = [random.random() for _ in range(300)]
+            Algorithms._heapify(data, 0, len(data), arity)
+            for child in range(1, len(data)):
+                self.assertGreaterEqual(data[(child - 1) // arity], data[child])
+
+    def test_bad_arity(self):
+        with self.assertRaises(ValueError):
+            Algorithms.heap_sort([2, 1], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
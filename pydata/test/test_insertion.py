@@ -0,0 +1,39 @@
+#test_insertion.py
+import random
+import unittest
+
+from pydata import Algorithms
+
+
+class InsertionSortTest(unittest.TestCase):
+
+    def test_sorts(self):
+        for values in ([], [1], [2, 2, 2], [3, 1, 2, 0], list(range(50)), list(range(50, 0, -1)),
+                       [random.randint(0, 20) for _ in range(300)]):
+            data = list(values)
+            Algorithms.insertion_sort(data)
+            self.assertEqual(data, sorted(values))
+
+    def test_range(self):
+        values = [random.randint(0, 100) for _ in range(100)]
+        for start, end in ((0, 49), (10, 60), (90, 99), (5, 5)):
+            data = list(values)
+            Algorithms.insertion_sort(data, start=start, end=end)
+            self.assertEqual(data, values[:start] + sorted(values[start:end + 1]) + values[end + 1:])
+
+    def test_key_reverse_stable(self):
+        pairs = [(random.randint(0, 9), index) for index in range(200)]
+        for reverse in (False, True):
+            data = list(pairs)
+            Algorithms.insertion_sort(data, key=lambda pair: pair[0], reverse=reverse)
+            self.assertEqual(data, sorted(pairs, key=lambda pair: pair[0], reverse=reverse))
+
+    def test_no_sentinel_argument(self):
+        #The unguarded shift loop is private to the quick sort kernel, since
+        #nothing guards the start of a range at the start of the sequence
+        with self.assertRaises(TypeError):
+            Algorithms.insertion_sort([3, 1, 2, 0], sentinel=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
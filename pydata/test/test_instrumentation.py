@@ -0,0 +1,79 @@
+#test_instrumentation.py
+import array
+import collections
+import random
+import threading
+import unittest
+
+from pydata import Algorithms
+
+
+class InstrumentedTest(unittest.TestCase):
+
+    def test_records_each_call(self):
+        data = [random.randint(0, 1000) for _ in range(500)]
+        with Algorithms.instrumented() as calls:
+            Algorithms.quick_sort(data)
+            Algorithms.merge_sort(list(data), reverse=True)
+        self.assertEqual(data, sorted(data))
+        self.assertEqual([stats.name for stats in calls], ['quick_sort', 'merge_sort'])
+        self.assertTrue(all(stats.length == 500 and stats.comparisons > 0 for stats in calls))
+
+    def test_other_threads_are_not_recorded(self):
+        stop = threading.Event()
+        errors = []
+
+        def sort_in_background():
+            try:
+                while not stop.is_set():
+                    values = [random.random() for _ in range(200)]
+                    result = Algorithms.merge_sort(values)
+                    if result != sorted(values):
+                        errors.append('merge_sort gave %r' % (result,))
+            except Exception as error:
+                errors.append(error)
+
+        worker = threading.Thread(target=sort_in_background)
+        worker.start()
+        try:
+            with Algorithms.instrumented() as calls:
+                for _ in range(20):
+                    Algorithms.quick_sort([random.random() for _ in range(200)])
+            #Keep the other thread sorting after the block has ended
+            for _ in range(20):
+                Algorithms.quick_sort([random.random() for _ in range(200)])
+        finally:
+            stop.set()
+            worker.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(len(calls), 20)
+        self.assertTrue(all(stats.name == 'quick_sort' for stats in calls))
+        self.assertEqual(Algorithms.recorded_stats(), [])
+
+    def test_array_without_numpy(self):
+        previous = Algorithms.numpy
+        Algorithms.numpy = None
+        try:
+            data = array.array('i', [3, -1, 2, 0])
+            with Algorithms.instrumented() as calls:
+                Algorithms.quick_sort(data, key=abs)
+        finally:
+            Algorithms.numpy = previous
+        self.assertEqual(list(data), [0, -1, 2, 3])
+        self.assertEqual(len(calls), 1)
+
+    def test_environment_recorder_is_bounded(self):
+        previous = Algorithms._recorder
+        Algorithms._recorder = collections.deque(maxlen=5)
+        try:
+            for length in range(10):
+                Algorithms.insertion_sort(list(range(length, 0, -1)))
+            self.assertEqual([stats.length for stats in Algorithms.recorded_stats()], [5, 6, 7, 8, 9])
+            self.assertEqual(len(Algorithms.recorded_stats(clear=True)), 5)
+            self.assertEqual(Algorithms.recorded_stats(), [])
+        finally:
+            Algorithms._recorder = previous
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+#test_merge_iter.py
+import itertools
+import random
+import unittest
+
+from pydata import Algorithms
+
+
+class MergeIterTest(unittest.TestCase):
+
+    def test_merges(self):
+        lists = [sorted(random.randint(0, 100) for _ in range(random.randint(0, 50))) for _ in range(7)]
+        self.assertEqual(list(Algorithms.merge_iter(*lists)), sorted(itertools.chain(*lists)))
+        self.assertEqual(list(Algorithms.merge_iter(*(iter(values) for values in lists))),
+                         sorted(itertools.chain(*lists)))
+
+    def test_edge_cases(self):
+        self.assertEqual(list(Algorithms.merge_iter()), [])
+        self.assertEqual(list(Algorithms.merge_iter([], [])), [])
+        self.assertEqual(list(Algorithms.merge_iter([1, 2, 3])), [1, 2, 3])
+        self.assertEqual(list(Algorithms.merge_iter([4], [], [4, 4])), [4, 4, 4])
+
+    def test_stable_key_reverse(self):
+        #Equal keys come out in the order of the iterables they came from
+        first = [(3, 'a'), (2, 'a'), (2, 'b'), (0, 'a')]
+        second = [(2, 'c'), (1, 'a'), (0, 'b')]
+        key = lambda pair: pair[0]
+        self.assertEqual(list(Algorithms.merge_iter(first, second, key=key, reverse=True)),
+                         sorted(first + second, key=key, reverse=True))
+        self.assertEqual(list(Algorithms.merge_iter(first[::-1], second[::-1], key=key)),
+                         [(0, 'a'), (0, 'b'), (1, 'a'), (2, 'b'), (2, 'a'), (2, 'c'), (3, 'a')])
+
+    def test_lazy(self):
+        pulled = []
+
+        def numbers(start):
+            for value in itertools.count(start, 2):
+                pulled.append(value)
+                yield value
+        merged = Algorithms.merge_iter(numbers(0), numbers(1))
+        self.assertEqual([next(merged) for _ in range(5)], [0, 1, 2, 3, 4])
+        #Only one value ahead of the output is read from each iterable
+        self.assertLessEqual(len(pulled), 7)
+
+    def test_bad_keyword(self):
+        with self.assertRaises(TypeError):
+            Algorithms.merge_iter([1], [2], reversed=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+#test_merge_sort.py
+import random
+import unittest
+
+from pydata import Algorithms
+
+
+class MergeSortTest(unittest.TestCase):
+
+    def check(self, values, key=None, reverse=False):
+        """
+        Asserts that merge_sort returns the same list as the (stable)
+        built-in sorted, and leaves values unchanged.
+        """
+        before = list(values)
+        result = Algorithms.merge_sort(values, key, reverse)
+        self.assertEqual(result, sorted(before, key=key, reverse=reverse))
+        self.assertEqual(values, before)
+
+    def test_edge_cases(self):
+        for values in ([], [1], [2, 1], [3] * 100, list(range(1000)), list(range(1000, 0, -1))):
+            self.check(values)
+
+    def test_natural_runs(self):
+        #A few long ascending and descending runs, and many short ones
+        runs = [list(range(start, start + 300)) for start in (600, 0, 900)]
+        self.check(runs[0] + runs[1][::-1] + runs[2])
+        self.check([value for start in range(0, 2000, 7) for value in range(start + 7, start, -1)])
+
+    def test_galloping(self):
+        #Two runs made of alternating blocks of 100 values: merging them
+        #takes whole blocks from one run at a time, which switches the merge
+        #to galloping
+        first = [value for start in range(0, 4000, 200) for value in range(start, start + 100)]
+        second = [value for start in range(100, 4000, 200) for value in range(start, start + 100)]
+        gallop = Algorithms._gallop
+        calls = []
+
+        def counted(*args):
+            calls.append(args)
+            return gallop(*args)
+        Algorithms._gallop = counted
+        try:
+            self.check(first + second)
+            self.check(second + first[::-1])
+        finally:
+            Algorithms._gallop = gallop
+        self.assertTrue(calls)
+
+    def test_stable(self):
+        pairs = [(random.randint(0, 9), index) for index in range(3000)]
+        first = lambda pair: pair[0]
+        self.check(pairs, key=first)
+        self.check(pairs, key=first, reverse=True)
+        #Equal keys in long runs exercise the galloping merges too
+        self.check(sorted(pairs[:1500]) + sorted(pairs[1500:]), key=first)
+
+    def test_random(self):
+        for size in (17, 64, 65, 1000, 5000):
+            self.check([random.randint(0, size) for _ in range(size)])
+            self.check([random.random() for _ in range(size)], key=abs, reverse=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
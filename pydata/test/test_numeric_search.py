@@ -0,0 +1,107 @@
+#test_numeric_search.py
+import bisect
+import random
+import unittest
+
+from pydata import Algorithms
+
+
+class _Stream(object):
+    """
+    A sorted sequence of unknown length, as exponential_search allows:
+    indexing past the end raises IndexError and there is no len().
+    """
+
+    def __init__(self, values):
+        self._values = values
+
+    def __getitem__(self, index):
+        if index < 0:
+            raise IndexError(index)
+        return self._values[index]
+
+
+class InterpolationSearchTest(unittest.TestCase):
+
+    def test_even_data(self):
+        values = list(range(0, 30000, 3))
+        for value in (0, 3, 15000, 29997):
+            self.assertEqual(Algorithms.interpolation_search(values, value), value // 3)
+        for value in (-3, 1, 29998, 40000):
+            with self.assertRaises(ValueError):
+                Algorithms.interpolation_search(values, value)
+
+    def test_lopsided_data(self):
+        #Poor guesses make it fall back to binary search
+        values = [index ** 4 for index in range(2000)] + [10 ** 30]
+        for index in (0, 1, 7, 1000, 1999, 2000):
+            self.assertEqual(Algorithms.interpolation_search(values, values[index]), index)
+        with self.assertRaises(ValueError):
+            Algorithms.interpolation_search(values, 2)
+
+    def test_edge_cases(self):
+        for values in ([], [5]):
+            with self.assertRaises(ValueError):
+                Algorithms.interpolation_search(values, 4)
+        self.assertEqual(Algorithms.interpolation_search([5], 5), 0)
+        self.assertIn(Algorithms.interpolation_search([2] * 30, 2), range(30))
+        self.assertEqual(Algorithms.interpolation_search([0.5, 1.5, 2.25], 2.25), 2)
+        values = [1, 2, 2, 2, 9]
+        self.assertEqual(values[Algorithms.interpolation_search(values, 2)], 2)
+
+
+class ExponentialSearchTest(unittest.TestCase):
+
+    def test_first_copy(self):
+        values = sorted(random.randint(0, 200) for _ in range(1000))
+        for value in set(values):
+            self.assertEqual(Algorithms.exponential_search(values, value), values.index(value))
+        for value in (-1, 201) + tuple(set(range(200)) - set(values)):
+            with self.assertRaises(ValueError):
+                Algorithms.exponential_search(values, value)
+
+    def test_unknown_length(self):
+        values = list(range(0, 1000, 2))
+        stream = _Stream(values)
+        for value in (0, 2, 510, 998):
+            self.assertEqual(Algorithms.exponential_search(stream, value), value // 2)
+        for value in (3, 1000):
+            with self.assertRaises(ValueError):
+                Algorithms.exponential_search(stream, value)
+
+    def test_edge_cases(self):
+        with self.assertRaises(ValueError):
+            Algorithms.exponential_search([], 1)
+        self.assertEqual(Algorithms.exponential_search([1], 1), 0)
+        self.assertEqual(Algorithms.exponential_search([4] * 33, 4), 0)
+
+
+class GallopingSearchTest(unittest.TestCase):
+
+    def test_modes_from_every_hint(self):
+        values = sorted(random.randint(0, 30) for _ in range(200))
+        for value in range(-1, 32):
+            for hint in (-5, 0, 50, 100, 199, 500):
+                self.assertEqual(Algorithms.galloping_search(values, value, hint, 'left'),
+                                 bisect.bisect_left(values, value))
+                self.assertEqual(Algorithms.galloping_search(values, value, hint, 'right'),
+                                 bisect.bisect_right(values, value))
+                if value in values:
+                    self.assertEqual(Algorithms.galloping_search(values, value, hint), values.index(value))
+                else:
+                    with self.assertRaises(ValueError):
+                        Algorithms.galloping_search(values, value, hint)
+
+    def test_edge_cases(self):
+        self.assertEqual(Algorithms.galloping_search([], 1, mode='left'), 0)
+        with self.assertRaises(ValueError):
+            Algorithms.galloping_search([], 1)
+        self.assertEqual(Algorithms.galloping_search([1], 1, 5), 0)
+        self.assertEqual(Algorithms.galloping_search([3] * 40, 3, 20), 0)
+        self.assertEqual(Algorithms.galloping_search([3] * 40, 3, 20, 'right'), 40)
+        with self.assertRaises(ValueError):
+            Algorithms.galloping_search([1, 2], 1, mode='nearest')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+#test_parallel.py
+import array
+import random
+import unittest
+
+from pydata import Algorithms
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import concurrent.futures
+except ImportError:
+    concurrent = None
+
+#Low enough that the tests below really start worker processes (Python 2
+#has no process pools, so there parallel_sort sorts in this process)
+THRESHOLD = 1000
+
+
+class ParallelSortTest(unittest.TestCase):
+
+    def setUp(self):
+        self.values = [random.randint(0, 500) for _ in range(5000)]
+
+    def test_list(self):
+        data = list(self.values)
+        self.assertIs(Algorithms.parallel_sort(data, workers=3, threshold=THRESHOLD), data)
+        self.assertEqual(data, sorted(self.values))
+
+    def test_list_key_reverse(self):
+        #Pairs that only differ after the key show that the sort is stable
+        pairs = [(value, index) for index, value in enumerate(self.values)]
+        for key, reverse in ((None, True), (lambda pair: pair[0] % 7, False), (lambda pair: pair[0] % 7, True)):
+            data = list(pairs)
+            Algorithms.parallel_sort(data, workers=2, threshold=THRESHOLD, key=key, reverse=reverse)
+            self.assertEqual(data, sorted(pairs, key=key, reverse=reverse))
+
+    def test_array_without_numpy(self):
+        previous = Algorithms.numpy
+        Algorithms.numpy = None
+        try:
+            data = array.array('i', self.values)
+            Algorithms.parallel_sort(data, workers=2, threshold=THRESHOLD)
+        finally:
+            Algorithms.numpy = previous
+        self.assertEqual(list(data), sorted(self.values))
+
+    def test_small_input_sorts_here(self):
+        data = list(self.values[:50])
+        Algorithms.parallel_sort(data, workers=2, threshold=THRESHOLD, reverse=True)
+        self.assertEqual(data, sorted(self.values[:50], reverse=True))
+        previous = Algorithms.numpy
+        Algorithms.numpy = None
+        try:
+            data = array.array('i', self.values[:50])
+            Algorithms.parallel_sort(data, workers=2, threshold=THRESHOLD)
+        finally:
+            Algorithms.numpy = previous
+        self.assertEqual(list(data), sorted(self.values[:50]))
+
+
+@unittest.skipIf(concurrent is None or numpy is None or Algorithms._shared_memory() is None,
+                 'needs numpy and multiprocessing.shared_memory')
+class SharedMemorySortTest(unittest.TestCase):
+
+    def setUp(self):
+        self.calls = 0
+        self.shared = Algorithms._parallel_sort_shared
+
+        def counted(*args):
+            self.calls += 1
+            return self.shared(*args)
+        Algorithms._parallel_sort_shared = counted
+
+    def tearDown(self):
+        Algorithms._parallel_sort_shared = self.shared
+
+    def test_numpy_arrays(self):
+        for dtype in ('int64', 'float64', 'uint8'):
+            for reverse in (False, True):
+                values = numpy.random.randint(0, 200, 6000).astype(dtype)
+                data = values.copy()
+                self.assertIs(Algorithms.parallel_sort(data, workers=3, threshold=THRESHOLD, reverse=reverse), data)
+                self.assertEqual(data.tolist(), sorted(values.tolist(), reverse=reverse))
+        self.assertEqual(self.calls, 6)
+
+    def test_array_array(self):
+        values = [random.random() for _ in range(4000)]
+        data = array.array('d', values)
+        Algorithms.parallel_sort(data, workers=2, threshold=THRESHOLD)
+        self.assertEqual(list(data), sorted(values))
+        self.assertEqual(self.calls, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+#test_quick_sort.py
+import random
+import unittest
+
+from pydata import Algorithms
+
+
+def _inputs():
+    """
+    Returns: A list of (name, values) tuples of the inputs that trip up a
+    textbook quick sort, plus the edge cases.
+    """
+    size = 2000
+    return [
+        ('empty', []),
+        ('one', [7]),
+        ('two', [2, 1]),
+        ('all equal', [5] * size),
+        ('sorted', list(range(size))),
+        ('reversed', list(range(size, 0, -1))),
+        ('organ pipe', list(range(size // 2)) + list(range(size // 2, 0, -1))),
+        ('sawtooth', [index % 50 for index in range(size)]),
+        ('few unique', [random.randint(0, 3) for _ in range(size)]),
+        ('random', [random.random() for _ in range(size)]),
+        ('strings', [str(random.randint(0, 500)) for _ in range(size)]),
+    ]
+
+
+class QuickSortTest(unittest.TestCase):
+
+    def test_inputs(self):
+        for name, values in _inputs():
+            data = list(values)
+            Algorithms.quick_sort(data)
+            self.assertEqual(data, sorted(values), name)
+
+    def test_range(self):
+        values = [random.randint(0, 100) for _ in range(500)]
+        for start, end in ((0, 99), (100, 399), (450, 499), (10, 10)):
+            data = list(values)
+            Algorithms.quick_sort(data, start, end)
+            self.assertEqual(data, values[:start] + sorted(values[start:end + 1]) + values[end + 1:])
+
+    def test_key_reverse(self):
+        values = [random.randint(-100, 100) for _ in range(1000)]
+        for key, reverse in ((None, True), (abs, False), (abs, True)):
+            data = list(values)
+            Algorithms.quick_sort(data, key=key, reverse=reverse)
+            #Not stable, so only the keys are compared
+            expected = sorted(values, key=key, reverse=reverse)
+            key = key or (lambda value: value)
+            self.assertEqual([key(value) for value in data], [key(value) for value in expected])
+
+    def test_falls_back_to_heap_sort(self):
+        #Always pivoting on the smallest value makes every partition as
+        #lopsided as it can be, so the depth limit has to kick in
+        choose_pivot = Algorithms._choose_pivot
+        heap_sort_range = Algorithms._heap_sort_range
+        calls = []
+
+        def counted(*args):
+            calls.append(args)
+            return heap_sort_range(*args)
+        Algorithms._choose_pivot = lambda sequence, start, end: min(sequence[start:end + 1])
+        Algorithms._heap_sort_range = counted
+        try:
+            values = [random.random() for _ in range(3000)]
+            data = list(values)
+            Algorithms.quick_sort(data)
+        finally:
+            Algorithms._choose_pivot = choose_pivot
+            Algorithms._heap_sort_range = heap_sort_range
+        self.assertEqual(data, sorted(values))
+        self.assertTrue(calls)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+#test_radix_records.py
+import random
+import unittest
+
+from pydata import Algorithms
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class RadixSortRecordsTest(unittest.TestCase):
+
+    def setUp(self):
+        #(tenant, day, score, id) with few distinct values per column, so
+        #that the later keys have ties to break
+        self.records = [(random.choice('abc'), random.randint(-3, 3), random.randint(0, 9) / 2.0, index)
+                        for index in range(1000)]
+
+    def test_several_keys(self):
+        result = Algorithms.radix_sort_records(self.records, [0, 1, 2])
+        self.assertEqual(result, sorted(self.records))
+
+    def test_mixed_reverse(self):
+        result = Algorithms.radix_sort_records(self.records, [1, 0, 2], reverse=[True, False, True])
+        #Stable: records with equal keys keep their order (by id)
+        expected = sorted(self.records, key=lambda record: record[2], reverse=True)
+        expected = sorted(expected, key=lambda record: record[0])
+        expected = sorted(expected, key=lambda record: record[1], reverse=True)
+        self.assertEqual(result, expected)
+
+    def test_permutation(self):
+        order = Algorithms.radix_sort_records(self.records, [2], reverse=True, permutation=True)
+        self.assertEqual([self.records[index] for index in order],
+                         sorted(self.records, key=lambda record: record[2], reverse=True))
+
+    def test_dicts_and_functions(self):
+        rows = [{'name': record[0], 'day': record[1]} for record in self.records]
+        result = Algorithms.radix_sort_records(rows, ['name', lambda row: -row['day']], radix=2)
+        self.assertEqual(result, sorted(rows, key=lambda row: (row['name'], -row['day'])))
+
+    def test_floats_and_nan(self):
+        values = [(float('nan'),), (-0.0,), (1.5,), (0.0,), (-float('inf'),)]
+        result = Algorithms.radix_sort_records(values, [0])
+        self.assertEqual(result[:4], [(-float('inf'),), (-0.0,), (0.0,), (1.5,)])
+        self.assertNotEqual(result[4][0], result[4][0])
+
+    def test_edge_cases(self):
+        self.assertEqual(Algorithms.radix_sort_records([], [0]), [])
+        self.assertEqual(Algorithms.radix_sort_records([(1, 2)], [0, 1]), [(1, 2)])
+        same = [(5, index) for index in range(50)]
+        self.assertEqual(Algorithms.radix_sort_records(same, [0], reverse=True), same)
+        self.assertEqual(Algorithms.radix_sort_records(self.records, []), self.records)
+
+    def test_bad_arguments(self):
+        with self.assertRaises(ValueError):
+            Algorithms.radix_sort_records(self.records, [0, 1], reverse=[True])
+        with self.assertRaises(ValueError):
+            Algorithms.radix_sort_records(self.records, [0], radix=100)
+
+    @unittest.skipIf(numpy is None, 'needs numpy')
+    def test_structured_array(self):
+        array = numpy.array(self.records, dtype=[('tenant', 'U1'), ('day', 'i4'), ('score', 'f8'), ('id', 'i8')])
+        result = Algorithms.radix_sort_records(array, ['tenant', 'score'], reverse=[False, True])
+        expected = sorted(self.records, key=lambda record: (record[0], -record[2], record[3]))
+        self.assertEqual([tuple(record) for record in result.tolist()], expected)
+        order = Algorithms.radix_sort_records(array, ['day'], permutation=True)
+        self.assertEqual(order.tolist(), [record[3] for record in sorted(self.records, key=lambda record: record[1])])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+#test_radix_sort.py
+import math
+import random
+import unittest
+
+from pydata import Algorithms
+
+NAN = float('nan')
+INF = float('inf')
+
+
+class RadixSortTest(unittest.TestCase):
+
+    def test_edge_cases(self):
+        for values in ([], [1], [2, 1], [-5] * 20, [0.5] * 20):
+            self.assertEqual(Algorithms.radix_sort(values), sorted(values))
+
+    def test_integers(self):
+        for values in ([random.randint(-1000, 1000) for _ in range(2000)],
+                       [random.getrandbits(100) - (1 << 99) for _ in range(500)],
+                       [random.randint(0, 3) for _ in range(500)]):
+            for radix in (2, 16, 256, 65536):
+                self.assertEqual(Algorithms.radix_sort(values, radix=radix), sorted(values))
+
+    def test_floats(self):
+        values = [random.uniform(-1e6, 1e6) for _ in range(1000)] + [1e-310, -1e-310, INF, -INF, 3, -2]
+        random.shuffle(values)
+        self.assertEqual(Algorithms.radix_sort(values), sorted(values))
+
+    def test_signed_zero_and_nan(self):
+        #-0.0 goes before 0.0, and NaN of either sign after infinity
+        values = [0.0, NAN, -0.0, 1.5, -INF, 0.0, INF, -0.0, -2.5, -NAN]
+        result = Algorithms.radix_sort(values)
+        self.assertEqual(result[:-2], [-INF, -2.5, -0.0, -0.0, 0.0, 0.0, 1.5, INF])
+        self.assertEqual([math.copysign(1, value) for value in result[2:6]], [-1, -1, 1, 1])
+        self.assertTrue(all(map(math.isnan, result[-2:])))
+        result = Algorithms.radix_sort(values, reverse=True)
+        self.assertTrue(all(map(math.isnan, result[:2])))
+        self.assertEqual([math.copysign(1, value) for value in result[4:8]], [1, 1, -1, -1])
+
+    def test_range(self):
+        values = [random.randint(-50, 50) for _ in range(300)]
+        self.assertEqual(Algorithms.radix_sort(values, 100, 199), sorted(values[100:200]))
+
+    def test_key_reverse_stable(self):
+        pairs = [(random.randint(-20, 20), index) for index in range(2000)]
+        for reverse in (False, True):
+            for key in (lambda pair: pair[0], lambda pair: pair[0] / 4.0):
+                self.assertEqual(Algorithms.radix_sort(pairs, key=key, reverse=reverse),
+                                 sorted(pairs, key=key, reverse=reverse))
+
+    def test_bad_arguments(self):
+        with self.assertRaises(ValueError):
+            Algorithms.radix_sort([2, 1], radix=10)
+        with self.assertRaises(TypeError):
+            Algorithms.radix_sort(['b', 'a'])
+
+
+if __name__ == '__main__':
+    unittest.main()
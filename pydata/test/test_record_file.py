@@ -0,0 +1,118 @@
+#test_record_file.py
+import os
+import random
+import shutil
+import struct
+import tempfile
+import unittest
+
+from pydata import Algorithms
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+#Records of a 4 byte id, an 8 byte key and 12 bytes of padding
+RECORD = struct.Struct('<I4xQ8x')
+KEY_OFFSET = 8
+
+
+class RecordFileTest(unittest.TestCase):
+    """
+    sort_record_file without numpy, on the _RecordFile wrapper.
+    """
+    numpy = None
+
+    def setUp(self):
+        self.previous = Algorithms.numpy
+        Algorithms.numpy = self.numpy
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'records.bin')
+        #Few distinct keys, so that the ids show whether equal keys moved
+        self.records = [(index, random.randint(0, 50)) for index in range(3000)]
+        self.write(self.records)
+
+    def tearDown(self):
+        Algorithms.numpy = self.previous
+        shutil.rmtree(self.directory)
+
+    def write(self, records, extra=b''):
+        with open(self.path, 'wb') as handle:
+            for record in records:
+                handle.write(RECORD.pack(*record))
+            handle.write(extra)
+
+    def read(self):
+        with open(self.path, 'rb') as handle:
+            data = handle.read()
+        return [RECORD.unpack_from(data, start) for start in range(0, len(data), RECORD.size)]
+
+    def check(self, algorithm, reverse):
+        self.write(self.records)
+        Algorithms.sort_record_file(self.path, RECORD.size, KEY_OFFSET, '<Q', algorithm, reverse)
+        result = self.read()
+        expected = sorted(self.records, key=lambda record: record[1], reverse=reverse)
+        if algorithm == 'radix':
+            #Stable: equal keys keep the order of their ids
+            self.assertEqual(result, expected)
+        else:
+            self.assertEqual([record[1] for record in result], [record[1] for record in expected])
+            self.assertEqual(sorted(result), sorted(self.records))
+
+    def test_quick(self):
+        self.check('quick', False)
+        self.check('quick', True)
+
+    def test_heap(self):
+        self.check('heap', False)
+        self.check('heap', True)
+
+    def test_radix(self):
+        self.check('radix', False)
+        self.check('radix', True)
+
+    def test_key_at_start(self):
+        records = [(random.randint(0, 1 << 40), index) for index in range(500)]
+        with open(self.path, 'wb') as handle:
+            for record in records:
+                handle.write(struct.pack('<QI', *record))
+        Algorithms.sort_record_file(self.path, 12, algorithm='heap')
+        with open(self.path, 'rb') as handle:
+            data = handle.read()
+        self.assertEqual([struct.unpack_from('<QI', data, start) for start in range(0, len(data), 12)],
+                         sorted(records))
+
+    def test_partial_record_raises_unchanged(self):
+        self.write(self.records, extra=b'\x01\x02\x03')
+        with open(self.path, 'rb') as handle:
+            before = handle.read()
+        for algorithm in ('quick', 'heap', 'radix'):
+            with self.assertRaises(ValueError):
+                Algorithms.sort_record_file(self.path, RECORD.size, KEY_OFFSET, algorithm=algorithm)
+        with open(self.path, 'rb') as handle:
+            self.assertEqual(handle.read(), before)
+
+    def test_bad_arguments(self):
+        with self.assertRaises(ValueError):
+            Algorithms.sort_record_file(self.path, RECORD.size, RECORD.size - 4)
+        with self.assertRaises(ValueError):
+            Algorithms.sort_record_file(self.path, RECORD.size, algorithm='merge')
+
+    def test_tiny_files(self):
+        for records in ([], [(1, 2)]):
+            self.write(records)
+            Algorithms.sort_record_file(self.path, RECORD.size, KEY_OFFSET)
+            self.assertEqual(self.read(), records)
+
+
+@unittest.skipIf(numpy is None, 'needs numpy')
+class VectorRecordFileTest(RecordFileTest):
+    """
+    sort_record_file with numpy, on a numpy.memmap of the records.
+    """
+    numpy = numpy
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+#test_search_many.py
+import bisect
+import random
+import unittest
+
+from pydata import Algorithms
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def _expected(sequence, queries, mode, missing=-1):
+    """
+    Returns: The binary_search_many answers worked out with the bisect
+    module, one query at a time.
+    """
+    answers = []
+    for query in queries:
+        if mode == 'right':
+            answers.append(bisect.bisect_right(sequence, query))
+            continue
+        position = bisect.bisect_left(sequence, query)
+        if mode == 'exact' and (position == len(sequence) or sequence[position] != query):
+            position = missing
+        answers.append(position)
+    return answers
+
+
+class BinarySearchManyTest(unittest.TestCase):
+
+    def setUp(self):
+        #Few distinct values, so most queries land on runs of duplicates
+        self.sequence = sorted(random.randint(0, 100) for _ in range(1000))
+        self.queries = [random.randint(-5, 105) for _ in range(300)]
+
+    def test_modes(self):
+        for queries in (self.queries, sorted(self.queries), sorted(self.queries, reverse=True)):
+            for mode in ('exact', 'left', 'right'):
+                self.assertEqual(Algorithms.binary_search_many(self.sequence, queries, mode),
+                                 _expected(self.sequence, queries, mode))
+
+    def test_missing(self):
+        self.assertEqual(Algorithms.binary_search_many([1, 3, 5], iter([0, 3, 4, 6]), missing=None),
+                         [None, 1, None, None])
+
+    def test_edge_cases(self):
+        for mode in ('exact', 'left', 'right'):
+            self.assertEqual(Algorithms.binary_search_many([], [1, 2], mode), _expected([], [1, 2], mode))
+            self.assertEqual(Algorithms.binary_search_many([4], [3, 4, 5], mode), _expected([4], [3, 4, 5], mode))
+            self.assertEqual(Algorithms.binary_search_many([2] * 50, [1, 2, 2, 3], mode),
+                             _expected([2] * 50, [1, 2, 2, 3], mode))
+            self.assertEqual(Algorithms.binary_search_many(self.sequence, [], mode), [])
+
+    def test_key(self):
+        records = [(value, str(value)) for value in self.sequence]
+        for mode in ('exact', 'left', 'right'):
+            self.assertEqual(Algorithms.binary_search_many(records, self.queries, mode, key=lambda record: record[0]),
+                             _expected(self.sequence, self.queries, mode))
+
+    def test_bad_mode(self):
+        with self.assertRaises(ValueError):
+            Algorithms.binary_search_many(self.sequence, [1], 'nearest')
+
+    @unittest.skipIf(numpy is None, 'needs numpy')
+    def test_numpy(self):
+        vector = numpy.array(self.sequence)
+        for mode in ('exact', 'left', 'right'):
+            result = Algorithms.binary_search_many(vector, (query for query in self.queries), mode)
+            self.assertEqual(result.tolist(), _expected(self.sequence, self.queries, mode))
+
+
+if __name__ == '__main__':
+    unittest.main()
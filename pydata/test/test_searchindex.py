@@ -0,0 +1,83 @@
+#test_searchindex.py
+import random
+import unittest
+
+from pydata.DataStructures import SearchIndex
+
+
+class SearchIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        #Few distinct values, so that most of them appear many times
+        self.values = [random.randint(0, 20) for _ in range(500)]
+        self.index = SearchIndex(list(self.values))
+
+    def check(self):
+        """
+        Asserts that every lookup agrees with a linear scan of the data.
+        """
+        data = self.index.data
+        for value in set(data) | set([-1, 99]):
+            positions = [position for position, item in enumerate(data) if item == value]
+            self.assertEqual(self.index.all(value), positions)
+            self.assertEqual(self.index.first(value), positions[0] if positions else -1)
+            self.assertEqual(self.index.last(value), positions[-1] if positions else -1)
+            self.assertEqual(self.index.count(value), len(positions))
+            self.assertEqual(value in self.index, bool(positions))
+
+    def test_lookups(self):
+        self.check()
+        self.assertEqual(self.index.index(self.values[0]), self.values.index(self.values[0]))
+        with self.assertRaises(ValueError):
+            self.index.index(99)
+        self.assertEqual(self.index.first_many([self.values[3], 99]), [self.values.index(self.values[3]), -1])
+        self.assertEqual(self.index.contains_many([self.values[3], 99]), [True, False])
+
+    def test_append_extend_pop(self):
+        self.index.append(99)
+        self.index.extend([5, 5, -1])
+        self.check()
+        for _ in range(100):
+            self.index.pop()
+        self.check()
+        self.assertEqual(self.index.data, (self.values + [99, 5, 5, -1])[:-100])
+
+    def test_setitem(self):
+        for _ in range(300):
+            position = random.randrange(-len(self.index), len(self.index))
+            self.index[position] = random.randint(0, 25)
+        self.check()
+
+    def test_setitem_out_of_range(self):
+        for position in (len(self.values), len(self.values) + 5, -len(self.values) - 1, -len(self.values) - 5):
+            with self.assertRaises(IndexError):
+                self.index[position] = 99
+        self.assertEqual(self.index.data, self.values)
+        self.check()
+        empty = SearchIndex([])
+        with self.assertRaises(IndexError):
+            empty[0] = 1
+        with self.assertRaises(IndexError):
+            empty[-1] = 1
+        self.assertNotIn(1, empty)
+
+    def test_slice_then_rebuild(self):
+        self.index[10:20] = [99, 99]
+        self.check()
+        #Changes made to the data directly are only seen after rebuild
+        self.index.data[:5] = [-1] * 5
+        self.index.data.reverse()
+        self.index.rebuild()
+        self.check()
+
+    def test_empty(self):
+        index = SearchIndex([])
+        self.assertEqual(len(index), 0)
+        self.assertEqual(index.first(1), -1)
+        self.assertEqual(index.all(1), [])
+        with self.assertRaises(IndexError):
+            index.pop()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+#test_sequence_view.py
+import random
+import unittest
+
+from pydata import Algorithms
+from pydata.DataStructures import SequenceView
+
+
+class SequenceViewTest(unittest.TestCase):
+
+    def setUp(self):
+        self.base = list(range(20))
+
+    def test_window(self):
+        view = SequenceView(self.base, 5, 10)
+        self.assertEqual(len(view), 10)
+        self.assertEqual(list(view), self.base[5:15])
+        self.assertEqual((view[0], view[-1]), (5, 14))
+        for index in (10, -11):
+            with self.assertRaises(IndexError):
+                view[index]
+
+    def test_length_is_capped(self):
+        self.assertEqual(list(SequenceView(self.base, 15)), self.base[15:])
+        self.assertEqual(list(SequenceView(self.base, 15, 100)), self.base[15:])
+        self.assertEqual(len(SequenceView(self.base, 25)), 0)
+        self.assertEqual(len(SequenceView([])), 0)
+
+    def test_slices(self):
+        view = SequenceView(self.base, 2, 15)
+        expected = self.base[2:17]
+        for window in (slice(3, 8), slice(None, -2), slice(-4, None), slice(10, 3), slice(0, 100)):
+            sub = view[window]
+            self.assertIsInstance(sub, SequenceView)
+            self.assertIs(sub.base, self.base)
+            self.assertEqual(list(sub), expected[window])
+        self.assertEqual(view[::3], expected[::3])
+        self.assertEqual(view[::-1], expected[::-1])
+
+    def test_views_of_views(self):
+        view = SequenceView(SequenceView(SequenceView(self.base, 2), 3, 10), 4)
+        self.assertIs(view.base, self.base)
+        self.assertEqual(view.offset, 9)
+        self.assertEqual(list(view), self.base[9:15])
+
+    def test_writes_through(self):
+        view = SequenceView(self.base, 5, 5)
+        view[0] = 'a'
+        view[-1] = 'b'
+        view[1:3] = ['c', 'd']
+        self.assertEqual(self.base[4:11], [4, 'a', 'c', 'd', 8, 'b', 10])
+        with self.assertRaises(ValueError):
+            view[1:3] = ['too', 'many', 'values']
+        with self.assertRaises(ValueError):
+            view[::2] = [1, 2, 3]
+        with self.assertRaises(IndexError):
+            view[5] = 0
+
+
+class ViewUsersTest(unittest.TestCase):
+
+    def test_recursive_searches(self):
+        values = sorted(random.sample(range(1000), 300))
+        for index in (0, 1, 150, 299):
+            self.assertEqual(Algorithms.binary_search_r(values, values[index]), index)
+            self.assertEqual(Algorithms.linear_search_r(values, values[index]), index)
+        for search in (Algorithms.binary_search_r, Algorithms.linear_search_r):
+            for sequence, value in ((values, -1), (values, 1000), ([], 1), ([5], 4)):
+                with self.assertRaises(ValueError):
+                    search(sequence, value)
+
+    def test_selection_and_bubble_sort(self):
+        for values in ([], [1], [3, 3, 3], [random.randint(0, 50) for _ in range(200)]):
+            for sort in (Algorithms.selection_sort, Algorithms.bubble_sort):
+                data = list(values)
+                sort(data)
+                self.assertEqual(data, sorted(values))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+#test_shell_sort.py
+import random
+import unittest
+
+from pydata import Algorithms
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+GAPS = ('ciura', 'tokuda', 'sedgewick', 'pratt')
+
+
+class ShellSortTest(unittest.TestCase):
+
+    def test_gap_sequences(self):
+        for gaps in GAPS + ([7, 3, 1], [1]):
+            for values in ([], [1], [2, 1], [6] * 40, list(range(300, 0, -1)),
+                           [random.randint(0, 100) for _ in range(3000)]):
+                data = list(values)
+                Algorithms.shell_sort(data, gaps=gaps)
+                self.assertEqual(data, sorted(values), gaps)
+
+    def test_gaps(self):
+        self.assertEqual(Algorithms._shell_gaps('ciura', 1000), [701, 301, 132, 57, 23, 10, 4, 1])
+        self.assertEqual(Algorithms._shell_gaps('ciura', 2000)[:2], [1577, 701])
+        self.assertEqual(Algorithms._shell_gaps('tokuda', 50), [46, 20, 9, 4, 1])
+        self.assertEqual(Algorithms._shell_gaps('sedgewick', 300), [281, 77, 23, 8, 1])
+        self.assertEqual(Algorithms._shell_gaps('pratt', 10), [9, 8, 6, 4, 3, 2, 1])
+        for gaps in GAPS:
+            self.assertEqual(Algorithms._shell_gaps(gaps, 0), [1])
+            #The first pass uses a gap that is a sizeable part of the list
+            self.assertGreater(Algorithms._shell_gaps(gaps, 10 ** 6)[0], 10 ** 5)
+
+    def test_key_reverse(self):
+        values = [random.randint(-50, 50) for _ in range(500)]
+        data = list(values)
+        Algorithms.shell_sort(data, key=abs, reverse=True, gaps='tokuda')
+        self.assertEqual([abs(value) for value in data], sorted(map(abs, values), reverse=True))
+
+    def test_bad_gaps(self):
+        for gaps in ('fibonacci', [], [4, 2], [3, 0, 1]):
+            with self.assertRaises(ValueError):
+                Algorithms.shell_sort([3, 1, 2], gaps=gaps)
+
+    @unittest.skipIf(numpy is None, 'needs numpy')
+    def test_numpy(self):
+        #Lengths that do and do not divide evenly by the gaps
+        for length in (0, 1, 57, 1000, 1001):
+            values = [random.randint(-100, 100) for _ in range(length)]
+            for gaps in GAPS:
+                for reverse in (False, True):
+                    data = numpy.array(values, dtype='int32')
+                    Algorithms.shell_sort(data, reverse=reverse, gaps=gaps)
+                    self.assertEqual(data.tolist(), sorted(values, reverse=reverse))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+#test_sortedlist.py
+import bisect
+import random
+import unittest
+
+from pydata.DataStructures import SortedList
+
+#Small enough that a few hundred values split, merge and remove sublists
+LOAD = 4
+
+
+class SortedListTest(unittest.TestCase):
+
+    def setUp(self):
+        self.sorted = SortedList(load=LOAD)
+        self.expected = []
+
+    def check(self):
+        """
+        Asserts that the SortedList holds the values of the plain sorted list
+        self.expected, and that indexing and bisecting agree with it.
+        """
+        self.assertEqual(len(self.sorted), len(self.expected))
+        self.assertEqual(list(self.sorted), self.expected)
+        self.assertEqual(list(reversed(self.sorted)), self.expected[::-1])
+        for index, value in enumerate(self.expected):
+            self.assertEqual(self.sorted[index], value)
+            self.assertEqual(self.sorted[index - len(self.expected)], value)
+        for value in set(self.expected) | set([-1, 1000]):
+            self.assertEqual(self.sorted.bisect_left(value), bisect.bisect_left(self.expected, value))
+            self.assertEqual(self.sorted.bisect_right(value), bisect.bisect_right(self.expected, value))
+            self.assertEqual(self.sorted.count(value), self.expected.count(value))
+            self.assertEqual(value in self.sorted, value in self.expected)
+
+    def test_add_remove(self):
+        #Few distinct values, so that there are many duplicates
+        for _ in range(300):
+            value = random.randint(0, 30)
+            self.sorted.add(value)
+            bisect.insort(self.expected, value)
+        self.check()
+        for _ in range(250):
+            value = random.choice(self.expected)
+            self.sorted.remove(value)
+            self.expected.remove(value)
+        self.check()
+        with self.assertRaises(ValueError):
+            self.sorted.remove(1000)
+        self.sorted.discard(1000)
+        self.check()
+
+    def test_interleaved(self):
+        #Checks the Fenwick tree after each change, not only at the end
+        for _ in range(400):
+            if self.expected and random.random() < 0.4:
+                index = random.randrange(len(self.expected))
+                self.assertEqual(self.sorted.pop(index), self.expected.pop(index))
+            else:
+                value = random.randint(0, 100)
+                self.sorted.add(value)
+                bisect.insort(self.expected, value)
+            if self.expected:
+                position = random.randrange(len(self.expected))
+                self.assertEqual(self.sorted[position], self.expected[position])
+                self.assertEqual(self.sorted.index(self.expected[position]),
+                                 self.expected.index(self.expected[position]))
+        self.check()
+
+    def test_update(self):
+        first = [random.randint(0, 50) for _ in range(100)]
+        self.sorted.update(first)
+        #Fewer than a quarter of the values already there go in one by one
+        self.sorted.update([7, 3])
+        self.sorted.update(first)
+        self.expected = sorted(first + [7, 3] + first)
+        self.check()
+
+    def test_slices_and_ranges(self):
+        values = [random.randint(0, 50) for _ in range(100)]
+        self.sorted.update(values)
+        self.expected = sorted(values)
+        self.assertEqual(self.sorted[10:60], self.expected[10:60])
+        self.assertEqual(self.sorted[::7], self.expected[::7])
+        self.assertEqual(self.sorted[-5:], self.expected[-5:])
+        self.assertEqual(list(self.sorted.irange(10, 20)), [value for value in self.expected if 10 <= value <= 20])
+        self.assertEqual(list(self.sorted.irange(10, 20, (False, False), reverse=True)),
+                         [value for value in reversed(self.expected) if 10 < value < 20])
+        self.assertEqual(list(self.sorted.irange(maximum=5)), [value for value in self.expected if value <= 5])
+        del self.sorted[10]
+        del self.expected[10]
+        self.check()
+
+    def test_all_equal(self):
+        self.sorted.update([5] * 50)
+        self.expected = [5] * 50
+        self.check()
+        self.assertEqual(self.sorted.index(5), 0)
+        while self.expected:
+            self.sorted.remove(5)
+            self.expected.remove(5)
+        self.check()
+
+    def test_empty_and_out_of_range(self):
+        self.check()
+        self.assertEqual(list(self.sorted.irange(1, 5)), [])
+        with self.assertRaises(IndexError):
+            self.sorted[0]
+        with self.assertRaises(IndexError):
+            self.sorted.pop()
+        with self.assertRaises(ValueError):
+            self.sorted.index(1)
+        self.sorted.update([3, 1, 2])
+        for index in (3, -4, 100):
+            with self.assertRaises(IndexError):
+                self.sorted[index]
+        self.sorted.clear()
+        self.assertEqual(list(self.sorted), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+#test_string_sort.py
+import random
+import unittest
+
+from pydata import Algorithms
+
+
+def _lcps(strings):
+    """
+    Returns: The LCP array of strings, worked out one pair at a time.
+    """
+    lcps = [0] * len(strings)
+    for index in range(1, len(strings)):
+        a, b = strings[index - 1], strings[index]
+        length = 0
+        while length < min(len(a), len(b)) and a[length] == b[length]:
+            length += 1
+        lcps[index] = length
+    return lcps
+
+
+def _inputs():
+    """
+    Returns: A list of (name, strings) tuples, from edge cases to long
+    shared prefixes of mixed lengths.
+    """
+    prefix = u'https://www.example.com/'
+    return [
+        ('empty', []),
+        ('one', [u'solo']),
+        ('empty strings', [u'', u'b', u'', u'a', u'']),
+        ('all equal', [u'same'] * 40),
+        ('prefixes of each other', [u'abc'[:length] * repeat for length in range(4) for repeat in (1, 2, 3)] * 3),
+        ('shared prefix', [prefix + u''.join(random.choice(u'ab/') for _ in range(random.randint(0, 6)))
+                           for _ in range(500)]),
+        ('unicode', [u''.join(random.choice(u'a\xe9\u4e2d\U0001f600') for _ in range(random.randint(0, 4)))
+                     for _ in range(300)]),
+        ('random', [u''.join(random.choice(u'abcdefghij') for _ in range(random.randint(0, 8)))
+                    for _ in range(2000)]),
+    ]
+
+
+class StringSortTest(unittest.TestCase):
+
+    def test_msd_radix_sort(self):
+        for name, strings in _inputs():
+            before = list(strings)
+            self.assertEqual(Algorithms.msd_radix_sort(strings), sorted(before), name)
+            self.assertEqual(strings, before, name)
+
+    def test_string_quick_sort(self):
+        for name, strings in _inputs():
+            data = list(strings)
+            self.assertIs(Algorithms.string_quick_sort(data), data)
+            self.assertEqual(data, sorted(strings), name)
+
+    def test_lcp(self):
+        for name, strings in _inputs():
+            result, lcps = Algorithms.msd_radix_sort(strings, lcp=True)
+            self.assertEqual(result, sorted(strings), name)
+            self.assertEqual(lcps, _lcps(result), name)
+            result, lcps = Algorithms.string_quick_sort(list(strings), lcp=True)
+            self.assertEqual(result, sorted(strings), name)
+            self.assertEqual(lcps, _lcps(result), name)
+
+    def test_bytes(self):
+        strings = [bytes(bytearray(random.randint(0, 255) for _ in range(random.randint(0, 5))))
+                   for _ in range(500)] + [b'', b'\x00', b'\x00\x00']
+        self.assertEqual(Algorithms.msd_radix_sort(strings), sorted(strings))
+        result, lcps = Algorithms.string_quick_sort(list(strings), lcp=True)
+        self.assertEqual(result, sorted(strings))
+        self.assertEqual(lcps, _lcps(result))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+#test_vector.py
+import array
+import random
+import unittest
+
+from pydata import Algorithms
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+@unittest.skipIf(numpy is None, 'needs numpy')
+class NumericArrayTest(unittest.TestCase):
+
+    def test_buffers(self):
+        self.assertIsNotNone(Algorithms._numeric_array(numpy.arange(3)))
+        self.assertIsNotNone(Algorithms._numeric_array(array.array('d', [1.0])))
+        self.assertIsNotNone(Algorithms._numeric_array(memoryview(array.array('i', [1]))))
+        self.assertIsNotNone(Algorithms._numeric_array(numpy.array([True, False])))
+
+    def test_not_buffers(self):
+        #These go down the pure Python paths
+        self.assertIsNone(Algorithms._numeric_array([1, 2]))
+        self.assertIsNone(Algorithms._numeric_array(numpy.array(['b', 'a'])))
+        self.assertIsNone(Algorithms._numeric_array(numpy.zeros((2, 2))))
+        self.assertIsNone(Algorithms._numeric_array(numpy.array([1, 'a'], dtype=object)))
+        self.assertIsNone(Algorithms._numeric_array(b'bytes'))
+
+
+@unittest.skipIf(numpy is None, 'needs numpy')
+class VectorSortTest(unittest.TestCase):
+
+    def setUp(self):
+        self.values = [random.randint(-1000, 1000) for _ in range(3000)]
+
+    def buffers(self, values):
+        """
+        Returns: A list of fresh numeric buffers holding values.
+        """
+        return [numpy.array(values, dtype='int64'), numpy.array(values, dtype='float32'),
+                array.array('i', values), memoryview(array.array('d', values))]
+
+    def test_in_place_sorts(self):
+        for values in ([], [4], [2] * 10, self.values):
+            for sort in (Algorithms.quick_sort, Algorithms.heap_sort):
+                for reverse in (False, True):
+                    for data in self.buffers(values):
+                        sort(data, reverse=reverse)
+                        self.assertEqual(list(data), sorted(values, reverse=reverse))
+
+    def test_quick_sort_range(self):
+        data = numpy.array(self.values)
+        Algorithms.quick_sort(data, 100, 1999)
+        self.assertEqual(data.tolist(), self.values[:100] + sorted(self.values[100:2000]) + self.values[2000:])
+
+    def test_new_buffer_sorts(self):
+        for sort in (Algorithms.merge_sort, Algorithms.radix_sort):
+            for reverse in (False, True):
+                data = numpy.array(self.values)
+                result = sort(data, reverse=reverse)
+                self.assertIsInstance(result, numpy.ndarray)
+                self.assertEqual(result.tolist(), sorted(self.values, reverse=reverse))
+                self.assertEqual(data.tolist(), self.values)
+                data = array.array('i', self.values)
+                result = sort(data, reverse=reverse)
+                self.assertEqual((type(result), result.typecode), (array.array, 'i'))
+                self.assertEqual(result.tolist(), sorted(self.values, reverse=reverse))
+                self.assertEqual(data.tolist(), self.values)
+        self.assertEqual(Algorithms.merge_sort(numpy.array([], dtype='int64')).tolist(), [])
+
+    def test_key_uses_python_path(self):
+        data = array.array('i', self.values)
+        Algorithms.quick_sort(data, key=abs, reverse=True)
+        self.assertEqual([abs(value) for value in data], sorted(map(abs, self.values), reverse=True))
+
+
+@unittest.skipIf(numpy is None, 'needs numpy')
+class VectorSearchTest(unittest.TestCase):
+
+    def test_linear_search(self):
+        #Long enough that the hits are in later blocks of the scan
+        data = numpy.zeros(3 * Algorithms._SCAN_BLOCK + 5, dtype='int32')
+        data[2 * Algorithms._SCAN_BLOCK + 7] = 9
+        data[-1] = 9
+        self.assertEqual(Algorithms.linear_search_i(data, 9), 2 * Algorithms._SCAN_BLOCK + 7)
+        self.assertEqual(Algorithms.linear_search_i(data, 0), 0)
+        with self.assertRaises(ValueError):
+            Algorithms.linear_search_i(data, 4)
+        with self.assertRaises(ValueError):
+            Algorithms.linear_search_i(numpy.array([], dtype='int32'), 4)
+
+    def test_binary_search(self):
+        data = array.array('i', [1, 3, 3, 3, 7])
+        self.assertEqual(Algorithms.binary_search_i(data, 3), 1)
+        self.assertEqual(Algorithms.binary_search_i(data, 7), 4)
+        for missing in (0, 2, 8):
+            with self.assertRaises(ValueError):
+                Algorithms.binary_search_i(data, missing)
+
+
+if __name__ == '__main__':
+    unittest.main()